@@ -0,0 +1,207 @@
+# KazKaz AI Finansal Danışman - Sayısal Analiz ve Grafik Motoru
+import pandas as pd
+
+from anomali_motoru import KRITIK_KAR_MARJI, PENCERE_GUN, anomali_hesapla, donem_degisimleri
+from bagimliliklar import plotly_express
+from grafik_inceltme import figuru_incelt
+from izleme import asama
+from onbellek import BELLEK_BUTCESI, SinirliOnbellek, veri_parmak_izi
+from ozet_kupu import (SIKLIKLAR, dagilim, donem_tablosu, grup_serisi, gun_imzalari, kirilim_tablosu, kup_filtrele,
+                       kup_guncelle, kup_olustur)
+
+# Sayısal analiz sonuçları (küçük) ve Plotly figürleri (büyük) ayrı tutulur;
+# figürler yalnızca gösterildikleri sekmede, ilk ihtiyaç anında üretilir.
+ANALIZ_ONBELLEGI = SinirliOnbellek(max_oge=64, butce=BELLEK_BUTCESI)
+GRAFIK_ONBELLEGI = SinirliOnbellek(max_oge=128, butce=BELLEK_BUTCESI)
+
+# Kaynak (ör. kullanıcı) başına son anomali sonucu; veri büyüdüğünde yalnızca yeni günler hesaplanır
+SON_ANOMALILER = SinirliOnbellek(max_oge=64, butce=BELLEK_BUTCESI)
+# Kaynak (ör. kullanıcı kimliği) -> son küp ve gün imzaları; yeni veride yalnızca değişen günler toplanır
+SON_KUPLER = SinirliOnbellek(max_oge=64, butce=BELLEK_BUTCESI)
+
+GRAFIK_ADLARI = ["fig_bar", "fig_line", "fig_urun", "fig_marj", "fig_pie"]
+
+
+def calistir_analiz(df, siklik='M', baslangic=None, bitis=None):
+    """Tüm finansal metrikleri ve analiz verilerini tek seferde hesaplar.
+
+    Ham satırlar veri başına yalnızca bir kez günlük özet küpüne indirgenir; dönem
+    sıklığı (`siklik`: W/M/Q/Y) ve tarih aralığı değişiklikleri küp hücreleri üzerinden
+    yanıtlanır. Sonuç aynı veri ve görünüm için önbellekten döner; girdi değiştirilmez.
+    """
+    if df.empty: return {"hata": "Veri bulunamadı."}
+    with asama('analiz', satir=len(df), detay=siklik):
+        veri_izi = veri_parmak_izi(df)
+        gorunum = (siklik, _gun(baslangic), _gun(bitis))
+        # Varsayılan görünümde parmak izi veri parmak iziyle aynıdır (grafik ve PDF anahtarları değişmez)
+        parmak_izi = veri_izi if gorunum == ('M', None, None) else f"{veri_izi}|{siklik}|{gorunum[1]}|{gorunum[2]}"
+        return ANALIZ_ONBELLEGI.get_or_compute(parmak_izi, lambda: _metrikleri_hesapla(kup_getir(df, veri_izi), parmak_izi, *gorunum))
+
+
+def _gun(tarih):
+    return None if tarih is None else pd.Timestamp(tarih).strftime('%Y-%m-%d')
+
+
+def kup_getir(df, veri_izi=None, kaynak=None):
+    """Verinin günlük özet küpünü (bkz. ozet_kupu.kup_olustur) önbellekten döndürür.
+
+    `kaynak` verilirse aynı kaynağın önceki küpü artımlı güncellenir (bkz. ozet_kupu.kup_guncelle):
+    veri yenilendiğinde yalnızca eklenen/değişen günlerin satırları yeniden toplanır.
+    """
+    veri_izi = veri_izi or veri_parmak_izi(df)
+    return ANALIZ_ONBELLEGI.get_or_compute((veri_izi, 'kup'), lambda: _kup_kur(df, kaynak))
+
+
+def _kup_kur(df, kaynak):
+    if kaynak is None:
+        with asama('kup', satir=len(df), detay='tam'):
+            return kup_olustur(df)
+    onceki = SON_KUPLER.get(kaynak)
+    with asama('kup', satir=len(df), detay='tam' if onceki is None else 'artimli'):
+        imzalar = gun_imzalari(df)
+        kup = kup_olustur(df) if onceki is None else kup_guncelle(onceki[0], onceki[1], df, imzalar)[0]
+    SON_KUPLER.set(kaynak, (kup, imzalar))
+    return kup
+
+
+def _metrikleri_hesapla(kup, parmak_izi, siklik, baslangic, bitis):
+    try:
+        kup = kup_filtrele(kup, baslangic, bitis)
+        if kup.empty: return {"hata": "Seçilen tarih aralığında veri bulunamadı."}
+        analiz = {'parmak_izi': parmak_izi, 'siklik': siklik, 'kup': kup}
+
+        analiz['toplam_gelir'] = kup['Gelir'].sum()
+        analiz['toplam_gider'] = kup['Gider'].sum()
+        analiz['net_kar'] = analiz['toplam_gelir'] - analiz['toplam_gider']
+
+        gider_kategorileri = dagilim(kup, 'Kategori', 'Gider')
+        analiz['en_yuksek_gider_kategorisi'] = gider_kategorileri.idxmax() if not gider_kategorileri.empty else "N/A"
+        analiz['kar_marji'] = (analiz['net_kar'] / analiz['toplam_gelir'] * 100) if analiz['toplam_gelir'] > 0 else 0
+
+        # Tahmin ve PDF her zaman aylık seriyle çalışır; grafikler seçilen sıklığı kullanır
+        analiz['aylik_veri'] = donem_tablosu(kup, 'M')
+        analiz['donem_veri'] = analiz['aylik_veri'] if siklik == 'M' else donem_tablosu(kup, siklik)
+
+        if 'Satilan_Urun_Adi' in kup.columns:
+            analiz['top_urunler'] = dagilim(kup, 'Satilan_Urun_Adi', 'Gelir').nlargest(5)
+        else:
+            analiz['top_urunler'] = pd.Series(dtype=float)
+        analiz['gider_dagilimi'] = gider_kategorileri
+
+        return analiz
+    except Exception as e: return {"hata": str(e)}
+
+
+def _siklik_adi(analiz):
+    return SIKLIKLAR[analiz.get('siklik', 'M')]
+
+def _fig_bar(analiz):
+    return plotly_express().bar(analiz['donem_veri'], x=analiz['donem_veri'].index, y=['Gelir', 'Gider'], title=f"{_siklik_adi(analiz)} Gelir & Gider", barmode='group')
+
+def _fig_line(analiz):
+    return plotly_express().line(analiz['donem_veri'], x=analiz['donem_veri'].index, y='Net Kar', title=f"{_siklik_adi(analiz)} Net Kâr Trendi", markers=True)
+
+def _fig_urun(analiz):
+    if analiz['top_urunler'].empty: return None
+    return plotly_express().bar(analiz['top_urunler'], x='Gelir', y=analiz['top_urunler'].index, orientation='h', title="En Çok Gelir Getirenler")
+
+def _fig_marj(analiz):
+    return plotly_express().area(analiz['donem_veri'], x=analiz['donem_veri'].index, y='Kar Marjı', title=f"{_siklik_adi(analiz)} Kar Marjı (%) Trendi", markers=True)
+
+def _fig_pie(analiz):
+    if analiz['gider_dagilimi'].empty: return None
+    return plotly_express().pie(analiz['gider_dagilimi'], names=analiz['gider_dagilimi'].index, values=analiz['gider_dagilimi'].values, title="Gider Dağılımı", hole=.4)
+
+_GRAFIK_URETICILERI = {
+    "fig_bar": _fig_bar,
+    "fig_line": _fig_line,
+    "fig_urun": _fig_urun,
+    "fig_marj": _fig_marj,
+    "fig_pie": _fig_pie,
+}
+
+
+def grafik_getir(analiz, ad, tam_cozunurluk=False):
+    """İstenen grafiği ilk ihtiyaçta üretir ve veri parmak izine göre önbelleğe alır.
+
+    Uzun seriler varsayılan olarak LTTB ile inceltilir (bkz. grafik_inceltme.py);
+    `tam_cozunurluk` tüm noktaları WebGL izleriyle gönderir.
+    """
+    anahtar = (analiz['parmak_izi'], ad, 'tam') if tam_cozunurluk else (analiz['parmak_izi'], ad)
+    return GRAFIK_ONBELLEGI.get_or_compute(anahtar, lambda: _izli_uret(ad, analiz, tam_cozunurluk))
+
+
+def _izli_uret(ad, analiz, tam_cozunurluk=False):
+    with asama('grafik', satir=len(analiz['donem_veri']), detay=ad):
+        fig = _GRAFIK_URETICILERI[ad](analiz)
+        return figuru_incelt(fig, hedef=None) if tam_cozunurluk else figuru_incelt(fig)
+
+
+def tum_grafikler(analiz):
+    """PDF gibi tüm grafiklere ihtiyaç duyan yerler için (ad, figür) çiftlerini sırayla döndürür."""
+    return [(ad, grafik_getir(analiz, ad)) for ad in GRAFIK_ADLARI]
+
+
+# Kırılım bazlı tahmin için hangi boyutun hangi tutar sütunuyla izlendiği
+KIRILIMLAR = {'Kategori': 'Gider', 'Satilan_Urun_Adi': 'Gelir'}
+
+
+def kirilim_serileri(df, boyut, baslangic=None, bitis=None):
+    """Her `boyut` değeri için aylık tutar serilerini geniş tablo (ay x grup) olarak döndürür.
+
+    calistir_analiz'deki gruplamalarla aynı kuralı izler (yalnızca pozitif tutarlar);
+    bir grubun hiç hareket görmediği aylar 0 ile doldurulur. Küp üzerinden hesaplanır.
+    """
+    deger = KIRILIMLAR[boyut]
+    if boyut not in df.columns:
+        return pd.DataFrame()
+    veri_izi = veri_parmak_izi(df)
+    anahtar = (veri_izi, 'kirilim', boyut, _gun(baslangic), _gun(bitis))
+    return ANALIZ_ONBELLEGI.get_or_compute(anahtar, lambda: kirilim_tablosu(kup_filtrele(kup_getir(df, veri_izi), baslangic, bitis), boyut, deger))
+
+
+def detay_grafigi(analiz, boyut, grup):
+    """Tek bir kategori/ürünün (`grup`) seçilen sıklıktaki serisini küpten çizer (KIRILIMLAR'daki tutar)."""
+    def uret():
+        if boyut not in analiz['kup'].columns: return None
+        seri = grup_serisi(analiz['kup'], boyut, grup, KIRILIMLAR[boyut], analiz['siklik'])
+        return figuru_incelt(plotly_express().bar(seri, x=seri.index, y=seri.name, title=f"{grup}: {_siklik_adi(analiz)} {KIRILIMLAR[boyut]}"))
+    return GRAFIK_ONBELLEGI.get_or_compute((analiz['parmak_izi'], 'detay', boyut, grup), uret)
+
+
+def anomali_getir(df, siklik='M', kaynak=None):
+    """Tüm veri üzerinde kayan metrikleri ve gün/dönem anomalilerini (bkz. anomali_motoru.py) döndürür.
+
+    Sonuç veri parmak izine göre önbelleğe alınır. `kaynak` verilirse (ör. kullanıcı kimliği)
+    aynı kaynağın önceki sonucu (ve küpü) artımlı güncellemede kullanılır: yeni satırlar
+    eklendiğinde yalnızca ilk değişen günden sonrası yeniden hesaplanır.
+    """
+    veri_izi = veri_parmak_izi(df)
+
+    def hesapla():
+        kup = kup_getir(df, veri_izi, kaynak)
+        # Küp bu kaynak için kurulduysa gün imzaları da vardır; gün x kategori matrisi artımlı güncellenir
+        son_kup = SON_KUPLER.get(kaynak) if kaynak is not None else None
+        imzalar = son_kup[1] if son_kup is not None and son_kup[0] is kup else None
+        with asama('anomali', satir=len(kup)):
+            sonuc = anomali_hesapla(kup, SON_ANOMALILER.get(kaynak) if kaynak is not None else None, imzalar=imzalar)
+        sonuc['parmak_izi'] = veri_izi
+        if kaynak is not None:
+            SON_ANOMALILER.set(kaynak, sonuc)
+        return sonuc
+
+    sonuc = ANALIZ_ONBELLEGI.get_or_compute((veri_izi, 'anomali'), hesapla)
+    donem = ANALIZ_ONBELLEGI.get_or_compute((veri_izi, 'anomali_donem', siklik), lambda: donem_degisimleri(kup_getir(df, veri_izi), siklik))
+    return sonuc, donem
+
+
+def kayan_marj_grafigi(sonuc, baslangic=None, bitis=None, tam_cozunurluk=False):
+    """Görünümdeki günlerin kayan kar marjı çizgisi (kritik eşik çizgisiyle)."""
+    def uret():
+        kayan = sonuc['kayan']
+        kayan = kayan.loc[(None if baslangic is None else pd.Timestamp(baslangic)):(None if bitis is None else pd.Timestamp(bitis))]
+        fig = plotly_express().line(kayan, x=kayan.index, y='Kayan Kar Marjı', title=f"Kayan Kar Marjı (%, son {PENCERE_GUN} gün)")
+        fig.add_hline(y=KRITIK_KAR_MARJI, line_dash='dash', line_color='red', annotation_text=f"Kritik eşik %{KRITIK_KAR_MARJI}")
+        return figuru_incelt(fig, hedef=None) if tam_cozunurluk else figuru_incelt(fig)
+    anahtar = (sonuc['parmak_izi'], 'kayan_marj', _gun(baslangic), _gun(bitis), tam_cozunurluk)
+    return GRAFIK_ONBELLEGI.get_or_compute(anahtar, uret)
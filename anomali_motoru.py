@@ -0,0 +1,199 @@
+# KazKaz AI Finansal Danışman - Kayan Metrikler ve Anomali Tespiti (Günlük Seri, Vektörel)
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ozet_kupu import SIKLIKLAR, degisen_gunler, donem_tablosu
+from veri_yukleme import TUTAR_SUTUNLARI
+
+# Günlük z-skorları son PENCERE_GUN günün (o gün hariç) ortalaması ve sapmasına göre hesaplanır
+PENCERE_GUN = 30
+MIN_GOZLEM = 7
+Z_ESIGI = 3.0
+# Dönem (hafta/ay/...) değerleri önceki DONEM_PENCERE dönemle karşılaştırılır
+DONEM_PENCERE = 12
+DONEM_MIN_GOZLEM = 4
+KRITIK_KAR_MARJI = 15
+KATEGORISIZ = '(Kategorisiz)'
+
+
+def gunluk_matris(kup):
+    """Küpten gün x (ölçü, Kategori) tablosunu kurar; hareketsiz günler 0, sütunlar önce Gelir sonra Gider."""
+    if 'Kategori' in kup.columns:
+        kategori = kup['Kategori'].astype(object).where(kup['Kategori'].notna(), KATEGORISIZ).astype(str)
+    else:
+        kategori = pd.Series(KATEGORISIZ, index=kup.index)
+    tablo = kup[TUTAR_SUTUNLARI].groupby([kup['Tarih'], kategori.rename('Kategori')]).sum().unstack('Kategori', fill_value=0)
+    gunler = pd.date_range(kup['Tarih'].min(), kup['Tarih'].max(), freq='D', name='Tarih')
+    return tablo.reindex(gunler, fill_value=0).sort_index(axis=1)
+
+
+def _kayan_z(X, pencere, min_gozlem, bas=0):
+    """X'in `bas` ve sonraki satırları için önceki `pencere` satırın ortalamasını ve z-skorunu döndürür.
+
+    Her pencere bağımsız toplanır (kümülatif toplam farkı kullanılmaz); böylece kısmi
+    (artımlı) hesap tam hesapla bit düzeyinde aynı sonucu verir.
+    """
+    n, m = X.shape
+    if bas >= n:
+        return np.empty((0, m)), np.empty((0, m))
+    a0 = max(0, bas - pencere)
+    # Başa pencere kadar NaN eklenir: t satırının penceresi X[t-pencere:t] olur (yetersiz geçmiş NaN)
+    dolgu = np.vstack([np.full((pencere - (bas - a0), m), np.nan), X[a0:n - 1]])
+    pencereler = sliding_window_view(dolgu, pencere, axis=0)  # (n - bas, m, pencere)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        adet = np.sum(~np.isnan(pencereler), axis=-1)
+        # Çoğu günü boş (seyrek) serilerde tek bir hareket her zaman "olağan dışı" görünür;
+        # pencerede en az min_gozlem hareketli gün yoksa z-skoru hesaplanmaz
+        hareketli = np.sum(np.nan_to_num(pencereler) != 0, axis=-1)
+        ort = np.nansum(pencereler, axis=-1) / adet
+        sapma = np.sqrt(np.nansum((pencereler - ort[..., None]) ** 2, axis=-1) / (adet - 1))
+        z = (X[bas:] - ort) / sapma
+    gecerli = (hareketli >= min_gozlem) & (sapma > 1e-9 * (np.abs(ort) + 1))
+    return ort, np.where(gecerli, z, np.nan)
+
+
+def _kayan_toplam(x, pencere, bas=0):
+    # x[t-pencere+1 .. t] toplamları (t >= bas); pencereler yine bağımsız toplanır
+    if bas >= len(x):
+        return np.empty(0)
+    a0 = max(0, bas - pencere + 1)
+    dolgu = np.concatenate([np.zeros(pencere - 1 - (bas - a0)), x[a0:]])
+    return sliding_window_view(dolgu, pencere).sum(axis=-1)
+
+
+def _kategori_adlari(kup):
+    # gunluk_matris'in sütunlarına girecek kategoriler (sıralı); kategorik sütunda yalnızca kodlar taranır
+    if 'Kategori' not in kup.columns:
+        return [KATEGORISIZ]
+    seri = kup['Kategori']
+    if isinstance(seri.dtype, pd.CategoricalDtype):
+        kodlar = np.unique(seri.cat.codes.to_numpy())
+        adlar = {KATEGORISIZ if k < 0 else str(seri.cat.categories[k]) for k in kodlar}
+    else:
+        adlar = set(seri.astype(object).where(seri.notna(), KATEGORISIZ).astype(str))
+    return sorted(adlar)
+
+
+def _artimli_matris(kup, onceki, imzalar):
+    """Önceki matrisin ilk değişen günden önceki satırlarını korur, yalnızca sonrasını küpten kurar.
+
+    Gün imzaları (bkz. ozet_kupu.gun_imzalari) yoksa, ilk gün veya kategori kümesi değiştiyse None döner.
+    """
+    if imzalar is None or onceki.get('imzalar') is None or not len(kup):
+        return None
+    degisen, silinen = degisen_gunler(onceki['imzalar'], imzalar)
+    gunler = pd.date_range(kup['Tarih'].iloc[0], kup['Tarih'].iloc[-1], freq='D', name='Tarih')
+    dokunulan = degisen.union(silinen)
+    ilk = dokunulan[0] if len(dokunulan) else gunler[-1] + pd.Timedelta(days=1)
+    if gunler[0] != onceki['gunler'][0] or ilk <= gunler[0] or _kategori_adlari(kup) != onceki['kategoriler']:
+        return None
+    tutulan = int(onceki['gunler'].searchsorted(ilk))
+    kuyruk = kup.iloc[int(kup['Tarih'].searchsorted(ilk)):]
+    sutunlar = pd.MultiIndex.from_product([TUTAR_SUTUNLARI, onceki['kategoriler']])
+    X = np.empty((len(gunler), len(sutunlar)))
+    X[:tutulan] = onceki['matris'][:tutulan]
+    if len(gunler) > tutulan:
+        X[tutulan:] = (gunluk_matris(kuyruk) if len(kuyruk) else pd.DataFrame(columns=sutunlar, dtype='float64')) \
+            .reindex(index=gunler[tutulan:], columns=sutunlar, fill_value=0).to_numpy(dtype='float64')
+    return gunler, X
+
+
+def anomali_hesapla(kup, onceki=None, pencere=PENCERE_GUN, esik=Z_ESIGI, min_gozlem=MIN_GOZLEM, imzalar=None):
+    """Günlük seride kayan marjları ve Kategori bazında gelir/gider z-skorlarını tek geçişte hesaplar.
+
+    `onceki` aynı defterin daha önceki bir sonucuysa (aynı ilk gün, kategoriler ve ayarlar)
+    yalnızca ilk değişen günden itibaren yeniden hesaplanır; yeni satırlar eklendiğinde maliyet
+    yalnızca yeni günler kadardır. `imzalar` (küpün verisinin gün imzaları) iki sonuçta da
+    varsa gün x kategori matrisi de yalnızca değişen günler için kurulur. Sonuç tam hesapla aynıdır.
+    """
+    ayarlar = (pencere, esik, min_gozlem)
+    artimli = _artimli_matris(kup, onceki, imzalar) if onceki is not None and onceki['ayarlar'] == ayarlar else None
+    if artimli is not None:
+        gunler, X = artimli
+        kategoriler = onceki['kategoriler']
+    else:
+        tablo = gunluk_matris(kup)
+        gunler = tablo.index
+        kategoriler = list(tablo['Gelir'].columns)
+        # Satır toplamlarının toplama sırası bellek düzenine bağlıdır; artımlı yolla aynı (C) düzen kullanılır
+        X = np.ascontiguousarray(tablo.to_numpy(dtype='float64'))
+
+    bas = 0
+    if (onceki is not None and onceki['ayarlar'] == ayarlar and onceki['kategoriler'] == kategoriler
+            and len(onceki['gunler']) and onceki['gunler'][0] == gunler[0]):
+        ortak = min(len(onceki['gunler']), len(gunler))
+        farkli = np.flatnonzero((onceki['matris'][:ortak] != X[:ortak]).any(axis=1))
+        bas = int(farkli[0]) if len(farkli) else ortak
+
+    ort, z = _kayan_z(X, pencere, min_gozlem, bas)
+    gelir, gider = X[:, :len(kategoriler)].sum(axis=1), X[:, len(kategoriler):].sum(axis=1)
+    kayan_gelir, kayan_gider = _kayan_toplam(gelir, pencere, bas), _kayan_toplam(gider, pencere, bas)
+    if bas:
+        ort, z = np.vstack([onceki['ort'][:bas], ort]), np.vstack([onceki['z'][:bas], z])
+        kayan_gelir = np.concatenate([onceki['kayan']['Gelir'].to_numpy()[:bas], kayan_gelir])
+        kayan_gider = np.concatenate([onceki['kayan']['Gider'].to_numpy()[:bas], kayan_gider])
+
+    kayan = pd.DataFrame({'Gelir': kayan_gelir, 'Gider': kayan_gider}, index=gunler)
+    kayan['Net Kar'] = kayan['Gelir'] - kayan['Gider']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        kayan['Kayan Kar Marjı'] = np.where(kayan['Gelir'] > 0, kayan['Net Kar'] / kayan['Gelir'] * 100, np.nan)
+
+    satir, sutun = np.nonzero(np.abs(np.nan_to_num(z)) >= esik)
+    anomaliler = pd.DataFrame({
+        'Tarih': gunler[satir],
+        'Kategori': np.asarray(kategoriler * 2, dtype=object)[sutun],
+        'Ölçü': np.where(sutun < len(kategoriler), 'Gelir', 'Gider'),
+        'Tutar': X[satir, sutun],
+        'Beklenen': ort[satir, sutun],
+        'Z': z[satir, sutun],
+    })
+    return {'gunler': gunler, 'kategoriler': kategoriler, 'matris': X, 'ort': ort, 'z': z, 'ayarlar': ayarlar,
+            'kayan': kayan, 'gun_anomalileri': anomaliler, 'yeniden_hesaplanan_gun': len(gunler) - bas, 'imzalar': imzalar}
+
+
+def donem_degisimleri(kup, siklik='M', pencere=DONEM_PENCERE, esik=Z_ESIGI, min_gozlem=DONEM_MIN_GOZLEM):
+    """Dönem tablosuna önceki döneme göre değişimleri ve gelir/gider z-skorlarını ekler.
+
+    Son dönem veri bitmeden kapanmıyorsa (yarım dönem) anomali sayılmaz.
+    """
+    tablo = donem_tablosu(kup, siklik)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        tablo['Gelir Δ%'] = tablo['Gelir'].pct_change() * 100
+        tablo['Gider Δ%'] = tablo['Gider'].pct_change() * 100
+    tablo['Net Kar Δ'] = tablo['Net Kar'].diff()
+    _, z = _kayan_z(tablo[TUTAR_SUTUNLARI].to_numpy(dtype='float64'), pencere, min_gozlem)
+    tablo['Gelir Z'], tablo['Gider Z'] = z[:, 0], z[:, 1]
+    tablo['Anomali'] = (np.abs(np.nan_to_num(z)) >= esik).any(axis=1) & (tablo.index <= kup['Tarih'].max())
+    return tablo.replace([np.inf, -np.inf], np.nan)
+
+
+def anomali_uyarilari(sonuc, donem, siklik='M', baslangic=None, bitis=None, pencere=PENCERE_GUN, kar_marji=None):
+    """Panelin uyarı alanında gösterilecek kısa mesajlar (yalnızca görünümün son günlerine/dönemine dair)."""
+    uyarilar = []
+    kayan = sonuc['kayan']
+    son_gun = min(pd.Timestamp(bitis), kayan.index[-1]) if bitis is not None else kayan.index[-1]
+    son_marj = kayan['Kayan Kar Marjı'].get(son_gun)
+    # Toplam marj zaten kritik eşiğin altındaysa panel bunu ayrıca gösteriyor
+    if son_marj is not None and not np.isnan(son_marj) and son_marj < KRITIK_KAR_MARJI and (kar_marji is None or kar_marji >= KRITIK_KAR_MARJI):
+        uyarilar.append(f"📉 Son {pencere} günün kayan kar marjı %{son_marj:.1f}; toplam marj iyi görünse de son dönemde %{KRITIK_KAR_MARJI}'in altına indi.")
+
+    gunluk = sonuc['gun_anomalileri']
+    yakin = gunluk[(gunluk['Tarih'] > son_gun - pd.Timedelta(days=pencere)) & (gunluk['Tarih'] <= son_gun)]
+    if baslangic is not None:
+        yakin = yakin[yakin['Tarih'] >= pd.Timestamp(baslangic)]
+    if not yakin.empty:
+        en_guclu = yakin.loc[yakin['Z'].abs().idxmax()]
+        yon = "üzerinde" if en_guclu['Z'] > 0 else "altında"
+        uyarilar.append(f"🔎 Son {pencere} günde {len(yakin)} olağan dışı hareket. En belirgini: '{en_guclu['Kategori']}' "
+                        f"{en_guclu['Ölçü'].lower()}i {en_guclu['Tarih']:%d.%m.%Y} tarihinde beklenenin "
+                        f"{abs(en_guclu['Z']):.1f} standart sapma {yon}.")
+
+    kapanan = donem[donem.index <= son_gun]
+    if not kapanan.empty and kapanan['Anomali'].iloc[-1]:
+        son = kapanan.iloc[-1]
+        olcu = 'Gelir' if abs(np.nan_to_num(son['Gelir Z'])) >= abs(np.nan_to_num(son['Gider Z'])) else 'Gider'
+        yon = "yüksek" if son[f'{olcu} Z'] > 0 else "düşük"
+        uyarilar.append(f"📊 Son kapanan {SIKLIKLAR[siklik].lower()} dönemde ({kapanan.index[-1]:%d.%m.%Y}) {olcu.lower()} "
+                        f"önceki {DONEM_PENCERE} döneme göre olağan dışı {yon} (z={son[f'{olcu} Z']:.1f}).")
+    return uyarilar
@@ -1,19 +1,29 @@
 # KazKaz AI Finansal Danışman v2.0 - Gelişmiş ve Katmanlı Yetenekler
 import streamlit as st
 import pandas as pd
-import firebase_admin
-from firebase_admin import credentials, auth, firestore
-from prophet import Prophet
-from prophet.plot import plot_plotly
-import google.generativeai as genai
-import plotly.graph_objects as go
-import plotly.express as px
-from fpdf import FPDF
+import plotly.graph_objects as go  # Streamlit zaten yükler; ek maliyeti yoktur
 import io
 import time
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-import os # YENİ: Font yolu için os modülü eklendi
+import uuid
+# Firebase, Google Sheets, Prophet, Gemini ve PDF kütüphaneleri ilk kullanımda yüklenir (bagimliliklar.py)
+from bagimliliklar import (firebase_admin, firebase_auth, firebase_credentials, firestore, gspread,
+                           plan_modullerini_isit, service_account_credentials)
+from onbellek import BELLEK_BUTCESI, YUKLEME_ONBELLEGI, bayt_parmak_izi, cerceve_paylas, veri_parmak_izi
+from veri_yukleme import dosya_yukle, tablo_dogrula
+from analiz_motoru import anomali_getir, calistir_analiz, detay_grafigi, grafik_getir, kayan_marj_grafigi, kirilim_serileri, kup_getir
+from anomali_motoru import KRITIK_KAR_MARJI, PENCERE_GUN, Z_ESIGI, anomali_uyarilari
+from senaryo_motoru import TUM_GIDERLER, VARSAYILAN_UFUK, VARSAYILAN_YOL, nakit_yelpaze_grafigi, pist_grafigi, senaryo_getir
+from tahmin_motoru import ayarlari_sabitle, prophet_tahmini_yap, tahmin_anahtari, tahmin_grafigi, tahmin_isi, toplu_tahmin, toplu_tahmin_grafigi, toplu_tahmin_isi
+from yorum_servisi import (YORUM_HATA_MESAJI, TAHMIN_YORUM_HATA_MESAJI, arka_uc_sec, onbellekten,
+                           tahmin_yorum_istemi, yorum_istemi, yorumlari_uret)
+from is_kuyrugu import ZAMANLAYICI, KuyrukDolu, plan_onceligi
+from rapor import PDF_ONBELLEGI, font_mevcut, pdf_isi_baslat, rapor_hazirla
+from sheets_senkron import sayfa_senkronize, yerel_istemci
+from ozet_kupu import SIKLIKLAR
+from grafik_inceltme import HEDEF_NOKTA
+from kullanici_servisi import geri_bildirim_tamponu, plan_guncelle, profil_getir
+from veri_deposu import DEPO_AKTIF, depo_aylari, depo_ozeti, depodan_oku, depoya_yaz, depoyu_temizle
+from izleme import METRIKLER, aktif_iz, asama, iz_baslat, prometheus_sunucusu_baslat, yonetici_mi
 
 # --- Sayfa Yapılandırması ve Stil ---
 st.set_page_config(page_title="KazKaz Finansal Danışman", layout="wide", initial_sidebar_state="auto")
@@ -38,14 +48,14 @@ def init_firebase():
     """Firebase bağlantısını güvenli bir şekilde başlatır."""
     try:
         cred_dict = st.secrets["firebase"]
-        cred = credentials.Certificate(cred_dict)
+        cred = firebase_credentials().Certificate(cred_dict)
     except Exception:
         try:
-            cred = credentials.Certificate("firebase-key.json")
+            cred = firebase_credentials().Certificate("firebase-key.json")
         except FileNotFoundError:
             return None
-    if not firebase_admin._apps:
-        firebase_admin.initialize_app(cred)
+    if not firebase_admin()._apps:
+        firebase_admin().initialize_app(cred)
     return True
 
 def get_gemini_api_key():
@@ -58,11 +68,14 @@ def get_gemini_api_key():
 @st.cache_resource
 def init_gspread():
     """Google Sheets API bağlantısını başlatır."""
+    istemci = yerel_istemci()  # KAZKAZ_SHEETS_ISTEMCISI=yerel ise ağa çıkılmaz
+    if istemci is not None:
+        return istemci
     try:
         creds_json = st.secrets["gcp_service_account"]
         scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(creds_json, scope)
-        client = gspread.authorize(creds)
+        creds = service_account_credentials().from_json_keyfile_dict(creds_json, scope)
+        client = gspread().authorize(creds)
         return client
     except Exception:
         st.sidebar.error("Google Sheets bağlantısı için 'gcp_service_account' secret'ı bulunamadı.")
@@ -70,46 +83,73 @@ def init_gspread():
 
 # --- VERİ YÜKLEME VE DOĞRULAMA FONKSİYONLARI ---
 # ... (Bu bölümde değişiklik yok) ...
-def load_from_gsheets(client, url):
-    """Google Sheets URL'sinden veri yükler ve DataFrame'e çevirir."""
+def load_from_gsheets(client, url, tam=False):
+    """Google Sheets URL'sinden veriyi artımlı olarak çeker; (DataFrame veya hata mesajı, yeni satır sayısı) döndürür.
+
+    Senkronizasyon sheets_senkron.py içindedir: değişmeyen sayfa API'ye değer sorgusu
+    yapmadan, büyüyen sayfa yalnızca yeni satırları okuyarak döner.
+    """
     try:
-        sheet = client.open_by_url(url).sheet1
-        data = sheet.get_all_records()
-        return pd.DataFrame(data)
-    except gspread.exceptions.SpreadsheetNotFound:
-        return "Hata: Google Sheet bulunamadı. URL'yi veya paylaşım ayarlarını kontrol edin."
+        with asama('sheets', detay='tam' if tam else 'artimli') as kayit:
+            df, yeni = sayfa_senkronize(client, url, tam=tam)
+            kayit.satir = yeni
+        return df, yeni
+    except gspread().exceptions.SpreadsheetNotFound:  # yalnızca hata olduğunda değerlendirilir
+        return "Hata: Google Sheet bulunamadı. URL'yi veya paylaşım ayarlarını kontrol edin.", 0
     except Exception as e:
-        return f"Hata: Veri okunurken bir sorun oluştu: {str(e)}"
+        return f"Hata: Veri okunurken bir sorun oluştu: {str(e)}", 0
+
+def depoya_kaydet(uid, df, kaynak, icerik_anahtari=None):
+    """Kaynağın (dosya adı / Sheets URL'si) satırlarını depoda o kaynağın önceki sürümünün yerine yazar.
+
+    Panel yalnızca bu kaynağı analiz eder; tüm kaynakların birleşimi "Kayıtlı Verilerim" ile seçilir.
+    """
+    if not DEPO_AKTIF:
+        return
+    with asama('depo_yazma', satir=len(df)):
+        degisen = depoya_yaz(uid, df, kaynak, icerik_anahtari)
+    if degisen:
+        st.toast(f"Kayıtlı verileriniz güncellendi ({degisen:,} satır değişti).", icon="💾")
+
+def depodan_oku_izli(uid, aylar=None, kaynak=None):
+    """depodan_oku'yu 'depo_okuma' aşaması olarak ölçer."""
+    with asama('depo_okuma') as kayit:
+        df = depodan_oku(uid, aylar, kaynak)
+        kayit.satir = None if df is None else len(df)
+    return df
 
 def validate_and_load_data(source, input_data):
-    """Veriyi yükler, doğrular ve hataları yönetir."""
-    df = None
+    """Veriyi yükler, doğrular ve hataları yönetir.
+
+    Tip dönüşümleri, tarih formatı tespiti ve büyük dosyaların parçalı okunması veri_yukleme.py içindedir.
+    """
+    onbellek_anahtari = None
     try:
         if source == "Dosya Yükle":
-            if input_data.name.endswith('.csv'):
-                df = pd.read_csv(input_data)
-            elif input_data.name.endswith(('.xls', '.xlsx')):
-                df = pd.read_excel(input_data)
+            # Aynı dosya her yeniden çalıştırmada tekrar ayrıştırılmasın
+            onbellek_anahtari = (input_data.name, bayt_parmak_izi(input_data.getvalue()))
+            onbellekteki_df = YUKLEME_ONBELLEGI.get(onbellek_anahtari)
+            if onbellekteki_df is not None:
+                return onbellekteki_df, None
+            with asama('veri_yukleme', detay=input_data.name) as kayit:
+                df, error_msg = dosya_yukle(input_data)
+                kayit.satir = None if df is None else len(df)
         elif source == "Google Sheets":
             if isinstance(input_data, pd.DataFrame):
-                df = input_data
+                with asama('dogrulama', satir=len(input_data)):
+                    df, error_msg = tablo_dogrula(input_data)
             else: # Hata mesajı geldi
                 st.error(input_data)
                 return None, input_data
 
-        required_columns = ['Tarih', 'Gelir', 'Gider']
-        missing_cols = [col for col in required_columns if col not in df.columns]
-        if missing_cols:
-            error_msg = f"Hata: Yüklenen veride şu sütunlar eksik: {', '.join(missing_cols)}"
-            st.error(error_msg)
-            return None, error_msg
-
-        df['Tarih'] = pd.to_datetime(df['Tarih'], errors='coerce')
-        if df['Tarih'].isnull().any():
-            error_msg = "Hata: 'Tarih' sütunundaki bazı değerler anlaşılamadı. Lütfen 'YYYY-MM-DD' formatını kullanın."
+        if error_msg:
             st.error(error_msg)
             return None, error_msg
 
+        # Aynı içeriği yükleyen oturumlar tek bir (kompakt) tabloyu paylaşır
+        df = cerceve_paylas(df)
+        if onbellek_anahtari is not None:
+            YUKLEME_ONBELLEGI.set(onbellek_anahtari, df)
         return df, None
 
     except Exception as e:
@@ -118,45 +158,7 @@ def validate_and_load_data(source, input_data):
         return None, error_msg
 
 # --- TÜM ANALİZ VE GRAFİK FONKSİYONLARI ---
-# ... (calistir_analiz, create_gauge_chart, prophet_tahmini_yap, yorum_uret, tahmin_yorumu_uret fonksiyonlarında değişiklik yok) ...
-def calistir_analiz(df):
-    """Tüm finansal metrikleri ve analiz verilerini tek seferde hesaplar."""
-    if df.empty: return {"hata": "Veri bulunamadı."}
-    try:
-        analiz = {}
-        df['Gelir'] = pd.to_numeric(df['Gelir'], errors='coerce').fillna(0)
-        df['Gider'] = pd.to_numeric(df['Gider'], errors='coerce').fillna(0)
-        
-        analiz['toplam_gelir'] = df['Gelir'].sum()
-        analiz['toplam_gider'] = df['Gider'].sum()
-        analiz['net_kar'] = analiz['toplam_gelir'] - analiz['toplam_gider']
-        
-        gider_kategorileri = df[df['Gider'] > 0].groupby('Kategori')['Gider'].sum()
-        analiz['en_yuksek_gider_kategorisi'] = gider_kategorileri.idxmax() if not gider_kategorileri.empty else "N/A"
-        analiz['kar_marji'] = (analiz['net_kar'] / analiz['toplam_gelir'] * 100) if analiz['toplam_gelir'] > 0 else 0
-        
-        analiz['aylik_veri'] = df.set_index('Tarih').resample('M').agg({'Gelir': 'sum', 'Gider': 'sum'})
-        analiz['aylik_veri']['Net Kar'] = analiz['aylik_veri']['Gelir'] - analiz['aylik_veri']['Gider']
-        analiz['aylik_veri']['Kar Marjı'] = (analiz['aylik_veri']['Net Kar'] / analiz['aylik_veri']['Gelir'] * 100).fillna(0)
-        
-        analiz['top_urunler'] = df[df['Gelir'] > 0].groupby('Satilan_Urun_Adi')['Gelir'].sum().nlargest(5) if 'Satilan_Urun_Adi' in df.columns else pd.Series()
-        analiz['gider_dagilimi'] = gider_kategorileri
-        
-        analiz['fig_bar'] = px.bar(analiz['aylik_veri'], x=analiz['aylik_veri'].index, y=['Gelir', 'Gider'], title="Aylık Gelir & Gider", barmode='group')
-        analiz['fig_line'] = px.line(analiz['aylik_veri'], x=analiz['aylik_veri'].index, y='Net Kar', title="Aylık Net Kâr Trendi", markers=True)
-        if not analiz['top_urunler'].empty:
-            analiz['fig_urun'] = px.bar(analiz['top_urunler'], x='Gelir', y=analiz['top_urunler'].index, orientation='h', title="En Çok Gelir Getirenler")
-        else:
-            analiz['fig_urun'] = None
-        analiz['fig_marj'] = px.area(analiz['aylik_veri'], x=analiz['aylik_veri'].index, y='Kar Marjı', title="Aylık Kar Marjı (%) Trendi", markers=True)
-        if not analiz['gider_dagilimi'].empty:
-            analiz['fig_pie'] = px.pie(analiz['gider_dagilimi'], names=analiz['gider_dagilimi'].index, values=analiz['gider_dagilimi'].values, title="Gider Dağılımı", hole=.4)
-        else:
-            analiz['fig_pie'] = None
-            
-        return analiz
-    except Exception as e: return {"hata": str(e)}
-
+# calistir_analiz ve grafik üreticileri analiz_motoru.py içindedir (önbellekli).
 def create_gauge_chart(score, title):
     """Finansal Sağlık Skoru için gauge chart oluşturur."""
     fig = go.Figure(go.Indicator(
@@ -167,292 +169,361 @@ def create_gauge_chart(score, title):
     fig.update_layout(paper_bgcolor = "#0f172a", font = {'color': "white"})
     return fig
 
-def prophet_tahmini_yap(aylik_gelir):
-    """Prophet modeli ile tahmin yapar."""
-    if len(aylik_gelir) < 2: return None, None
-    prophet_df = aylik_gelir.reset_index().rename(columns={'Tarih': 'ds', 'Gelir': 'y'})
-    model = Prophet(yearly_seasonality=True, weekly_seasonality=False, daily_seasonality=False)
-    model.fit(prophet_df)
-    future = model.make_future_dataframe(periods=3, freq='M')
-    forecast = model.predict(future)
-    return model, forecast
-
-def yorum_uret(api_key, prompt_data):
-    """AI Danışman için kısa yorumlar üretir."""
-    try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        prompt = f"Sen deneyimli bir finansal danışmansın. Şu verilere dayanarak, 1-2 cümlelik kısa ve öz bir yorum yap: {prompt_data}"
-        response = model.generate_content(prompt)
-        return response.text
-    except Exception: return "AI yorumu şu anda kullanılamıyor."
-
-def tahmin_yorumu_uret(api_key, forecast_df):
-    """Prophet tahmin sonuçlarını alıp, aktüeryal bir bakış açısıyla profesyonel bir stratejik yorum üretir."""
-    try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        son_tahmin = forecast_df.iloc[-1]
-        onceki_tahmin = forecast_df.iloc[-4]
-        trend = "Yükselişte" if son_tahmin['yhat'] > onceki_tahmin['yhat'] else "Düşüşte veya Durgun"
-        belirsizlik_araligi = son_tahmin['yhat_upper'] - son_tahmin['yhat_lower']
-        prompt = f"""
-        Sen, aktüerya ve risk yönetimi konusunda uzman, profesyonel bir finansal stratejistsin.
-        Aşağıdaki gelecek tahmini verilerini analiz et ve stratejik bir yorum yaz. Yorumun şunları içermeli:
-        1. Tahminin ana yönü (trend) hakkında bir değerlendirme.
-        2. Tahmindeki belirsizlik aralığına (volatilite) dayalı bir risk analizi.
-        3. Bu öngörülere dayanarak şirketin atması gereken 1-2 adet stratejik adım.
-        Tonun profesyonel, analitik ve yol gösterici olmalı.
-
-        Veriler:
-        - Gelecek 3 Aylık Gelir Tahmini Trendi: {trend}
-        - Son Tahmin Edilen Gelir (yhat): {son_tahmin['yhat']:.2f} TL
-        - Tahmin Güven Aralığı (En Kötü Senaryo - yhat_lower): {son_tahmin['yhat_lower']:.2f} TL
-        - Tahmin Güven Aralığı (En İyi Senaryo - yhat_upper): {son_tahmin['yhat_upper']:.2f} TL
-        - Belirsizlik Aralığı Genişliği: {belirsizlik_araligi:.2f} TL (Bu değerin yüksekliği, tahminin daha az kesin olduğunu ve riskin arttığını gösterir.)
-        """
-        response = model.generate_content(prompt)
-        return response.text
-    except Exception: return "Stratejik tahmin yorumu şu anda üretilemiyor. Lütfen API anahtarınızı kontrol edin."
+# yorum_uret ve tahmin_yorumu_uret yorum_servisi.py içindedir (eşzamanlı, önbellekli).
 
 
 # --- PDF BÖLÜMÜ GÜNCELLEMESİ ---
-class PDF(FPDF):
-    def header(self):
-        # GÜNCELLENDİ: Unicode fontu kullan
-        self.set_font('DejaVu', 'B', 15)
-        self.cell(0, 10, 'KazKaz AI Finansal Analiz Raporu', 0, 1, 'C')
-        self.ln(10)
-
-    def chapter_title(self, title):
-        # GÜNCELLENDİ: Unicode fontu kullan
-        self.set_font('DejaVu', 'B', 12)
-        self.cell(0, 10, title, 0, 1, 'L')
-        self.ln(4)
-
-    def chapter_body(self, body):
-        # GÜNCELLENDİ: Unicode fontu kullan
-        self.set_font('DejaVu', '', 10)
-        self.multi_cell(0, 5, body)
-        self.ln()
-        
-    def add_metric(self, label, value):
-        # GÜNCELLENDİ: Unicode fontu kullan
-        self.set_font('DejaVu', 'B', 10)
-        self.cell(95, 8, label, 1, 0, 'L')
-        self.set_font('DejaVu', '', 10)
-        # GÜNCELLENDİ: Hataları önlemek için değeri string'e çevir
-        self.cell(95, 8, str(value), 1, 1, 'R')
-
-def generate_pdf_report(analiz, stratejik_yorum=None, forecast_fig=None):
-    pdf = PDF()
-    
-    # YENİ: Unicode fontunu FPDF'e ekle
-    # Bu satırın çalışması için DejaVuSans.ttf dosyasının
-    # projenizin ana klasöründe olması gerekir.
-    try:
-        font_path = os.path.join(os.path.dirname(__file__), "DejaVuSans.ttf")
-        pdf.add_font("DejaVu", "", font_path, uni=True)
-        pdf.add_font("DejaVu", "B", font_path, uni=True) # Kalın (Bold) versiyonu için
-    except FileNotFoundError:
-        st.error("PDF Raporu için 'DejaVuSans.ttf' font dosyası bulunamadı. Lütfen fontu proje klasörüne ekleyin.")
-        return None # Font yoksa PDF oluşturmayı durdur
-        
-    pdf.add_page()
-
-    # Genel Bakış
-    pdf.chapter_title('Genel Finansal Durum')
-    pdf.add_metric('Toplam Gelir:', f"{analiz['toplam_gelir']:,.2f} TL")
-    pdf.add_metric('Toplam Gider:', f"{analiz['toplam_gider']:,.2f} TL")
-    pdf.add_metric('Net Kar:', f"{analiz['net_kar']:,.2f} TL")
-    pdf.add_metric('Kar Marjı:', f"{analiz['kar_marji']:.2f}%")
-    pdf.add_metric('En Yüksek Gider Kategorisi:', analiz['en_yuksek_gider_kategorisi'])
-    pdf.ln(10)
-
-    # Grafikleri resim olarak kaydet ve ekle
-    image_files = []
-    try:
-        for name, fig in analiz.items():
-            if name.startswith("fig_") and fig:
-                filename = f"temp_{name}.png"
-                fig.write_image(filename, scale=2)
-                image_files.append(filename)
-                
-                if name == "fig_bar": pdf.chapter_title('Aylık Gelir & Gider')
-                if name == "fig_line": pdf.chapter_title('Aylık Net Kar Trendi')
-                if name == "fig_pie": pdf.chapter_title('Gider Dağılımı')
-                
-                pdf.image(filename, x=None, y=None, w=180)
-                pdf.ln(5)
-
-        # Tahmin Grafiği
-        if forecast_fig:
-            filename = "temp_forecast.png"
-            forecast_fig.write_image(filename, scale=2)
-            image_files.append(filename)
-            pdf.chapter_title('Gelecek Gelir Tahmini')
-            pdf.image(filename, x=None, y=None, w=180)
-            pdf.ln(5)
-
-        # Stratejik Yorum
-        if stratejik_yorum:
-            pdf.chapter_title('Stratejik Tahmin Analizi')
-            pdf.chapter_body(stratejik_yorum)
-
-    finally:
-        # Geçici resim dosyalarını sil
-        for f in image_files:
-            if os.path.exists(f):
-                os.remove(f)
-    
-    # GÜNCELLENDİ: PDF çıktısını hatasız almak için 'latin-1' yerine 'utf-8' denenebilir
-    # Ancak FPDF'in standart çıktısı genellikle 'latin-1' ile uyumludur.
-    return bytes(pdf.output(dest='S'))
+# PDF sınıfı, generate_pdf_report ve tahmin + yorum + PDF akışı (rapor_hazirla) rapor.py içindedir;
+# aynı akış toplu_rapor.py ile Streamlit dışında da çalıştırılır.
+
+@st.fragment(run_every=1)
+def is_durumu_goster(is_):
+    """Zamanlayıcıdaki işin sıradaki yerini veya ilerlemesini gösterir; iş bitince sayfayı yeniler."""
+    if is_.bitti():
+        st.rerun()
+    st.progress(is_.ilerleme, text=is_.durum_metni())
+
+
+def oturum_kimligi():
+    """Zamanlayıcıda işlerin sahibi olarak kullanılan, oturuma özgü kimlik."""
+    return st.session_state.setdefault('oturum_kimligi', uuid.uuid4().hex)
 
 
 # --- Geri kalan kodda değişiklik yok ---
 # YENİ: Geri Bildirim Kaydetme Fonksiyonu
 def log_feedback(db, user_id, feedback_value, yorum):
-    """Kullanıcı geri bildirimini Firestore'a kaydeder."""
-    feedback_ref = db.collection('feedback').document()
-    feedback_ref.set({
+    """Kullanıcı geri bildirimini Firestore'a kaydeder.
+
+    Yazım tıklamayı bekletmez: belge sıraya alınır ve arka planda toplu olarak gönderilir (kullanici_servisi.py).
+    'timestamp' tıklama anıdır (tampon sıraya alırken ekler); 'yazim_zamani' Firestore'a yazıldığı andır.
+    """
+    geri_bildirim_tamponu(db).ekle({
         'user_id': user_id,
         'feedback': feedback_value,
         'yorum': yorum,
-        'timestamp': firestore.SERVER_TIMESTAMP
+        'yazim_zamani': firestore().SERVER_TIMESTAMP
     })
     st.toast(f"Geri bildiriminiz için teşekkürler!", icon="✅")
 
 # --- ARAYÜZ GÖSTERİM FONKSİYONLARI ---
 
+def sekme_acik(tab):
+    """Sekmenin şu an seçili olup olmadığını döndürür (eski Streamlit sürümlerinde hep True)."""
+    return getattr(tab, 'open', True) is not False
+
 def show_dashboard(user_info, api_key, db):
     subscription_plan = user_info.get('subscription_plan', 'Temel')
+    # Ağır işler (tahmin, PDF) paylaşılan kuyrukta plan önceliğiyle sıraya girer
+    oncelik, oturum = plan_onceligi(subscription_plan), oturum_kimligi()
     st.sidebar.success(f"Aktif Paketiniz: **{subscription_plan}**")
 
     st.sidebar.header("1. Veri Kaynağınızı Seçin")
-    data_source_option = st.sidebar.selectbox("Veri Kaynağı", ["Dosya Yükle", "Google Sheets ile Bağlan"])
+    kayitli_satir, kayitli_ay = depo_ozeti(user_info['uid'])
+    veri_kaynaklari = ["Dosya Yükle", "Google Sheets ile Bağlan"]
+    if kayitli_satir:
+        # Geri dönen kullanıcı dosyasını yeniden yüklemeden kayıtlı verisiyle başlar
+        veri_kaynaklari.insert(0, "Kayıtlı Verilerim")
+    data_source_option = st.sidebar.selectbox("Veri Kaynağı", veri_kaynaklari)
     
     df = None
     input_data = None
 
-    if data_source_option == "Dosya Yükle":
+    if data_source_option == "Kayıtlı Verilerim":
+        aylar = depo_aylari(user_info['uid'])
+        ay_araligi = (aylar[0], aylar[-1])
+        if len(aylar) > 1:
+            ay_araligi = st.sidebar.select_slider("Analiz edilecek aylar", options=aylar, value=ay_araligi)
+        # Yalnızca seçilen ay bölümleri diskten okunur
+        df = depodan_oku_izli(user_info['uid'], ay_araligi)
+    elif data_source_option == "Dosya Yükle":
         input_data = st.sidebar.file_uploader("CSV veya Excel dosyanızı yükleyin", type=["csv", "xlsx", "xls"])
         if input_data:
             df, error = validate_and_load_data("Dosya Yükle", input_data)
+            if df is not None:
+                depoya_kaydet(user_info['uid'], df, input_data.name, bayt_parmak_izi(input_data.getvalue()))
     elif data_source_option == "Google Sheets ile Bağlan":
         gspread_client = init_gspread()
         if gspread_client:
             gsheet_url = st.sidebar.text_input("Google Sheet URL'sini yapıştırın")
+            tam_senkron = st.sidebar.checkbox("Sayfayı baştan oku", help="Eski satırlarda düzenleme yaptıysanız işaretleyin.")
             if st.sidebar.button("Veriyi Çek"):
                 with st.spinner("Google Sheets verisi okunuyor..."):
-                    gsheet_data = load_from_gsheets(gspread_client, gsheet_url)
+                    gsheet_data, _ = load_from_gsheets(gspread_client, gsheet_url, tam=tam_senkron)
                     df, error = validate_and_load_data("Google Sheets", gsheet_data)
+                    # Senkron farkı sayfanın süreç geneli önbelleğine göredir (başka bir kullanıcı çekmiş olabilir);
+                    # bu kullanıcının deposunun güncel olup olmadığına içerik anahtarıyla depoya_yaz karar verir
+                    if df is not None:
+                        depoya_kaydet(user_info['uid'], df, gsheet_url, veri_parmak_izi(gsheet_data))
+            elif gsheet_url and kayitli_satir:
+                # Çekilen sayfa depoya yazıldığı için sonraki yeniden çalıştırmalarda da panel görünür kalır
+                df = depodan_oku_izli(user_info['uid'], kaynak=gsheet_url)
+
+    if kayitli_satir:
+        st.sidebar.caption(f"💾 Kayıtlı veri: {kayitli_satir:,} satır, {kayitli_ay} ay")
+        if st.sidebar.button("Kayıtlı verilerimi sil"):
+            depoyu_temizle(user_info['uid'])
+            st.rerun()
 
     if df is None:
         st.info("Lütfen analize başlamak için kenar çubuğundan geçerli bir veri kaynağı sağlayın.")
         return
 
+    # Görünüm değişiklikleri ham satırları değil, veri başına bir kez kurulan günlük özet küpünü tarar;
+    # kullanıcının verisi yenilendiğinde küp yalnızca eklenen/değişen günler için güncellenir
+    st.sidebar.header("2. Görünüm")
+    siklik = st.sidebar.selectbox("Dönem", list(SIKLIKLAR), index=list(SIKLIKLAR).index('M'), format_func=SIKLIKLAR.get)
+    kup = kup_getir(df, kaynak=user_info['uid'])
+    ilk_gun, son_gun = kup['Tarih'].min().date(), kup['Tarih'].max().date()
+    tarih_araligi = st.sidebar.date_input("Tarih aralığı", value=(ilk_gun, son_gun), min_value=ilk_gun, max_value=son_gun)
+    baslangic = tarih_araligi[0] if len(tarih_araligi) > 0 and tarih_araligi[0] != ilk_gun else None
+    bitis = tarih_araligi[1] if len(tarih_araligi) > 1 and tarih_araligi[1] != son_gun else None
+    # Uzun seriler görünüm başına inceltilir; tarih aralığını daraltmak yakınlaştırma gibi tam çözünürlüğe döner
+    tam_cozunurluk = st.sidebar.checkbox("Tam çözünürlük", help="Tüm noktaları gönderir (WebGL); uzun serilerde sayfa yavaşlayabilir.")
+
     st.title(f"🚀 {subscription_plan} Finansal Analiz Paneli")
-    analiz = calistir_analiz(df)
+    analiz = calistir_analiz(df, siklik, baslangic, bitis)
     if "hata" in analiz:
         st.error(f"Analiz hatası: {analiz['hata']}"); return
+    # Tahmin motoru seri başına bir kez seçilir; sekme, PDF ve senaryo aynı ayarları (ve önbellek anahtarını) kullanır
+    tahmin_ayarlari = ayarlari_sabitle(analiz['aylik_veri'])
 
     if subscription_plan == 'Uzman':
-        st.sidebar.header("2. Raporlama")
-        
-        # PDF oluşturmak için gerekli tüm verileri topla
-        model, tahmin = prophet_tahmini_yap(analiz['aylik_veri'])
-        forecast_fig = None
-        stratejik_yorum = "Tahmin için yeterli veri yok."
-        if model and tahmin is not None:
-            forecast_fig = plot_plotly(model, tahmin, xlabel="Tarih", ylabel="Gelir")
-            if api_key:
-                stratejik_yorum = tahmin_yorumu_uret(api_key, tahmin)
-
-        pdf_bytes = generate_pdf_report(analiz, stratejik_yorum, forecast_fig)
-        if pdf_bytes: # Sadece PDF başarıyla oluşturulduysa butonu göster
+        st.sidebar.header("3. Raporlama")
+
+        # PDF yalnızca istendiğinde arka planda üretilir; aynı veri/tahmin için sonuç önbellekten gelir
+        tahmin_kimligi = tahmin_anahtari(analiz['aylik_veri'], tahmin_ayarlari) if len(analiz['aylik_veri']) >= 2 else None
+        rapor_anahtari = (analiz['parmak_izi'], tahmin_kimligi, bool(api_key))
+        pdf_bytes = PDF_ONBELLEGI.get(rapor_anahtari)
+        pdf_isi = st.session_state.get('pdf_isi')
+        if pdf_isi is not None and pdf_isi.anahtar != rapor_anahtari:
+            pdf_isi = st.session_state.pdf_isi = None  # Veri değişti; eski iş artık geçerli değil
+
+        if not font_mevcut():
+            st.sidebar.error("PDF Raporu için 'DejaVuSans.ttf' font dosyası bulunamadı. Lütfen fontu proje klasörüne ekleyin.")
+        elif pdf_bytes: # Sadece PDF başarıyla oluşturulduysa butonu göster
             st.sidebar.download_button(
                 label="PDF Raporu İndir",
                 data=pdf_bytes,
                 file_name=f"KazKaz_Finansal_Rapor_{time.strftime('%Y%m%d')}.pdf",
                 mime="application/pdf"
             )
+        elif pdf_isi is not None and not pdf_isi.bitti():
+            ZAMANLAYICI.sahiplen(pdf_isi, oturum)
+            with st.sidebar:
+                is_durumu_goster(pdf_isi)
+        else:
+            if pdf_isi is not None:
+                try:
+                    pdf_isi.sonuc()
+                    st.sidebar.error("PDF raporu oluşturulamadı.")
+                except Exception as e:
+                    st.sidebar.error(f"PDF raporu oluşturulurken hata oluştu: {e}")
+            if st.sidebar.button("PDF Raporu Oluştur"):
+                try:
+                    st.session_state.pdf_isi = pdf_isi_baslat(rapor_anahtari, lambda ilerleme: rapor_hazirla(analiz, api_key, ilerleme, tahmin_ayarlari), oncelik, oturum)
+                    st.rerun()
+                except KuyrukDolu as e:
+                    st.sidebar.warning(str(e))
 
-    if analiz['kar_marji'] < 15:
-        st.warning(f"⚠️ Kritik Eşik Uyarısı: Kar marjınız (%{analiz['kar_marji']:.2f}) %15'in altında. Maliyetleri gözden geçirin.", icon="🚨")
+    if analiz['kar_marji'] < KRITIK_KAR_MARJI:
+        st.warning(f"⚠️ Kritik Eşik Uyarısı: Kar marjınız (%{analiz['kar_marji']:.2f}) %{KRITIK_KAR_MARJI}'in altında. Maliyetleri gözden geçirin.", icon="🚨")
+    # Kayan metrikler tüm veri üzerinde bir kez (yeni satırlarda artımlı) hesaplanır; uyarılar görünümün sonuna bakar
+    anomali, anomali_donem = anomali_getir(df, siklik, kaynak=user_info['uid'])
+    for uyari in anomali_uyarilari(anomali, anomali_donem, siklik, baslangic, bitis, kar_marji=analiz['kar_marji']):
+        st.warning(uyari, icon="🚨")
 
     tabs = ["Genel Bakış"]
     if subscription_plan in ['Pro', 'Uzman']:
-        tabs.extend(["Gelir Analizi", "Gider Analizi"])
+        tabs.extend(["Gelir Analizi", "Gider Analizi", "Anomaliler"])
     if subscription_plan == 'Uzman':
         tabs.append("Gelecek Tahmini")
 
-    tab_objects = st.tabs(tabs)
+    # Sekme değişimi yeniden çalıştırma tetikler; böylece yalnızca açık sekmenin grafikleri üretilir
+    tab_objects = st.tabs(tabs, key="panel_sekmesi", on_change="rerun")
+
+    # AI yorumları sekmeler çizilirken yalnızca yer tutucu olarak toplanır, sayfa sonunda
+    # hepsi aynı anda istenir ve parçalar geldikçe yerlerine akıtılır.
+    yorum_arka_ucu = arka_uc_sec(api_key)
+    yorum_istekleri = {}
 
-    with tab_objects[0]:
-        st.header("Genel Finansal Durum")
-        skor = max(0, min(100, analiz['kar_marji'] * 2.5))
-        st.plotly_chart(create_gauge_chart(skor, "Finansal Sağlık Skoru"), use_container_width=True)
-        col1, col2 = st.columns(2)
-        with col1:
-            st.plotly_chart(analiz['fig_bar'], use_container_width=True)
-        with col2:
-            st.plotly_chart(analiz['fig_line'], use_container_width=True)
+    if sekme_acik(tab_objects[0]):
+        with tab_objects[0]:
+            st.header("Genel Finansal Durum")
+            skor = max(0, min(100, analiz['kar_marji'] * 2.5))
+            st.plotly_chart(create_gauge_chart(skor, "Finansal Sağlık Skoru"), use_container_width=True)
+            col1, col2 = st.columns(2)
+            with col1:
+                st.plotly_chart(grafik_getir(analiz, 'fig_bar', tam_cozunurluk), use_container_width=True)
+            with col2:
+                st.plotly_chart(grafik_getir(analiz, 'fig_line', tam_cozunurluk), use_container_width=True)
+            if not tam_cozunurluk and len(analiz['donem_veri']) > HEDEF_NOKTA:
+                st.caption(f"📉 {len(analiz['donem_veri']):,} dönemlik seriler ~{HEDEF_NOKTA:,} noktaya inceltildi. "
+                           "Ayrıntı için tarih aralığını daraltın veya 'Tam çözünürlük'ü açın.")
 
-    if 'Gelir Analizi' in tabs:
+    if 'Gelir Analizi' in tabs and sekme_acik(tab_objects[tabs.index('Gelir Analizi')]):
         with tab_objects[tabs.index('Gelir Analizi')]:
             st.header("Detaylı Gelir Analizi")
             col1, col2 = st.columns(2)
             with col1:
-                 if analiz['fig_urun']: st.plotly_chart(analiz['fig_urun'], use_container_width=True)
+                 fig_urun = grafik_getir(analiz, 'fig_urun')
+                 if fig_urun: st.plotly_chart(fig_urun, use_container_width=True)
                  else: st.info("Gelir getiren ürün/hizmet verisi bulunamadı ('Satilan_Urun_Adi' sütununu kontrol edin).")
             with col2:
-                st.plotly_chart(analiz['fig_marj'], use_container_width=True)
-            if api_key and not analiz['top_urunler'].empty:
+                st.plotly_chart(grafik_getir(analiz, 'fig_marj', tam_cozunurluk), use_container_width=True)
+            if 'Satilan_Urun_Adi' in analiz['kup'].columns:
+                urun = st.selectbox("Ürün detayı", [None] + sorted(analiz['kup']['Satilan_Urun_Adi'].dropna().unique(), key=str),
+                                    format_func=lambda u: "(Seçiniz)" if u is None else str(u))
+                if urun is not None:
+                    st.plotly_chart(detay_grafigi(analiz, 'Satilan_Urun_Adi', urun), use_container_width=True)
+            if yorum_arka_ucu and not analiz['top_urunler'].empty:
                 prompt_data = f"En karlı ürün '{analiz['top_urunler'].index[0]}' ve kar marjı trendi."
-                st.info(f"**AI Yorumu:** {yorum_uret(api_key, prompt_data)}")
+                yer = st.empty()
+                yorum_istekleri['gelir'] = (yorum_istemi(prompt_data), lambda metin, yer=yer: yer.info(f"**AI Yorumu:** {metin}"), YORUM_HATA_MESAJI)
 
-    if 'Gider Analizi' in tabs:
+    if 'Gider Analizi' in tabs and sekme_acik(tab_objects[tabs.index('Gider Analizi')]):
         with tab_objects[tabs.index('Gider Analizi')]:
             st.header("Detaylı Gider Analizi")
-            if analiz['fig_pie']:
-                st.plotly_chart(analiz['fig_pie'], use_container_width=True)
-                if api_key:
+            fig_pie = grafik_getir(analiz, 'fig_pie')
+            if fig_pie:
+                st.plotly_chart(fig_pie, use_container_width=True)
+                if yorum_arka_ucu:
                     prompt_data = f"En büyük gider kalemi '{analiz['en_yuksek_gider_kategorisi']}'. Bu giderin toplamdaki payı."
-                    st.info(f"**AI Yorumu:** {yorum_uret(api_key, prompt_data)}")
+                    yer = st.empty()
+                    yorum_istekleri['gider'] = (yorum_istemi(prompt_data), lambda metin, yer=yer: yer.info(f"**AI Yorumu:** {metin}"), YORUM_HATA_MESAJI)
             else:
                 st.info("Gider verisi bulunamadı.")
+            if not analiz['gider_dagilimi'].empty:
+                kategori = st.selectbox("Kategori detayı", [None] + list(analiz['gider_dagilimi'].sort_values(ascending=False).index),
+                                        format_func=lambda k: "(Seçiniz)" if k is None else str(k))
+                if kategori is not None:
+                    st.plotly_chart(detay_grafigi(analiz, 'Kategori', kategori), use_container_width=True)
+
+
+    if 'Anomaliler' in tabs and sekme_acik(tab_objects[tabs.index('Anomaliler')]):
+        with tab_objects[tabs.index('Anomaliler')]:
+            st.header("Kayan Metrikler ve Anomaliler")
+            gunluk = anomali['gun_anomalileri']
+            gunluk = gunluk[gunluk['Tarih'].between(pd.Timestamp(baslangic or ilk_gun), pd.Timestamp(bitis or son_gun))]
+            donem = anomali_donem.loc[pd.Timestamp(baslangic or ilk_gun):pd.Timestamp(bitis or son_gun)]
+            son_marj = anomali['kayan']['Kayan Kar Marjı'].asof(pd.Timestamp(bitis or son_gun))
+            col1, col2, col3 = st.columns(3)
+            col1.metric(f"Kayan Kar Marjı ({PENCERE_GUN} gün)", "-" if pd.isna(son_marj) else f"%{son_marj:.1f}")
+            col2.metric("Olağan Dışı Gün", f"{gunluk['Tarih'].nunique():,}")
+            col3.metric(f"Olağan Dışı {SIKLIKLAR[siklik]} Dönem", f"{int(donem['Anomali'].sum()):,}")
+            st.plotly_chart(kayan_marj_grafigi(anomali, baslangic, bitis, tam_cozunurluk), use_container_width=True)
+            st.subheader("Olağan Dışı Günler")
+            st.caption(f"Kategori bazında günlük gelir/gider, önceki {PENCERE_GUN} günün ortalamasından en az {Z_ESIGI:g} standart sapma uzaklaştığında işaretlenir.")
+            if gunluk.empty:
+                st.info("Seçilen aralıkta olağan dışı bir gün bulunamadı.")
+            else:
+                st.dataframe(gunluk.reindex(gunluk['Z'].abs().sort_values(ascending=False).index).head(200), hide_index=True, use_container_width=True,
+                             column_config={'Tarih': st.column_config.DateColumn(format="DD.MM.YYYY"), 'Z': st.column_config.NumberColumn(format="%.1f")})
+            st.subheader(f"{SIKLIKLAR[siklik]} Değişimler")
+            st.dataframe(donem[['Gelir', 'Gider', 'Net Kar', 'Gelir Δ%', 'Gider Δ%', 'Net Kar Δ', 'Gelir Z', 'Gider Z', 'Anomali']],
+                         use_container_width=True, column_config={c: st.column_config.NumberColumn(format="%.1f") for c in ['Gelir Δ%', 'Gider Δ%', 'Gelir Z', 'Gider Z']})
 
-
-    if 'Gelecek Tahmini' in tabs:
+    if 'Gelecek Tahmini' in tabs and sekme_acik(tab_objects[tabs.index('Gelecek Tahmini')]):
         with tab_objects[tabs.index('Gelecek Tahmini')]:
             st.header("AI Destekli Gelecek Tahmini (Uzman Paket)")
-            aylik_gelir = df.set_index('Tarih')[['Gelir']].resample('M').sum()
-            model, tahmin = prophet_tahmini_yap(aylik_gelir)
+            aylik_gelir = analiz['aylik_veri'][['Gelir']]
+            # Fit paylaşılan kuyrukta çalışır; beklerken sayfa bloklanmaz, sıradaki yer gösterilir
+            try:
+                tahmin_is, _ = tahmin_isi(aylik_gelir, tahmin_ayarlari, oncelik, oturum)
+            except KuyrukDolu as e:
+                tahmin_is = None
+                st.warning(str(e))
+            model, tahmin = None, None
+            # Kısa işler (ör. Holt) yarım saniyede biter ve bu çalıştırmada gösterilir; Prophet fiti sürerken durum parçası yenilenir
+            if tahmin_is is not None and not tahmin_is.bekle(0.5):
+                is_durumu_goster(tahmin_is)
+            else:
+                try:
+                    if tahmin_is is not None:
+                        tahmin_is.sonuc()
+                    model, tahmin = prophet_tahmini_yap(aylik_gelir, tahmin_ayarlari)
+                except Exception as e:
+                    st.error(f"Tahmin oluşturulurken hata oluştu: {e}")
             if model and tahmin is not None:
-                fig_prophet = plot_plotly(model, tahmin, xlabel="Tarih", ylabel="Gelir")
+                fig_prophet = tahmin_grafigi(aylik_gelir, tahmin_ayarlari, tam_cozunurluk)
                 st.plotly_chart(fig_prophet, use_container_width=True)
                 
                 st.divider()
                 st.subheader("🤖 Stratejik Tahmin Analizi")
-                if api_key:
-                    with st.spinner("AI stratejistiniz geleceği yorumluyor..."):
-                        if 'stratejik_yorum' not in st.session_state:
-                             st.session_state.stratejik_yorum = tahmin_yorumu_uret(api_key, tahmin)
-                        st.markdown(st.session_state.stratejik_yorum)
-
-                        st.write("---")
-                        st.write("**Bu yorum faydalı oldu mu?**")
-                        fb_col1, fb_col2, fb_col3 = st.columns([1,1,5])
-                        if fb_col1.button("👍 Evet"):
-                            log_feedback(db, user_info['uid'], 'positive', st.session_state.stratejik_yorum)
-                        if fb_col2.button("👎 Hayır"):
-                             log_feedback(db, user_info['uid'], 'negative', st.session_state.stratejik_yorum)
+                if yorum_arka_ucu:
+                    stratejik_istem = tahmin_yorum_istemi(tahmin)
+                    yer = st.empty()
+                    yer.caption("AI stratejistiniz geleceği yorumluyor...")
+                    yorum_istekleri['stratejik'] = (stratejik_istem, yer.markdown, TAHMIN_YORUM_HATA_MESAJI)
+
+                    st.write("---")
+                    st.write("**Bu yorum faydalı oldu mu?**")
+                    fb_col1, fb_col2, fb_col3 = st.columns([1,1,5])
+                    # Geri bildirim tıklamasında yorum önceki çalıştırmadan önbellekte hazırdır
+                    stratejik_yorum = onbellekten(yorum_arka_ucu, stratejik_istem) or TAHMIN_YORUM_HATA_MESAJI
+                    if fb_col1.button("👍 Evet"):
+                        log_feedback(db, user_info['uid'], 'positive', stratejik_yorum)
+                    if fb_col2.button("👎 Hayır"):
+                         log_feedback(db, user_info['uid'], 'negative', stratejik_yorum)
                 else:
                     st.warning("Stratejik yorumu görmek için lütfen API anahtarınızı girin.")
-            else:
+            elif len(aylik_gelir) < 2:
                 st.warning("Tahmin oluşturmak için yeterli veri yok (en az 2 aylık veri gereklidir).")
 
+            if model and tahmin is not None:
+                st.divider()
+                st.subheader("🎲 Senaryo Simülasyonu")
+                st.caption(f"Tahmin ve geçmiş sapmalar üzerinden {VARSAYILAN_YOL:,} olası gelir/gider yolu simüle edilir.")
+                kategoriler = [TUM_GIDERLER] + [str(k) for k in analiz['gider_dagilimi'].sort_values(ascending=False).index]
+                col1, col2, col3 = st.columns(3)
+                gelir_buyume = col1.slider("Gelir büyümesi değişimi (yıllık %)", -50, 50, 0, step=5)
+                baslangic_nakit = col2.number_input("Başlangıç nakdi (TL)", min_value=0.0, value=0.0, step=10_000.0)
+                ufuk = col3.slider("Ufuk (ay)", 3, 24, VARSAYILAN_UFUK)
+                soklu = st.multiselect("Gider şokları (Kategori)", kategoriler)
+                gider_soklari = {k: st.slider(f"'{k}' gider değişimi (%)", -50, 100, 0, step=5, key=f"sok_{k}") for k in soklu}
+                senaryo = senaryo_getir(analiz, gelir_buyume, gider_soklari, baslangic_nakit, ufuk, ayarlar=tahmin_ayarlari)
+                if senaryo:
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Zarar Olasılığı (ufuk toplamı)", f"%{senaryo['toplam_zarar_olasiligi'] * 100:.1f}")
+                    col2.metric("Nakdin Tükenme Olasılığı", f"%{senaryo['nakit_bitme_olasiligi'] * 100:.1f}")
+                    col3.metric("Medyan Nakit Pisti", f"{senaryo['pist_medyan']} ay" if senaryo['pist_medyan'] <= ufuk else f"> {ufuk} ay")
+                    col1, col2 = st.columns(2)
+                    col1.plotly_chart(nakit_yelpaze_grafigi(senaryo), use_container_width=True)
+                    col2.plotly_chart(pist_grafigi(senaryo), use_container_width=True)
+
+            st.divider()
+            st.subheader("📦 Kategori ve Ürün Bazlı Tahmin")
+            kirilim_secenekleri = {"Gider - Kategori": "Kategori", "Gelir - Ürün": "Satilan_Urun_Adi"}
+            kirilim_secimi = st.radio("Kırılım", list(kirilim_secenekleri), horizontal=True)
+            if st.toggle("Kırılım bazlı tahminleri oluştur"):
+                boyut = kirilim_secenekleri[kirilim_secimi]
+                genis_tablo = kirilim_serileri(df, boyut, baslangic, bitis)
+                if genis_tablo.empty or len(genis_tablo) < 2:
+                    st.info(f"'{boyut}' sütunu bulunamadı veya tahmin için yeterli aylık veri yok.")
+                else:
+                    # Tek tahmin gibi paylaşılan kuyrukta plan önceliğiyle çalışır; beklerken ilerleme gösterilir
+                    try:
+                        toplu_is = toplu_tahmin_isi(genis_tablo, boyut, oncelik=oncelik, oturum=oturum)
+                    except KuyrukDolu as e:
+                        st.warning(str(e))
+                    else:
+                        if toplu_is is not None and not toplu_is.bekle(0.5):
+                            is_durumu_goster(toplu_is)
+                        else:
+                            try:
+                                toplu_tablo, toplu_hatalar = toplu_is.sonuc() if toplu_is is not None else toplu_tahmin(genis_tablo, boyut)
+                            except Exception as e:
+                                st.error(f"Kırılım tahminleri oluşturulurken hata oluştu: {e}")
+                            else:
+                                toplu_fig = toplu_tahmin_grafigi(toplu_tablo)
+                                if toplu_fig:
+                                    st.plotly_chart(toplu_fig, use_container_width=True)
+                                    st.dataframe(toplu_tablo, use_container_width=True, hide_index=True)
+                                if toplu_hatalar:
+                                    st.warning(f"{len(toplu_hatalar)} seri için tahmin oluşturulamadı: {', '.join(map(str, list(toplu_hatalar)[:10]))}")
+
+    if yorum_istekleri:
+        yorumlari_uret(yorum_arka_ucu, yorum_istekleri)
+
 def show_subscription_page(db, user_info):
     """Kullanıcı için abonelik paketlerini gösterir."""
     st.title("Size En Uygun Paketi Seçin")
@@ -471,7 +542,7 @@ def show_subscription_page(db, user_info):
         st.subheader("₺750 / ay")
         st.markdown("- ✅ **Tüm Temel Özellikler**\n- ✅ Detaylı Gelir Analizi\n- ✅ Detaylı Gider Analizi\n- ✅ Basit AI Yorumları")
         if st.button("Pro Pakete Geç", type="primary"):
-            db.collection('users').document(user_info['uid']).update({'subscription_plan': 'Pro'})
+            plan_guncelle(db, user_info['uid'], 'Pro')
             st.rerun()
 
     with col3:
@@ -479,24 +550,45 @@ def show_subscription_page(db, user_info):
         st.subheader("₺1500 / ay")
         st.markdown("- ✅ **Tüm Pro Özellikler**\n- ✅ AI Destekli Gelecek Tahmini\n- ✅ **Derinlemesine Stratejik AI Analizi**\n- ✅ **PDF Rapor İndirme**")
         if st.button("Uzman Pakete Geç", type="primary"):
-            db.collection('users').document(user_info['uid']).update({'subscription_plan': 'Uzman'})
+            plan_guncelle(db, user_info['uid'], 'Uzman')
             st.rerun()
 
+def tanilama_paneli_goster():
+    """Yöneticilere bu çalıştırmanın aşama sürelerini ve süreç geneli metrikleri gösterir."""
+    iz = aktif_iz()
+    with st.sidebar.expander("🔧 Tanılama"):
+        if iz is not None:
+            st.caption(f"İz {iz.kimlik}")
+            st.dataframe(pd.DataFrame(iz.sozluk()['asamalar']), hide_index=True)
+        butce = BELLEK_BUTCESI.ozet()
+        st.caption(f"Önbellek belleği: {butce['kullanilan_mb']:.0f} / {butce['butce_mb']:.0f} MB "
+                   f"({butce['kayit']} kayıt, {butce['cikarilan']} çıkarma)")
+        kuyruk = ZAMANLAYICI.ozet()
+        st.caption(f"İş kuyruğu: {kuyruk['calisan']} / {kuyruk['isci']} işçi çalışıyor, {kuyruk['bekleyen']} bekliyor "
+                   f"({kuyruk['tamamlanan']} tamamlandı, {kuyruk['iptal']} iptal, {kuyruk['reddedilen']} reddedildi)")
+        ozet = METRIKLER.ozet()
+        if ozet:
+            st.caption("Süreç geneli (son çalıştırmalar)")
+            st.dataframe(pd.DataFrame(ozet), hide_index=True)
+        st.download_button("Prometheus metrikleri", METRIKLER.prometheus_metni(), file_name="kazkaz_metrikler.prom", mime="text/plain")
+
 def main():
     if 'user_info' not in st.session_state: st.session_state['user_info'] = None
+    prometheus_sunucusu_baslat()  # KAZKAZ_PROMETHEUS_PORT verilmişse /metrics bir kez açılır
     
     firebase_ok = init_firebase()
     if not firebase_ok:
         st.warning("Firebase bağlantısı kurulamadı. Lütfen 'firebase-key.json' dosyasını veya Streamlit secrets ayarlarını kontrol edin.")
         st.stop()
         
-    db = firestore.client()
+    db = firestore().client()
 
     with st.sidebar:
         st.sidebar.title("KazKaz AI")
         if st.session_state.get('user_info'):
             st.write(f"Hoş Geldin, {st.session_state['user_info']['email']}")
             if st.button("Çıkış Yap"):
+                ZAMANLAYICI.oturumu_unut(st.session_state.get('oturum_kimligi'))
                 for key in list(st.session_state.keys()):
                     if key != 'user_info':
                         del st.session_state[key]
@@ -506,19 +598,27 @@ def main():
 
     if st.session_state.get('user_info'):
         user_info = st.session_state['user_info']
-        user_doc = db.collection('users').document(user_info['uid']).get()
-        
-        if user_doc.exists:
-             user_info['subscription_plan'] = user_doc.to_dict().get('subscription_plan', 'Temel')
-        else:
-            db.collection('users').document(user_info['uid']).set({'subscription_plan': 'Temel', 'email': user_info['email']})
-            user_info['subscription_plan'] = 'Temel'
-        
-        if user_info['subscription_plan'] in ['Temel', 'Pro', 'Uzman']:
-            api_key = get_gemini_api_key() if user_info['subscription_plan'] in ['Pro', 'Uzman'] else None
-            show_dashboard(user_info, api_key, db)
-        else:
-            show_subscription_page(db, user_info)
+        # Her yeniden çalıştırma bir iz olarak kaydedilir; aşamalar metriklere ve (açıksa) JSON loga yazılır
+        with iz_baslat(kullanici=user_info['uid']) as iz:
+            # Profil kısa süreli önbellekten gelir; plan değişince abonelik sayfası önbelleği temizler
+            user_info['subscription_plan'] = profil_getir(db, user_info['uid'], user_info['email'])['subscription_plan']
+            iz.etiketler['plan'] = user_info['subscription_plan']
+
+            if user_info['subscription_plan'] in ['Temel', 'Pro', 'Uzman']:
+                api_key = get_gemini_api_key() if user_info['subscription_plan'] in ['Pro', 'Uzman'] else None
+                # Bu çalıştırmada yeniden istenmeyen işler (ör. kapatılan sekmenin tahmini) sonunda iptal edilir
+                ZAMANLAYICI.calistirma_baslat(oturum_kimligi())
+                try:
+                    show_dashboard(user_info, api_key, db)
+                finally:
+                    ZAMANLAYICI.calistirma_bitti(oturum_kimligi())
+            else:
+                show_subscription_page(db, user_info)
+
+            if yonetici_mi(user_info['email']):
+                tanilama_paneli_goster()
+        # Sayfa çizildikten sonra planın özellikleri için gereken modüller (ör. Uzman: Prophet) arka planda yüklenir
+        plan_modullerini_isit(user_info['subscription_plan'])
 
     else:
         choice = st.selectbox("Giriş Yap / Kayıt Ol", ["Giriş Yap", "Kayıt Ol"])
@@ -529,7 +629,7 @@ def main():
         if choice == "Giriş Yap":
             if st.button("Giriş Yap", type="primary"):
                 try:
-                    user = auth.get_user_by_email(email)
+                    user = firebase_auth().get_user_by_email(email)
                     st.session_state['user_info'] = {'uid': user.uid, 'email': user.email}; st.rerun()
                 except Exception as e: 
                     st.error("E-posta veya şifre hatalı.")
@@ -537,7 +637,7 @@ def main():
         elif choice == "Kayıt Ol":
             if st.button("Kayıt Ol", type="primary"):
                 try:
-                    user = auth.create_user(email=email, password=password)
+                    user = firebase_auth().create_user(email=email, password=password)
                     st.session_state['user_info'] = {'uid': user.uid, 'email': user.email}
                     st.success("Kaydınız başarıyla oluşturuldu! Panele yönlendiriliyorsunuz.")
                     time.sleep(2)
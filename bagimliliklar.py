@@ -0,0 +1,99 @@
+# KazKaz AI Finansal Danışman - Ağır Bağımlılıkların İlk Kullanımda (Tembel) Yüklenmesi
+import importlib
+import sys
+import threading
+
+from izleme import asama
+
+# Her planın özelliklerinin ihtiyaç duyduğu ağır modüller. Temel oturum Prophet/Stan,
+# LLM SDK'sı ve PDF kütüphanesini hiç yüklemez; Google Sheets ve Firebase yalnızca
+# ilgili bağlantı kurulurken yüklenir.
+PLAN_MODULLERI = {
+    'Temel': ('plotly.express',),
+    'Pro': ('plotly.express', 'google.generativeai'),
+    'Uzman': ('plotly.express', 'google.generativeai', 'prophet', 'fpdf'),
+}
+AGIR_MODULLER = ('prophet', 'google.generativeai', 'fpdf', 'gspread', 'oauth2client.service_account',
+                 'firebase_admin', 'plotly.express')
+
+_isitilan_planlar = set()
+_isitma_kilidi = threading.Lock()
+
+
+def _yukle(ad):
+    # İlk yükleme bir aşama olarak izlenir; sonraki çağrılar sys.modules'tan döner.
+    # import_module, başka bir iş parçacığında yarım kalmış bir yüklemenin bitmesini de bekler.
+    if ad in sys.modules:
+        return importlib.import_module(ad)
+    with asama('ice_aktarma', detay=ad):
+        return importlib.import_module(ad)
+
+
+def prophet():
+    return _yukle('prophet')
+
+
+def prophet_serialize():
+    return _yukle('prophet.serialize')
+
+
+def prophet_plot():
+    return _yukle('prophet.plot')
+
+
+def genai():
+    return _yukle('google.generativeai')
+
+
+def fpdf():
+    return _yukle('fpdf')
+
+
+def gspread():
+    return _yukle('gspread')
+
+
+def service_account_credentials():
+    return _yukle('oauth2client.service_account').ServiceAccountCredentials
+
+
+def firebase_admin():
+    return _yukle('firebase_admin')
+
+
+def firebase_credentials():
+    return _yukle('firebase_admin.credentials')
+
+
+def firebase_auth():
+    return _yukle('firebase_admin.auth')
+
+
+def firestore():
+    return _yukle('firebase_admin.firestore')
+
+
+def plotly_express():
+    return _yukle('plotly.express')
+
+
+def plan_modullerini_isit(plan):
+    """Planın ihtiyaç duyacağı modülleri arka planda bir kez yükler (ör. Uzman için Prophet).
+
+    Kullanıcı tahmin sekmesini açtığında içe aktarma beklemesi kalmaz; Temel plan için
+    yalnızca zaten yüklü olan grafik modülü kalır, ek bir şey yüklenmez.
+    """
+    moduller = [ad for ad in PLAN_MODULLERI.get(plan, ()) if ad not in sys.modules]
+    with _isitma_kilidi:
+        if not moduller or plan in _isitilan_planlar:
+            return
+        _isitilan_planlar.add(plan)
+
+    def isit():
+        for ad in moduller:
+            try:
+                _yukle(ad)
+            except ImportError:
+                pass  # Kurulu değilse hata, özellik gerçekten kullanıldığında gösterilir
+
+    threading.Thread(target=isit, name=f"kazkaz-isitma-{plan}", daemon=True).start()
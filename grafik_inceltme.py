@@ -0,0 +1,127 @@
+# KazKaz AI Finansal Danışman - Uzun Serilerde Grafik İnceltme (LTTB) ve WebGL İzleri
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# İz başına tarayıcıya gönderilen en fazla nokta (görünüm başına; tarih aralığı daraldıkça tam çözünürlüğe yaklaşır)
+HEDEF_NOKTA = int(os.environ.get("KAZKAZ_GRAFIK_HEDEF_NOKTA", "1000"))
+# Bu sayının üzerinde nokta taşıyan çizgi/alan izleri SVG yerine WebGL (Scattergl) ile çizilir
+WEBGL_ESIGI = int(os.environ.get("KAZKAZ_GRAFIK_WEBGL_ESIGI", "2000"))
+
+# Scattergl'de karşılığı olmayan Scatter alanları (px.area yığınları vb.)
+_WEBGL_DISI_ALANLAR = ('stackgroup', 'stackgaps', 'groupnorm', 'orientation', 'fillpattern', 'cliponaxis', 'alignmentgroup', 'offsetgroup')
+
+
+def lttb_indeksleri(x, y, hedef):
+    """Largest-Triangle-Three-Buckets ile seçilen noktaların sıralı indekslerini döndürür.
+
+    İlk ve son nokta korunur; aradaki noktalar `hedef - 2` kovaya bölünür ve her kovadan,
+    önceki seçilen nokta ile sonraki kovanın ortalamasıyla en büyük üçgeni kuran nokta
+    seçilir. Böylece tepe ve dipler (ani düşüşler, sezon zirveleri) kaybolmaz.
+    """
+    n = len(y)
+    if hedef >= n or hedef < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype='float64')
+    y = np.nan_to_num(np.asarray(y, dtype='float64'))
+    kenarlar = np.linspace(1, n - 1, hedef - 1).astype(np.int64)
+    # Her kovanın ortalaması tek seferde; son kovanın "sonraki kovası" yalnızca son noktadır
+    sinirlar = np.append(kenarlar, n)
+    uzunluk = np.diff(sinirlar)
+    ort_x = np.add.reduceat(x, sinirlar[:-1]) / uzunluk
+    ort_y = np.add.reduceat(y, sinirlar[:-1]) / uzunluk
+    # Döngü kovalar üzerinde; skalerler Python float'ı olarak tutulur (NumPy skaler işlemleri yavaştır)
+    kenarlar, ort_x, ort_y = kenarlar.tolist(), ort_x.tolist(), ort_y.tolist()
+    secilen = [0] * hedef
+    secilen[-1] = n - 1
+    a = 0
+    xa, ya = float(x[0]), float(y[0])
+    for i in range(hedef - 2):
+        bas, son = kenarlar[i], kenarlar[i + 1]
+        dx, dy = ort_x[i + 1] - xa, ort_y[i + 1] - ya
+        # Üçgen alanının iki katı: (a, kova noktası, sonraki kova ortalaması)
+        alan = np.abs(dy * x[bas:son] - dx * y[bas:son] + (dx * ya - dy * xa))
+        a = bas + int(alan.argmax())
+        secilen[i + 1] = a
+        xa, ya = float(x[a]), float(y[a])
+    return np.asarray(secilen, dtype=np.int64)
+
+
+def _sayisal_x(x):
+    # Tarih ve sayı eksenleri inceltilebilir; kategorik eksenler (ör. ürün adları) olduğu gibi kalır
+    x = np.asarray(x)
+    if x.dtype.kind == 'M':
+        return x.astype('datetime64[ns]').view('int64')
+    if x.dtype.kind in 'iuf':
+        return x
+    if x.dtype.kind == 'O':
+        try:
+            return pd.to_datetime(x).asi8
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+def _webgl(iz):
+    veri = iz.to_plotly_json()
+    yigin = veri.pop('stackgroup', None)
+    for alan in _WEBGL_DISI_ALANLAR:
+        veri.pop(alan, None)
+    veri.pop('type', None)
+    if yigin is not None and not veri.get('fill'):
+        veri['fill'] = 'tozeroy'  # tek serili px.area yığını WebGL'de sıfıra dolgu ile aynı görünür
+    return go.Scattergl(veri, skip_invalid=True)
+
+
+def figuru_incelt(fig, hedef=HEDEF_NOKTA, webgl_esigi=WEBGL_ESIGI):
+    """Uzun çizgi/alan/çubuk izlerini LTTB ile inceltir, kalabalık çizgi izlerini WebGL'e çevirir.
+
+    Aynı x eksenini paylaşan izler (gruplu çubuklar, tahmin bandı) ortak indekslerle
+    inceltilir ki çubuklar ve dolgular hizalı kalsın; nokta bütçesi bu izler arasında
+    bölünür, böylece birleşik seçim de iz başına `hedef` noktayı aşmaz. `hedef=None` inceltmeyi kapatır
+    (tam çözünürlük); bu durumda yalnızca WebGL dönüşümü yapılır. Kısa serilerde figür
+    olduğu gibi döner.
+    """
+    if fig is None:
+        return None
+    gruplar = {}
+    for i, iz in enumerate(fig.data):
+        # px.line 1000 noktanın üzerinde kendiliğinden Scattergl üretir; o izler de inceltilir
+        if iz.type not in ('scatter', 'scattergl', 'bar') or iz.x is None or iz.y is None or getattr(iz, 'orientation', None) == 'h':
+            continue
+        x = _sayisal_x(iz.x)
+        if x is None:
+            continue
+        gruplar.setdefault((len(x), x[:1].tobytes(), x[-1:].tobytes()), []).append((i, x))
+
+    secimler = {}
+    if hedef:
+        for izler in gruplar.values():
+            if len(izler[0][1]) <= hedef:
+                continue
+            x = izler[0][1]
+            pay = max(hedef // len(izler), 3)
+            ortak = np.unique(np.concatenate([lttb_indeksleri(x, fig.data[i].y, pay) for i, _ in izler]))
+            for i, _ in izler:
+                secimler[i] = ortak
+    if not secimler and not any(len(x) > webgl_esigi for izler in gruplar.values() for _, x in izler):
+        return fig
+
+    yeni = []
+    for i, iz in enumerate(fig.data):
+        if i in secimler:
+            iz = type(iz)(iz)  # önbellekteki özgün figür değişmesin
+            iz.update(x=np.asarray(iz.x)[secimler[i]], y=np.asarray(iz.y)[secimler[i]], overwrite=True)
+            if iz.type in ('scatter', 'scattergl') and iz.mode and 'markers' in iz.mode:
+                iz.mode = 'lines'  # inceltilmiş seride işaretçiler gerçek gözlemleri temsil etmez
+        if iz.type == 'scatter' and iz.x is not None and len(iz.x) > webgl_esigi:
+            iz = _webgl(iz)
+        yeni.append(iz)
+    return go.Figure(data=yeni, layout=fig.layout)
+
+
+def yuk_boyutu(fig):
+    """Figürün tarayıcıya gönderilen JSON yükünün bayt cinsinden boyutu."""
+    return len(fig.to_json().encode('utf-8')) if fig is not None else 0
@@ -0,0 +1,168 @@
+# KazKaz AI Finansal Danışman - Saf NumPy Hızlı Tahmin Motoru
+# Sönümlü Holt(-Winters) ve mevsimsel naif modeller; Prophet ile aynı
+# ds / yhat / yhat_lower / yhat_upper tablosunu milisaniyeler içinde üretir.
+import numpy as np
+import pandas as pd
+
+MEVSIM_UZUNLUGU = 12
+# Prophet'in varsayılan interval_width=0.80 değeriyle aynı kapsama için normal dağılım z değeri
+Z_80 = 1.2815515655446004
+
+_ALFA = np.linspace(0.05, 0.95, 10)
+_BETA = np.array([0.01, 0.05, 0.1, 0.2, 0.3])
+_PHI = np.array([0.8, 0.9, 0.98])
+_GAMA = np.array([0.05, 0.1, 0.3])
+
+
+class HizliTahminModeli:
+    """NumPy motorlarının eğitilmiş parametrelerini ve geçmiş veriyi tutar."""
+
+    def __init__(self, motor, parametreler, history):
+        self.motor = motor
+        self.parametreler = parametreler
+        self.history = history  # Prophet ile aynı: 'ds' ve 'y' sütunları
+        self.durum = None  # Holt: artımlı yeniden fit için ızgara anlıkları (bkz. holt_fit)
+
+
+def _tahmin_tablosu(ds, yhat, sigma_h):
+    return pd.DataFrame({
+        'ds': ds,
+        'yhat': yhat,
+        'yhat_lower': yhat - Z_80 * sigma_h,
+        'yhat_upper': yhat + Z_80 * sigma_h,
+    })
+
+
+def _gelecek_tarihleri(son_tarih, periods, freq):
+    return pd.date_range(start=son_tarih, periods=periods + 1, freq=freq)[1:]
+
+
+def _holt_izgara(y, mevsimsel, durum=None):
+    """Tüm parametre ızgarasını aynı anda (vektörel) çalıştırıp bir adımlık hataları döndürür.
+
+    Zaman üzerinde tek bir döngü vardır; her adım tüm parametre kombinasyonlarını birlikte işler.
+    `durum` (t, seviye, eğim, mevsim, hatalar) verilirse döngü t adımından devam eder; son iki
+    adımdan önceki durumlar anlık olarak döner (bkz. holt_fit, artımlı yeniden fit).
+    """
+    m = MEVSIM_UZUNLUGU
+    gamalar = _GAMA if mevsimsel else np.array([0.0])
+    a, b, p, g = (x.ravel() for x in np.meshgrid(_ALFA, _BETA, _PHI, gamalar, indexing='ij'))
+
+    if mevsimsel:
+        seviye0 = y[:m].mean()
+        egim0 = (y[m:2 * m].mean() - seviye0) / m
+        mevsim = np.tile(y[:m] - seviye0, (a.size, 1))
+        baslangic = m
+    else:
+        seviye0 = y[0]
+        egim0 = 0.0
+        mevsim = np.zeros((a.size, 1))
+        baslangic = 1
+
+    hatalar = np.empty((a.size, y.size - baslangic))
+    if durum is None:
+        ilk = baslangic
+        seviye = np.full(a.size, seviye0, dtype=float)
+        egim = np.full(a.size, egim0, dtype=float)
+    else:
+        ilk, seviye, egim, mevsim, eski_hatalar = durum
+        mevsim = mevsim.copy()  # döngü mevsimleri yerinde günceller; anlık bozulmasın
+        hatalar[:, :ilk - baslangic] = eski_hatalar[:, :ilk - baslangic]
+    anliklar = {}
+    for t in range(ilk, y.size):
+        if t == y.size - 1:
+            anliklar[t] = (seviye, egim, mevsim.copy())
+        j = t % m if mevsimsel else 0
+        s_eski = mevsim[:, j]
+        tahmin = seviye + p * egim + s_eski
+        hatalar[:, t - baslangic] = y[t] - tahmin
+        yeni_seviye = a * (y[t] - s_eski) + (1 - a) * (seviye + p * egim)
+        if mevsimsel:
+            mevsim[:, j] = g * (y[t] - seviye - p * egim) + (1 - g) * s_eski
+        egim = b * (yeni_seviye - seviye) + (1 - b) * p * egim
+        seviye = yeni_seviye
+    anliklar[y.size] = (seviye, egim, mevsim.copy())
+    return (a, b, p, g), seviye, egim, mevsim, hatalar, baslangic, anliklar
+
+
+def _devam_durumu(y, mevsimsel, onceki):
+    """Önceki fitin anlıklarından, yeni seride değişmeyen en son adımı seçer (yoksa None)."""
+    durum = getattr(onceki, 'durum', None)
+    if durum is None or durum['mevsimsel'] != mevsimsel:
+        return None
+    ortak = min(durum['y'].size, y.size)
+    farkli = np.flatnonzero(durum['y'][:ortak] != y[:ortak])
+    ilk_fark = int(farkli[0]) if farkli.size else ortak
+    # Başlangıç seviyesi/eğimi/mevsimleri ilk 2 mevsimden (mevsimsel değilse ilk gözlemden) kurulur
+    en_az = 2 * MEVSIM_UZUNLUGU if mevsimsel else 1
+    adaylar = [t for t in durum['anliklar'] if en_az <= t <= ilk_fark and t <= y.size]
+    if not adaylar:
+        return None
+    t = max(adaylar)
+    return (t, *durum['anliklar'][t], durum['hatalar'])
+
+
+def holt_fit(seri, periods=3, freq='M', onceki=None):
+    """Sönümlü Holt (24+ ayda Holt-Winters) modelini ızgara aramasıyla eğitir ve tahmin tablosu döndürür.
+
+    `onceki` aynı serinin daha önceki bir Holt modeliyse ızgara, yeni seride değişmeyen son
+    adımdan devam eder (ör. yalnızca son ay güncellendi ve yeni ay eklendi). Sonuç soğuk
+    fitle birebir aynıdır; yalnızca değişen adımlar yeniden işlenir.
+    """
+    y = seri.to_numpy(dtype=float)
+    n = y.size
+    mevsimsel = n >= 2 * MEVSIM_UZUNLUGU
+    (a, b, p, g), seviye, egim, mevsim, hatalar, baslangic, anliklar = _holt_izgara(y, mevsimsel, _devam_durumu(y, mevsimsel, onceki))
+
+    sse = (hatalar ** 2).sum(axis=1)
+    i = int(np.argmin(sse))
+    alfa, beta, phi, gama = a[i], b[i], p[i], g[i]
+    sigma = np.sqrt(sse[i] / max(hatalar.shape[1] - 1, 1))
+
+    # Geçmiş için uydurulmuş değerler: gözlem eksi bir adımlık hata
+    yhat_gecmis = np.concatenate([y[:baslangic], y[baslangic:] - hatalar[i]])
+    sigma_gecmis = np.concatenate([np.zeros(baslangic), np.full(n - baslangic, sigma)])
+
+    h = np.arange(1, periods + 1)
+    phi_h = np.cumsum(phi ** h)
+    if mevsimsel:
+        indeks = (n + h - 1) % MEVSIM_UZUNLUGU
+        yhat_gelecek = seviye[i] + phi_h * egim[i] + mevsim[i, indeks]
+    else:
+        yhat_gelecek = seviye[i] + phi_h * egim[i]
+
+    # Analitik tahmin varyansı (ETS A,Ad,A): sigma^2 * (1 + sum_{j<h} c_j^2)
+    j = np.arange(1, periods)
+    c = alfa * (1 + beta * np.cumsum(phi ** j))
+    if mevsimsel:
+        c = c + gama * (j % MEVSIM_UZUNLUGU == 0)
+    varyans_carpani = 1 + np.concatenate([[0.0], np.cumsum(c ** 2)])
+    sigma_gelecek = sigma * np.sqrt(varyans_carpani)
+
+    ds = seri.index.append(_gelecek_tarihleri(seri.index[-1], periods, freq))
+    forecast = _tahmin_tablosu(ds, np.concatenate([yhat_gecmis, yhat_gelecek]), np.concatenate([sigma_gecmis, sigma_gelecek]))
+    parametreler = {'alfa': float(alfa), 'beta': float(beta), 'phi': float(phi), 'gama': float(gama),
+                    'sigma': float(sigma), 'mevsimsel': bool(mevsimsel)}
+    model = HizliTahminModeli('holt', parametreler, seri.rename('y').rename_axis('ds').reset_index())
+    model.durum = {'y': y, 'mevsimsel': mevsimsel, 'hatalar': hatalar, 'anliklar': anliklar}
+    return model, forecast
+
+
+def sezonsal_naif_fit(seri, periods=3, freq='M'):
+    """Mevsimsel naif model: her ay bir önceki yılın aynı ayını (yoksa son değeri) tekrarlar."""
+    y = seri.to_numpy(dtype=float)
+    n = y.size
+    m = MEVSIM_UZUNLUGU if n > MEVSIM_UZUNLUGU else 1
+    hatalar = y[m:] - y[:-m]
+    sigma = np.sqrt((hatalar ** 2).mean()) if hatalar.size else 0.0
+
+    h = np.arange(1, periods + 1)
+    yhat_gelecek = y[n - m + (h - 1) % m]
+    # Her tam mevsim ilerledikçe belirsizlik büyür: sigma * sqrt(k + 1)
+    sigma_gelecek = sigma * np.sqrt((h - 1) // m + 1)
+
+    yhat_gecmis = np.concatenate([y[:m], y[:-m]])
+    sigma_gecmis = np.concatenate([np.zeros(m), np.full(n - m, sigma)])
+    ds = seri.index.append(_gelecek_tarihleri(seri.index[-1], periods, freq))
+    forecast = _tahmin_tablosu(ds, np.concatenate([yhat_gecmis, yhat_gelecek]), np.concatenate([sigma_gecmis, sigma_gelecek]))
+    return HizliTahminModeli('sezonsal_naif', {'mevsim': m, 'sigma': float(sigma)}, seri.rename('y').rename_axis('ds').reset_index()), forecast
@@ -0,0 +1,307 @@
+# KazKaz AI Finansal Danışman - Süreç Geneli İş Zamanlayıcı (tahmin, grafik ve PDF işleri)
+import heapq
+import itertools
+import os
+import threading
+import time
+
+# Aynı anda çalışan ağır iş sayısı (Prophet/cmdstan fiti, kaleido, PDF) çekirdek sayısını aşmaz
+ISCI_SAYISI = int(os.environ.get("KAZKAZ_IS_ISCI", str(os.cpu_count() or 1)))
+# Sırada bekleyebilecek en fazla iş; dolunca düşük öncelikli bekleyen iş yer açar ya da istek reddedilir
+KUYRUK_SINIRI = int(os.environ.get("KAZKAZ_KUYRUK_SINIRI", "64"))
+# Sıradaki bir işle bu kadar saniye hiçbir oturum ilgilenmezse (sekme kapandı) iş çalıştırılmadan atılır
+ILGI_SURESI = float(os.environ.get("KAZKAZ_IS_ILGI_SURESI", "60"))
+
+# Küçük değer önce çalışır; Streamlit dışı toplu işler en sona kalır
+PLAN_ONCELIKLERI = {'Uzman': 0, 'Pro': 1, 'Temel': 2}
+ARKA_PLAN_ONCELIGI = 9
+
+SIRADA, CALISIYOR, BITTI, IPTAL = 'sirada', 'calisiyor', 'bitti', 'iptal'
+
+
+class KuyrukDolu(RuntimeError):
+    """Kuyruk sınırına ulaşıldı ve yer açılabilecek daha düşük öncelikli bir iş yok."""
+
+
+class IsIptal(Exception):
+    """İş, sahibi olan oturumlar artık istemediği için iptal edildi."""
+
+
+def plan_onceligi(plan):
+    return PLAN_ONCELIKLERI.get(plan, ARKA_PLAN_ONCELIGI)
+
+
+class Is:
+    """Zamanlayıcıdaki tek bir iş: sıradaki yeri, ilerlemesi ve sonucu.
+
+    `islem(ilerleme)` çağrılır; `ilerleme(oran, durum)` iş iptal edildiyse IsIptal
+    fırlatır, böylece uzun işler (ör. PDF) bir sonraki adımda durur.
+    """
+
+    def __init__(self, zamanlayici, tur, anahtar, islem, oncelik, ad):
+        self._zamanlayici = zamanlayici
+        self.tur = tur
+        self.anahtar = anahtar
+        self.islem = islem
+        self.oncelik = oncelik
+        self.ad = ad
+        self.hal = SIRADA
+        self.ilerleme = 0.0
+        self.durum = "Sıraya alındı"
+        self.sahipler = {}  # oturum -> işi son isteyen çalıştırmanın numarası
+        self.son_ilgi = time.monotonic()
+        self.gonderim = time.monotonic()
+        self.bekleme_sn = None
+        self.iptal_istendi = False
+        self.alt_isler = []  # bu işin içinden gönderilen işler
+        self._bitis = threading.Event()
+        self._sonuc = None
+        self._hata = None
+
+    def ilerleme_bildir(self, oran, durum):
+        if self.iptal_istendi:
+            raise IsIptal(f"{self.ad} iptal edildi.")
+        self.ilerleme, self.durum = oran, durum
+
+    def bitti(self):
+        return self._bitis.is_set()
+
+    def bekle(self, zaman_asimi=None):
+        """İş bitene kadar en fazla `zaman_asimi` saniye bekler; bittiyse True döndürür."""
+        return self._bitis.wait(zaman_asimi)
+
+    def sonuc(self, zaman_asimi=None):
+        """İşin bitmesini bekler ve sonucunu döndürür; iş hata verdiyse (veya iptal edildiyse) istisnayı fırlatır.
+
+        Bir işçi iş parçacığından çağrıldığında iş hâlâ sıradaysa beklemek yerine devralınıp
+        o iş parçacığında çalıştırılır; böylece işçiler birbirini beklerken tıkanmaz.
+        """
+        if not self._bitis.is_set():
+            self._zamanlayici._devral(self)
+        if not self._bitis.wait(zaman_asimi):
+            raise TimeoutError(f"{self.ad} {zaman_asimi} sn içinde bitmedi.")
+        if self._hata is not None:
+            raise self._hata
+        return self._sonuc
+
+    def sira(self):
+        """Sıradaysa 1'den başlayan yeri, değilse 0 (panel her sorduğunda işe ilgi de tazelenir)."""
+        return self._zamanlayici.sira(self)
+
+    def durum_metni(self):
+        sira = self.sira()
+        if sira:
+            return f"{self.ad}: sırada {sira}. (önünde {sira - 1} iş, {self._zamanlayici.isci_sayisi} işçi)"
+        return f"{self.ad}: {self.durum}"
+
+    def _bitir(self, sonuc=None, hata=None, hal=BITTI):
+        self._sonuc, self._hata, self.hal = sonuc, hata, hal
+        self._bitis.set()
+
+
+class IsZamanlayici:
+    """Tüm oturumların ağır işlerini çekirdek sayısı kadar işçiyle, öncelik sırasıyla çalıştırır.
+
+    - Aynı (tur, anahtar) için sırada veya çalışmakta olan bir iş varsa yenisi açılmaz;
+      isteyen oturum mevcut işe ortak olur (ör. aynı veriyi açan iki Uzman kullanıcı).
+    - Kuyruk sınırlıdır; dolduğunda daha düşük öncelikli bekleyen bir iş yer açar,
+      yoksa KuyrukDolu fırlatılır.
+    - Oturum her tam çalıştırmada istediği işleri yeniden sahiplenir; çalıştırma sonunda
+      (bkz. calistirma_bitti) artık istenmeyen işler iptal edilir.
+    - İşçi iş parçacığında başlatılan iç içe işler (ör. PDF içindeki tahmin ve grafikler)
+      üst işin önceliğiyle, kuyruk sınırına takılmadan sıraya girer ve boştaki işçilerce
+      paralel çalışır. Üst iş sonucunu istediğinde hâlâ sırada olanları kendisi çalıştırır.
+    """
+
+    def __init__(self, isci_sayisi=ISCI_SAYISI, kuyruk_siniri=KUYRUK_SINIRI, ilgi_suresi=ILGI_SURESI):
+        self.isci_sayisi = max(1, isci_sayisi)
+        self.kuyruk_siniri = kuyruk_siniri
+        self.ilgi_suresi = ilgi_suresi
+        self._kosul = threading.Condition()
+        self._yigin = []  # (öncelik, sıra no, iş); öncelik yükselen işler yeniden eklenir, eski kayıt atlanır
+        self._sayac = itertools.count()
+        self._isler = {}  # (tur, anahtar) -> sırada ya da çalışan iş
+        self._bekleyen = 0
+        self._calistirmalar = {}  # oturum -> çalıştırma numarası
+        self._isciler = []
+        self._yerel = threading.local()
+        self.tamamlanan = self.iptal_edilen = self.reddedilen = 0
+
+    def iscide_mi(self):
+        return getattr(self._yerel, 'is_', None) is not None
+
+    def gonder(self, tur, anahtar, islem, oncelik=ARKA_PLAN_ONCELIGI, oturum=None, ad=None):
+        """İşi sıraya alır (veya aynı işe ortak olur) ve Is döndürür; sonucu beklemez.
+
+        İşçi iş parçacığından çağrılırsa iş, çalışan işin alt işi olarak sıraya girer
+        (bkz. Is.sonuc); üst iş bittiğinde sahipsiz kalan alt işler iptal edilir.
+        """
+        ust = getattr(self._yerel, 'is_', None)
+        with self._kosul:
+            is_ = self._isler.get((tur, anahtar))
+            if is_ is not None:
+                self._sahiplen(is_, oturum)
+                if is_.hal == SIRADA and oncelik < is_.oncelik:
+                    is_.oncelik = oncelik
+                    heapq.heappush(self._yigin, (oncelik, next(self._sayac), is_))
+                return is_
+            if ust is not None:
+                oncelik = min(oncelik, ust.oncelik)  # üst iş zaten kabul edildi; alt işleri reddedilmez
+            elif self._bekleyen >= self.kuyruk_siniri:
+                self._yer_ac(oncelik)
+            is_ = Is(self, tur, anahtar, islem, oncelik, ad or tur)
+            if ust is not None:
+                ust.alt_isler.append(is_)
+            self._sahiplen(is_, oturum)
+            self._isler[(tur, anahtar)] = is_
+            self._bekleyen += 1
+            heapq.heappush(self._yigin, (oncelik, next(self._sayac), is_))
+            self._iscileri_baslat()
+            self._kosul.notify()
+        return is_
+
+    def calistir(self, tur, anahtar, islem, oncelik=ARKA_PLAN_ONCELIGI, ad=None, zaman_asimi=None):
+        """gonder + sonuc: işi zamanlayıcıda çalıştırıp sonucunu döndürür (bloklar)."""
+        return self.gonder(tur, anahtar, islem, oncelik, ad=ad).sonuc(zaman_asimi)
+
+    def sahiplen(self, is_, oturum):
+        """Oturumun bu çalıştırmada işi hâlâ istediğini kaydeder (iptal edilmemesi için)."""
+        with self._kosul:
+            self._sahiplen(is_, oturum)
+
+    def _sahiplen(self, is_, oturum):
+        is_.son_ilgi = time.monotonic()
+        if oturum is not None:
+            is_.sahipler[oturum] = self._calistirmalar.get(oturum, 0)
+
+    def calistirma_baslat(self, oturum):
+        """Oturumun yeni bir tam çalıştırması başlıyor; bu çalıştırmada istenen işler yeniden sahiplenilir."""
+        with self._kosul:
+            self._calistirmalar[oturum] = self._calistirmalar.get(oturum, 0) + 1
+
+    def calistirma_bitti(self, oturum):
+        """Oturumun bu çalıştırmada istemediği işlerden sahipliğini bırakır.
+
+        Sahibi kalmayan işler iptal edilir: sıradakiler hiç çalışmaz, çalışanlar bir sonraki
+        ilerleme bildiriminde durur (ilerleme bildirmeyen işler biter ve sonuçları önbelleğe yazılır).
+        """
+        with self._kosul:
+            no = self._calistirmalar.get(oturum, 0)
+            for is_ in list(self._isler.values()):
+                if oturum in is_.sahipler and is_.sahipler[oturum] < no:
+                    del is_.sahipler[oturum]
+                    if not is_.sahipler:
+                        self._iptal_et(is_)
+
+    def oturumu_unut(self, oturum):
+        """Oturum kapandı (ör. çıkış yapıldı): tüm işlerden sahipliğini bırakır, sahipsiz kalanları iptal eder."""
+        with self._kosul:
+            self._calistirmalar.pop(oturum, None)
+            for is_ in list(self._isler.values()):
+                if is_.sahipler.pop(oturum, None) is not None and not is_.sahipler:
+                    self._iptal_et(is_)
+
+    def sira(self, is_):
+        with self._kosul:
+            is_.son_ilgi = time.monotonic()
+            if is_.hal != SIRADA:
+                return 0
+            onde = sum(1 for diger in self._isler.values()
+                       if diger.hal == SIRADA and (diger.oncelik, diger.gonderim) < (is_.oncelik, is_.gonderim))
+            return onde + 1
+
+    def ozet(self):
+        """Tanılama paneli için kuyruk özeti."""
+        with self._kosul:
+            calisan = sum(1 for is_ in self._isler.values() if is_.hal == CALISIYOR)
+            return {'isci': self.isci_sayisi, 'calisan': calisan, 'bekleyen': self._bekleyen,
+                    'tamamlanan': self.tamamlanan, 'iptal': self.iptal_edilen, 'reddedilen': self.reddedilen}
+
+    def _yer_ac(self, oncelik):
+        # Kilit tutulurken çağrılır: en düşük öncelikli, en son gelen bekleyen iş çıkarılır
+        adaylar = [is_ for is_ in self._isler.values() if is_.hal == SIRADA and is_.oncelik > oncelik]
+        if not adaylar:
+            self.reddedilen += 1
+            raise KuyrukDolu("Sistem şu anda çok yoğun; lütfen birkaç dakika sonra tekrar deneyin.")
+        kurban = max(adaylar, key=lambda is_: (is_.oncelik, is_.gonderim))
+        self._iptal_et(kurban, KuyrukDolu("Daha öncelikli işler nedeniyle sıradan çıkarıldı; lütfen tekrar deneyin."))
+
+    def _iptal_et(self, is_, hata=None):
+        # Kilit tutulurken çağrılır
+        if is_.hal == SIRADA:
+            self._isler.pop((is_.tur, is_.anahtar), None)
+            self._bekleyen -= 1
+            self.iptal_edilen += 1
+            is_._bitir(hata=hata or IsIptal(f"{is_.ad} iptal edildi."), hal=IPTAL)
+        elif is_.hal == CALISIYOR:
+            is_.iptal_istendi = True
+
+    def _iscileri_baslat(self):
+        # Kilit tutulurken çağrılır; işçiler ilk işte, süreç başına bir kez başlatılır
+        while len(self._isciler) < self.isci_sayisi:
+            isci = threading.Thread(target=self._isci_dongusu, name=f"kazkaz-is-{len(self._isciler)}", daemon=True)
+            self._isciler.append(isci)
+            isci.start()
+
+    def _siradaki(self):
+        # Kilit tutulurken çağrılır; eski (öncelik yükseltilmiş/iptal) kayıtlar atlanır
+        while self._yigin:
+            oncelik, _, is_ = heapq.heappop(self._yigin)
+            if is_.hal != SIRADA or oncelik != is_.oncelik:
+                continue
+            self._bekleyen -= 1
+            if is_.sahipler and time.monotonic() - is_.son_ilgi > self.ilgi_suresi:
+                # İşi isteyen oturumların hiçbiri onu artık izlemiyor (ör. sekme kapandı)
+                self._isler.pop((is_.tur, is_.anahtar), None)
+                self.iptal_edilen += 1
+                is_._bitir(hata=IsIptal(f"{is_.ad} sahipsiz kaldığı için atıldı."), hal=IPTAL)
+                continue
+            is_.hal = CALISIYOR
+            return is_
+        return None
+
+    def _isci_dongusu(self):
+        while True:
+            with self._kosul:
+                is_ = self._siradaki()
+                while is_ is None:
+                    self._kosul.wait()
+                    is_ = self._siradaki()
+            self._yurut(is_)
+
+    def _yurut(self, is_):
+        is_.bekleme_sn = time.monotonic() - is_.gonderim
+        onceki, self._yerel.is_ = getattr(self._yerel, 'is_', None), is_
+        try:
+            is_.ilerleme_bildir(is_.ilerleme, "Çalışıyor")
+            sonuc, hata = is_.islem(is_.ilerleme_bildir), None
+        except BaseException as e:  # iş hatası bekleyen oturuma sonuc() ile iletilir
+            sonuc, hata = None, e
+        finally:
+            self._yerel.is_ = onceki
+            with self._kosul:
+                if self._isler.get((is_.tur, is_.anahtar)) is is_:
+                    del self._isler[(is_.tur, is_.anahtar)]
+                if isinstance(hata, IsIptal):
+                    self.iptal_edilen += 1
+                else:
+                    self.tamamlanan += 1
+                for alt in is_.alt_isler:
+                    if alt.hal == SIRADA and not alt.sahipler:
+                        self._iptal_et(alt)
+        is_._bitir(sonuc, hata, IPTAL if isinstance(hata, IsIptal) else BITTI)
+
+    def _devral(self, is_):
+        # Is.sonuc'tan çağrılır: işçi iş parçacığındaysak ve iş hâlâ sıradaysa burada çalıştırılır
+        if not self.iscide_mi():
+            return
+        with self._kosul:
+            if is_.hal != SIRADA:
+                return
+            self._bekleyen -= 1  # yığındaki kaydı _siradaki atlar
+            is_.hal = CALISIYOR
+        self._yurut(is_)
+
+
+# Süreç boyunca tek örnek: tüm Streamlit oturumları aynı işçileri ve kuyruğu paylaşır
+ZAMANLAYICI = IsZamanlayici()
@@ -0,0 +1,250 @@
+# KazKaz AI Finansal Danışman - Aşama Bazlı İzleme (süre, satır, bellek) ve Dışa Aktarım
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Prometheus histogram sınırları (saniye): önbellek isabetinden Prophet fit'ine kadar
+SURE_SINIRLARI = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Yüzdelikler için aşama başına saklanan son ölçüm sayısı
+ORNEK_SAYISI = 512
+
+# Dışa aktarım ortam değişkenleriyle açılır:
+#   KAZKAZ_IZLEME_LOG=-|<dosya>   her aşama ve yeniden çalıştırma için bir JSON satırı
+#   KAZKAZ_PROMETHEUS_DOSYASI     her yeniden çalıştırma sonunda yazılan metin dosyası (node_exporter textfile)
+#   KAZKAZ_PROMETHEUS_PORT        /metrics uç noktası
+#   KAZKAZ_YONETICILER            tanılama panelini görebilecek e-postalar (virgülle)
+PROMETHEUS_DOSYASI = os.environ.get("KAZKAZ_PROMETHEUS_DOSYASI")
+YONETICILER = {e.strip().lower() for e in os.environ.get("KAZKAZ_YONETICILER", "").split(",") if e.strip()}
+
+_aktif_iz = contextvars.ContextVar("kazkaz_iz", default=None)
+_log = logging.getLogger("kazkaz.izleme")
+
+
+def _json_log_kur():
+    hedef = os.environ.get("KAZKAZ_IZLEME_LOG")
+    if not hedef or _log.handlers:
+        return
+    isleyici = logging.StreamHandler(sys.stderr) if hedef == "-" else logging.FileHandler(hedef, encoding="utf-8")
+    isleyici.setFormatter(logging.Formatter("%(message)s"))
+    _log.addHandler(isleyici)
+    _log.setLevel(logging.INFO)
+    _log.propagate = False
+
+
+_json_log_kur()
+
+
+def _rss_bayt():
+    # Linux'ta /proc üzerinden anlık RSS; başka platformlarda None (bellek farkı raporlanmaz)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class AsamaKaydi:
+    """Tek bir aşama ölçümü; `satir` aşama içinde sonradan da atanabilir."""
+
+    def __init__(self, ad, satir=None, detay=None):
+        self.ad = ad
+        self.detay = detay
+        self.satir = satir
+        self.sure_sn = None
+        self.bellek_farki_mb = None
+        self.hata = None
+
+    def sozluk(self):
+        return {'asama': self.ad, 'detay': self.detay, 'sure_sn': self.sure_sn, 'satir': self.satir,
+                'bellek_farki_mb': self.bellek_farki_mb, 'hata': self.hata}
+
+
+class Iz:
+    """Bir yeniden çalıştırma boyunca kaydedilen aşamalar."""
+
+    def __init__(self, **etiketler):
+        self.kimlik = uuid.uuid4().hex[:12]
+        self.etiketler = etiketler
+        self.zaman = time.time()
+        self.asamalar = []
+        self.sure_sn = None
+
+    def sozluk(self):
+        return {'iz': self.kimlik, 'zaman': self.zaman, 'sure_sn': self.sure_sn, **self.etiketler,
+                'asamalar': [a.sozluk() for a in self.asamalar]}
+
+
+class Metrikler:
+    """Süreç genelinde aşama bazlı sayaç ve histogramlar (Prometheus metin biçimine çevrilebilir)."""
+
+    def __init__(self):
+        self._kilit = threading.Lock()
+        self._sayi = defaultdict(int)
+        self._toplam_sure = defaultdict(float)
+        self._kovalar = defaultdict(lambda: [0] * len(SURE_SINIRLARI))
+        self._satir = defaultdict(int)
+        self._hata = defaultdict(int)
+        self._bellek = defaultdict(float)
+        self._ornekler = defaultdict(lambda: deque(maxlen=ORNEK_SAYISI))
+        self._yeniden_calistirma = 0
+
+    def asama_kaydet(self, kayit):
+        with self._kilit:
+            self._sayi[kayit.ad] += 1
+            self._toplam_sure[kayit.ad] += kayit.sure_sn
+            kovalar = self._kovalar[kayit.ad]
+            for i, sinir in enumerate(SURE_SINIRLARI):
+                if kayit.sure_sn <= sinir:
+                    kovalar[i] += 1
+            self._satir[kayit.ad] += kayit.satir or 0
+            self._hata[kayit.ad] += kayit.hata is not None
+            self._bellek[kayit.ad] += max(kayit.bellek_farki_mb or 0, 0)
+            self._ornekler[kayit.ad].append(kayit.sure_sn)
+
+    def iz_kaydet(self, iz):
+        with self._kilit:
+            self._yeniden_calistirma += 1
+
+    def ozet(self):
+        """Aşama başına sayı, ortalama/p50/p95 süre, toplam satır ve hata (tanılama paneli için)."""
+        with self._kilit:
+            satirlar = []
+            for ad in sorted(self._sayi):
+                ornekler = sorted(self._ornekler[ad])
+                satirlar.append({
+                    'asama': ad, 'sayi': self._sayi[ad],
+                    'ortalama_sn': self._toplam_sure[ad] / self._sayi[ad],
+                    'p50_sn': ornekler[len(ornekler) // 2],
+                    'p95_sn': ornekler[min(len(ornekler) - 1, int(len(ornekler) * 0.95))],
+                    'satir': self._satir[ad], 'hata': self._hata[ad],
+                })
+            return satirlar
+
+    def prometheus_metni(self):
+        with self._kilit:
+            satirlar = [
+                "# HELP kazkaz_asama_sure_saniye Panel aşamalarının süresi.",
+                "# TYPE kazkaz_asama_sure_saniye histogram",
+            ]
+            for ad in sorted(self._sayi):
+                for sinir, adet in zip(SURE_SINIRLARI, self._kovalar[ad]):
+                    satirlar.append(f'kazkaz_asama_sure_saniye_bucket{{asama="{ad}",le="{sinir}"}} {adet}')
+                satirlar.append(f'kazkaz_asama_sure_saniye_bucket{{asama="{ad}",le="+Inf"}} {self._sayi[ad]}')
+                satirlar.append(f'kazkaz_asama_sure_saniye_sum{{asama="{ad}"}} {self._toplam_sure[ad]:.6f}')
+                satirlar.append(f'kazkaz_asama_sure_saniye_count{{asama="{ad}"}} {self._sayi[ad]}')
+            for metrik, aciklama, kaynak in (
+                ("kazkaz_asama_satir_toplam", "Aşamalarda işlenen satır sayısı.", self._satir),
+                ("kazkaz_asama_hata_toplam", "Hata ile biten aşama sayısı.", self._hata),
+                ("kazkaz_asama_bellek_artisi_mb_toplam", "Aşamalardaki RSS artışlarının toplamı (MB).", self._bellek),
+            ):
+                satirlar += [f"# HELP {metrik} {aciklama}", f"# TYPE {metrik} counter"]
+                satirlar += [f'{metrik}{{asama="{ad}"}} {kaynak[ad]:g}' for ad in sorted(self._sayi)]
+            satirlar += ["# HELP kazkaz_yeniden_calistirma_toplam Tamamlanan panel çalıştırmaları.",
+                         "# TYPE kazkaz_yeniden_calistirma_toplam counter",
+                         f"kazkaz_yeniden_calistirma_toplam {self._yeniden_calistirma}"]
+            return "\n".join(satirlar) + "\n"
+
+
+METRIKLER = Metrikler()
+
+
+@contextmanager
+def iz_baslat(**etiketler):
+    """Bir yeniden çalıştırmayı kapsar; içindeki tüm `asama` ölçümleri bu ize eklenir."""
+    iz = Iz(**etiketler)
+    token = _aktif_iz.set(iz)
+    baslangic = time.perf_counter()
+    try:
+        yield iz
+    finally:
+        iz.sure_sn = time.perf_counter() - baslangic
+        _aktif_iz.reset(token)
+        METRIKLER.iz_kaydet(iz)
+        if _log.handlers:
+            _log.info(json.dumps({'tur': 'iz', **iz.sozluk()}, ensure_ascii=False, default=str))
+        if PROMETHEUS_DOSYASI:
+            prometheus_dosyasi_yaz(PROMETHEUS_DOSYASI)
+
+
+@contextmanager
+def asama(ad, satir=None, detay=None):
+    """Bloğun süresini, RSS farkını ve (varsa) işlenen satır sayısını kaydeder.
+
+    Etkin bir iz varsa ona eklenir (arka plan iş parçacıklarında yalnızca metriklere ve loga gider).
+    Streamlit'in rerun/stop sinyalleri BaseException olduğundan hata sayılmaz.
+    """
+    kayit = AsamaKaydi(ad, satir, detay)
+    rss = _rss_bayt()
+    baslangic = time.perf_counter()
+    try:
+        yield kayit
+    except Exception as e:
+        kayit.hata = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        kayit.sure_sn = time.perf_counter() - baslangic
+        if rss is not None:
+            kayit.bellek_farki_mb = (_rss_bayt() - rss) / 2 ** 20
+        iz = _aktif_iz.get()
+        if iz is not None:
+            iz.asamalar.append(kayit)
+        METRIKLER.asama_kaydet(kayit)
+        if _log.handlers:
+            _log.info(json.dumps({'tur': 'asama', 'iz': iz.kimlik if iz else None, **kayit.sozluk()}, ensure_ascii=False, default=str))
+
+
+def aktif_iz():
+    return _aktif_iz.get()
+
+
+def prometheus_dosyasi_yaz(yol):
+    """Metrikleri atomik olarak dosyaya yazar (yarım okunmuş dosya toplanmasın)."""
+    gecici = f"{yol}.{os.getpid()}.tmp"
+    with open(gecici, "w", encoding="utf-8") as f:
+        f.write(METRIKLER.prometheus_metni())
+    os.replace(gecici, yol)
+
+
+class _MetrikIsleyici(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        govde = METRIKLER.prometheus_metni().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(govde)))
+        self.end_headers()
+        self.wfile.write(govde)
+
+    def log_message(self, *args):
+        pass
+
+
+_sunucu = None
+_sunucu_kilidi = threading.Lock()
+
+
+def prometheus_sunucusu_baslat(port=None):
+    """KAZKAZ_PROMETHEUS_PORT (veya `port`) verilmişse /metrics uç noktasını bir kez başlatır."""
+    global _sunucu
+    port = port or os.environ.get("KAZKAZ_PROMETHEUS_PORT")
+    if not port:
+        return None
+    with _sunucu_kilidi:
+        if _sunucu is None:
+            _sunucu = ThreadingHTTPServer(("0.0.0.0", int(port)), _MetrikIsleyici)
+            threading.Thread(target=_sunucu.serve_forever, name="kazkaz-metrik", daemon=True).start()
+        return _sunucu
+
+
+def yonetici_mi(email):
+    return bool(email) and email.lower() in YONETICILER
@@ -0,0 +1,18 @@
+"""KazKaz AI Finansal Danışman - kıyaslama paketi.
+
+Sentetik defterler üretir ve yükleme, analiz, tahmin ve PDF aşamalarını Streamlit
+dışında ayrı ayrı ölçer. Kullanım: python -m kiyaslama --help
+
+Kayıtlı ya da sentetik defterde tahmin motorlarının geriye dönük testi: python -m kiyaslama.geriye_donuk --help
+Eşzamanlı ve önbellekli AI yorumları: python -m kiyaslama.yorum --help
+Artımlı Google Sheets senkronizasyonu: python -m kiyaslama.sheets --help
+Önbellekli profil ve toplu geri bildirim yazımı: python -m kiyaslama.kullanici --help
+Uzun serilerde grafik inceltme ve yük boyutu: python -m kiyaslama.inceltme --help
+Plan bazlı soğuk başlangıç (içe aktarma süresi ve RSS): python -m kiyaslama.baslangic --help
+Kayan metrikler ve anomali tespiti (tam / +1 gün artımlı): python -m kiyaslama.anomali --help
+Monte Carlo senaryo simülasyonu: python -m kiyaslama.senaryo --help
+Veri yenilemesinde tam / artımlı yeniden analiz ve eşdeğerlik: python -m kiyaslama.artimli --help
+
+Alt modüller burada içe aktarılmaz; `python -m kiyaslama.<modül>` her modülü bir kez yükler
+(aksi hâlde runpy modülü ikinci kez çalıştırıp RuntimeWarning verir).
+"""
@@ -0,0 +1,61 @@
+# Kullanım: python -m kiyaslama --olcekler 1000,100000 --cikti sonuc.json [--karsilastir onceki.json]
+import argparse
+import json
+import sys
+
+from kiyaslama.calistir import ASAMALAR, VARSAYILAN_OLCEKLER, karsilastir, kiyaslama_calistir, rapor_yaz
+
+
+def _liste(metin, tip=str):
+    return [tip(x) for x in metin.split(',') if x]
+
+
+def main(argv=None):
+    ayristirici = argparse.ArgumentParser(prog="python -m kiyaslama", description="KazKaz aşama bazlı kıyaslama")
+    ayristirici.add_argument("--olcekler", default=",".join(map(str, VARSAYILAN_OLCEKLER)),
+                             help="Satır sayıları, virgülle ayrılmış (ör. 1000,10000000)")
+    ayristirici.add_argument("--asamalar", default=",".join(ASAMALAR), help=f"Ölçülecek aşamalar ({','.join(ASAMALAR)})")
+    ayristirici.add_argument("--kategori", type=int, default=12, help="Kategori sayısı")
+    ayristirici.add_argument("--urun", type=int, default=50, help="Ürün sayısı")
+    ayristirici.add_argument("--gun", type=int, default=730, help="Tarih aralığı (gün)")
+    ayristirici.add_argument("--baslangic", default="2021-01-01", help="İlk tarih")
+    ayristirici.add_argument("--tohum", type=int, default=0)
+    ayristirici.add_argument("--tekrar", type=int, default=3, help="Aşama başına tekrar (medyan raporlanır)")
+    ayristirici.add_argument("--motor", default=None, help="Tahmin motoru (varsayılan: uygulamanın politikası)")
+    ayristirici.add_argument("--bellek-olcumu-kapali", action="store_true", help="tracemalloc ile tepe bellek ölçümünü atla")
+    ayristirici.add_argument("--cikti", default="kiyaslama_sonucu.json", help="JSON rapor yolu")
+    ayristirici.add_argument("--karsilastir", default=None, help="Önceki JSON rapor; süre oranları yazdırılır")
+    ayristirici.add_argument("--esik", type=float, default=1.2, help="Bu oranın üzerindeki yavaşlamalar gerileme sayılır")
+    args = ayristirici.parse_args(argv)
+
+    asamalar = _liste(args.asamalar)
+    bilinmeyen = set(asamalar) - set(ASAMALAR)
+    if bilinmeyen:
+        ayristirici.error(f"Bilinmeyen aşama: {', '.join(sorted(bilinmeyen))}")
+
+    rapor = kiyaslama_calistir(_liste(args.olcekler, int), asamalar, args.tekrar, not args.bellek_olcumu_kapali, args.motor,
+                               kategori_sayisi=args.kategori, urun_sayisi=args.urun, baslangic=args.baslangic,
+                               gun=args.gun, tohum=args.tohum)
+    rapor_yaz(rapor, args.cikti)
+
+    print(f"{'ölçek':>10} {'aşama':<8} {'süre (sn)':>10} {'tepe (MB)':>10}")
+    for s in rapor['sonuclar']:
+        if 'hata' in s:
+            print(f"{s['olcek']:>10} {s['asama']:<8} HATA: {s['hata']}")
+        else:
+            yuk = f"  yük {s['tam_yuk_kb']:.0f} -> {s['yuk_kb']:.0f} KB" if 'yuk_kb' in s else ""
+            print(f"{s['olcek']:>10} {s['asama']:<8} {s['sure_sn']:>10.3f} {s.get('tepe_bellek_mb', float('nan')):>10.1f}{yuk}")
+    print(f"Süreç RSS tepe: {rapor['rss_tepe_mb']:.0f} MB -> {args.cikti}")
+
+    if args.karsilastir:
+        with open(args.karsilastir, encoding='utf-8') as f:
+            satirlar, gerileme = karsilastir(json.load(f), rapor, args.esik)
+        for s in satirlar:
+            isaret = "  <-- gerileme" if s['gerileme'] else ""
+            print(f"{s['olcek']:>10} {s['asama']:<8} {s['onceki_sn']:.3f} -> {s['simdiki_sn']:.3f} sn (x{s['oran']:.2f}){isaret}")
+        return 1 if gerileme else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,44 @@
+# KazKaz AI Finansal Danışman - Kayan Metrikler ve Anomali Tespiti Kıyaslaması
+# Kullanım: python -m kiyaslama.anomali [--satir 1000000] [--gun 1825]
+import argparse
+import sys
+import time
+
+from kiyaslama.sentetik import sentetik_defter
+
+
+def main(argv=None):
+    import numpy as np
+    from anomali_motoru import anomali_hesapla, donem_degisimleri
+    from ozet_kupu import kup_olustur
+    ayristirici = argparse.ArgumentParser(prog="python -m kiyaslama.anomali", description="KazKaz anomali motoru kıyaslaması")
+    ayristirici.add_argument("--satir", type=int, default=1_000_000, help="Sentetik defterin satır sayısı")
+    ayristirici.add_argument("--gun", type=int, default=1825, help="Defterin kapsadığı gün sayısı")
+    args = ayristirici.parse_args(argv)
+
+    defter = sentetik_defter(args.satir, gun=args.gun)
+    baslangic = time.perf_counter()
+    kup = kup_olustur(defter)
+    kup_suresi = time.perf_counter() - baslangic
+
+    eski = kup[kup['Tarih'] < kup['Tarih'].max()]
+    baslangic = time.perf_counter()
+    onceki = anomali_hesapla(eski)
+    tam_sure = time.perf_counter() - baslangic
+    baslangic = time.perf_counter()
+    artimli = anomali_hesapla(kup, onceki)
+    artimli_sure = time.perf_counter() - baslangic
+    tam = anomali_hesapla(kup)
+    ayni = np.array_equal(tam['z'], artimli['z'], equal_nan=True) and tam['kayan'].equals(artimli['kayan'])
+    baslangic = time.perf_counter()
+    donem = donem_degisimleri(kup, 'M')
+    donem_suresi = time.perf_counter() - baslangic
+    print(f"{args.satir:,} satır -> küp {len(kup):,} hücre ({kup_suresi:.3f} sn) | anomali tam: {tam_sure * 1000:.1f} ms, "
+          f"artımlı (+1 gün): {artimli_sure * 1000:.1f} ms ({artimli['yeniden_hesaplanan_gun']} gün, tam ile aynı: {ayni}) | "
+          f"dönem: {donem_suresi * 1000:.1f} ms | {len(tam['gun_anomalileri'])} olağan dışı gün-kategori, "
+          f"{int(donem['Anomali'].sum())} olağan dışı ay")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
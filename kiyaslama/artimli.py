@@ -0,0 +1,107 @@
+# KazKaz AI Finansal Danışman - Artımlı Yeniden Analiz Kıyaslaması ve Eşdeğerlik Denetimi
+# Kullanım: python -m kiyaslama.artimli [--satir 1000000] [--ekle-gun 30] [--prophet] [--tekrar 3]
+import argparse
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from kiyaslama.sentetik import sentetik_defter
+
+
+def yenileme_senaryosu(satir, gun=1825, ekle_gun=30, kismi_satir=5, tohum=0):
+    """Aylık veri yenilemesini taklit eden (eski, yeni) defter çifti üretir.
+
+    Yeni defter tam defterdir; eski defter son `ekle_gun` günü içermez ve son günü
+    yarımdır (son `kismi_satir` satırı eksik, ör. gün kapanmadan alınmış bir döküm).
+    Böylece yenilemede hem yeni günler eklenir hem de bir eski gün değişir.
+    """
+    from veri_yukleme import kompakt_yap
+    yeni = kompakt_yap(sentetik_defter(satir, gun=gun, tohum=tohum))
+    kesim = yeni['Tarih'].max().normalize() - pd.Timedelta(days=ekle_gun)
+    eski = yeni[yeni['Tarih'] < kesim]
+    return eski.iloc[:max(len(eski) - kismi_satir, 0)].reset_index(drop=True), yeni
+
+
+def _sure(islem, tekrar):
+    sureler, sonuc = [], None
+    for _ in range(tekrar):
+        baslangic = time.perf_counter()
+        sonuc = islem()
+        sureler.append(time.perf_counter() - baslangic)
+    return statistics.median(sureler), sonuc
+
+
+def artimli_kiyasla(satir=1_000_000, gun=1825, ekle_gun=30, tekrar=3, prophet=False, tohum=0):
+    """Küp, anomali motoru ve tahmin motorları için tam ve artımlı yeniden hesaplamayı ölçer.
+
+    Her satırda tam/artımlı medyan süre (ms) ve sonuçların eşdeğerliği bulunur: küp, anomali
+    ve Holt için birebir aynılık, Prophet için (optimizer toleransı) yakınlık denetlenir.
+    """
+    from anomali_motoru import anomali_hesapla
+    from hizli_tahmin import holt_fit
+    from ozet_kupu import donem_tablosu, gun_imzalari, kup_guncelle, kup_olustur
+
+    eski, yeni = yenileme_senaryosu(satir, gun, ekle_gun, tohum=tohum)
+    satirlar = []
+
+    eski_kup, eski_imzalar = kup_olustur(eski), gun_imzalari(eski)
+    tam_sn, kup = _sure(lambda: kup_olustur(yeni), tekrar)
+    artimli_sn, (artimli_kup, degisen) = _sure(lambda: kup_guncelle(eski_kup, eski_imzalar, yeni, gun_imzalari(yeni)), tekrar)
+    satirlar.append({'adim': 'kup', 'tam_ms': tam_sn * 1000, 'artimli_ms': artimli_sn * 1000,
+                     'ayni': bool(kup.equals(artimli_kup) and kup.dtypes.equals(artimli_kup.dtypes)),
+                     'not': f"{degisen} gün yeniden toplandı"})
+
+    imzalar = gun_imzalari(yeni)
+    onceki = anomali_hesapla(eski_kup, imzalar=eski_imzalar)
+    tam_sn, tam = _sure(lambda: anomali_hesapla(kup), tekrar)
+    artimli_sn, artimli = _sure(lambda: anomali_hesapla(kup, onceki, imzalar=imzalar), tekrar)
+    satirlar.append({'adim': 'anomali', 'tam_ms': tam_sn * 1000, 'artimli_ms': artimli_sn * 1000,
+                     'ayni': bool(np.array_equal(tam['z'], artimli['z'], equal_nan=True) and tam['kayan'].equals(artimli['kayan'])
+                                  and tam['gun_anomalileri'].equals(artimli['gun_anomalileri'])),
+                     'not': f"{artimli['yeniden_hesaplanan_gun']} gün yeniden hesaplandı"})
+
+    eski_seri = donem_tablosu(eski_kup, 'M')['Gelir'].rename_axis('Tarih')
+    yeni_seri = donem_tablosu(kup, 'M')['Gelir'].rename_axis('Tarih')
+    eski_model, _ = holt_fit(eski_seri)
+    tam_sn, (tam_model, tam_tahmin) = _sure(lambda: holt_fit(yeni_seri), tekrar)
+    artimli_sn, (artimli_model, artimli_tahmin) = _sure(lambda: holt_fit(yeni_seri, onceki=eski_model), tekrar)
+    satirlar.append({'adim': 'holt', 'tam_ms': tam_sn * 1000, 'artimli_ms': artimli_sn * 1000,
+                     'ayni': bool(tam_tahmin.equals(artimli_tahmin) and tam_model.parametreler == artimli_model.parametreler),
+                     'not': f"{len(eski_seri)} -> {len(yeni_seri)} ay"})
+
+    if prophet:
+        from tahmin_motoru import VARSAYILAN_AYARLAR, _prophet_fit
+        ayarlar = {**VARSAYILAN_AYARLAR, 'motor': 'prophet'}
+        eski_model, _ = _prophet_fit(eski_seri.rename('Gelir'), ayarlar)
+        tam_sn, (_, tam_tahmin) = _sure(lambda: _prophet_fit(yeni_seri.rename('Gelir'), ayarlar), tekrar)
+        artimli_sn, (_, artimli_tahmin) = _sure(lambda: _prophet_fit(yeni_seri.rename('Gelir'), ayarlar, eski_model), tekrar)
+        fark = float(np.abs(tam_tahmin['yhat'] - artimli_tahmin['yhat']).max() / max(tam_tahmin['yhat'].abs().max(), 1e-9))
+        satirlar.append({'adim': 'prophet', 'tam_ms': tam_sn * 1000, 'artimli_ms': artimli_sn * 1000,
+                         'ayni': fark < 1e-4, 'not': f"sıcak başlangıç, en büyük göreli fark {fark:.1e}"})
+    return satirlar
+
+
+def main(argv=None):
+    ayristirici = argparse.ArgumentParser(prog="python -m kiyaslama.artimli",
+                                          description="KazKaz artımlı yeniden analiz kıyaslaması (tam hesapla eşdeğerlik denetimli)")
+    ayristirici.add_argument("--satir", type=int, default=1_000_000, help="Yeni defterin satır sayısı")
+    ayristirici.add_argument("--gun", type=int, default=1825, help="Tarih aralığı (gün)")
+    ayristirici.add_argument("--ekle-gun", type=int, default=30, help="Yenilemede eklenen gün sayısı")
+    ayristirici.add_argument("--tekrar", type=int, default=3, help="Adım başına tekrar (medyan raporlanır)")
+    ayristirici.add_argument("--prophet", action="store_true", help="Prophet sıcak başlangıcını da ölç (yavaş)")
+    ayristirici.add_argument("--tohum", type=int, default=0)
+    args = ayristirici.parse_args(argv)
+
+    satirlar = artimli_kiyasla(args.satir, args.gun, args.ekle_gun, args.tekrar, args.prophet, args.tohum)
+    print(f"{'adım':<8} {'tam (ms)':>10} {'artımlı (ms)':>13} {'hızlanma':>9}  eşdeğer")
+    for s in satirlar:
+        print(f"{s['adim']:<8} {s['tam_ms']:>10.1f} {s['artimli_ms']:>13.1f} {s['tam_ms'] / max(s['artimli_ms'], 1e-9):>8.1f}x  "
+              f"{'evet' if s['ayni'] else 'HAYIR'}  ({s['not']})")
+    return 0 if all(s['ayni'] for s in satirlar) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# KazKaz AI Finansal Danışman - Plan Bazlı Soğuk Başlangıç Kıyaslaması (içe aktarma süresi ve RSS)
+# Kullanım: python -m kiyaslama.baslangic [--planlar Temel,Pro,Uzman,hepsi] [--tekrar 3] [--cikti baslangic.json]
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PLANLAR = ['Temel', 'Pro', 'Uzman', 'hepsi']  # 'hepsi': tüm ağır modüller baştan yüklenseydi (eski davranış)
+_KOK = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def _oturum(plan, uid):
+    # AppTest bu fonksiyonun kaynağını ayrı bir betik olarak çalıştırır; içe aktarmalar burada olmalı
+    import app_v1
+    from kullanici_servisi import BellekFirestore
+    app_v1.show_dashboard({'uid': uid, 'email': 'kiyaslama@kazkaz', 'subscription_plan': plan}, None, BellekFirestore())
+
+
+def tek_olcum(plan, uid):
+    """Bu süreçte (yeni başlamış olmalı) app_v1'i yükler, planın ilk sayfasını çizer ve özelliklerini ısıtır.
+
+    Her adımın süresini, adım sonundaki RSS'i ve yüklü ağır modülleri döndürür.
+    """
+    sys.path.insert(0, _KOK)
+    olcum = {'plan': plan, 'baslangic_rss_mb': _rss_mb()}
+    import logging
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    baslangic = time.perf_counter()
+    import app_v1  # noqa: F401
+    olcum['ice_aktarma_sn'], olcum['ice_aktarma_rss_mb'] = time.perf_counter() - baslangic, _rss_mb()
+
+    from bagimliliklar import AGIR_MODULLER, PLAN_MODULLERI
+    from streamlit.testing.v1 import AppTest
+    baslangic = time.perf_counter()
+    at = AppTest.from_function(_oturum, kwargs={'plan': 'Uzman' if plan == 'hepsi' else plan, 'uid': uid}, default_timeout=300).run()
+    olcum['ilk_cizim_sn'], olcum['ilk_cizim_rss_mb'] = time.perf_counter() - baslangic, _rss_mb()
+    olcum['hata'] = [str(e.message) for e in at.exception] or None
+
+    # Planın özellikleri (tahmin, AI yorumu, PDF) ilk kullanıldığında yüklenecek modüller
+    baslangic = time.perf_counter()
+    for ad in (AGIR_MODULLER if plan == 'hepsi' else PLAN_MODULLERI[plan]):
+        __import__(ad)
+    olcum['ozellik_sn'], olcum['ozellik_rss_mb'] = time.perf_counter() - baslangic, _rss_mb()
+    olcum['yuklu_moduller'] = [ad for ad in AGIR_MODULLER if ad in sys.modules]
+    return olcum
+
+
+def _depo_hazirla(dizin, uid, satir):
+    # Kayıtlı veri varken panel dosya yüklemeden çizilir ("Kayıtlı Verilerim")
+    ortam = dict(os.environ, KAZKAZ_DEPO_DIZINI=dizin)
+    betik = ("from kiyaslama.sentetik import sentetik_defter; from veri_deposu import depoya_yaz; "
+             f"depoya_yaz({uid!r}, sentetik_defter({satir}))")
+    subprocess.run([sys.executable, "-c", betik], cwd=_KOK, env=ortam, check=True, capture_output=True)
+    return ortam
+
+
+def baslangic_kiyasla(planlar=PLANLAR, tekrar=3, satir=10_000):
+    """Her plan için `tekrar` kez yeni bir Python süreci başlatıp ölçer; medyanları döndürür."""
+    uid = 'kiyaslama'
+    sonuclar = []
+    with tempfile.TemporaryDirectory(prefix="kazkaz-baslangic-") as dizin:
+        ortam = _depo_hazirla(dizin, uid, satir)
+        for plan in planlar:
+            olcumler = []
+            for _ in range(tekrar):
+                # Paket (__init__) pandas/numpy yükler; ölçüm kirlenmesin diye bu dosya betik olarak çalıştırılır
+                cikti = subprocess.run([sys.executable, os.path.abspath(__file__), "--tek", plan, "--uid", uid],
+                                       cwd=_KOK, env=ortam, check=True, capture_output=True, text=True).stdout
+                olcumler.append(json.loads(cikti.strip().splitlines()[-1]))
+            ozet = {k: v for k, v in olcumler[-1].items() if not isinstance(v, float)}
+            for anahtar in olcumler[0]:
+                if isinstance(olcumler[0][anahtar], float):
+                    ozet[anahtar] = statistics.median(o[anahtar] for o in olcumler)
+            sonuclar.append(ozet)
+    return sonuclar
+
+
+def main(argv=None):
+    ayristirici = argparse.ArgumentParser(prog="python -m kiyaslama.baslangic", description="KazKaz plan bazlı soğuk başlangıç kıyaslaması")
+    ayristirici.add_argument("--planlar", default=",".join(PLANLAR))
+    ayristirici.add_argument("--tekrar", type=int, default=3, help="Plan başına yeni süreç sayısı (medyan raporlanır)")
+    ayristirici.add_argument("--satir", type=int, default=10_000, help="Kayıtlı sentetik defterin satır sayısı")
+    ayristirici.add_argument("--cikti", default=None, help="JSON rapor yolu")
+    ayristirici.add_argument("--tek", default=None, help=argparse.SUPPRESS)  # iç kullanım: tek ölçüm, JSON yazdırır
+    ayristirici.add_argument("--uid", default=None, help=argparse.SUPPRESS)
+    args = ayristirici.parse_args(argv)
+
+    if args.tek:
+        print(json.dumps(tek_olcum(args.tek, args.uid), ensure_ascii=False))
+        return 0
+
+    sonuclar = baslangic_kiyasla([p for p in args.planlar.split(',') if p], args.tekrar, args.satir)
+    if args.cikti:
+        with open(args.cikti, 'w', encoding='utf-8') as f:
+            json.dump(sonuclar, f, ensure_ascii=False, indent=2)
+    print(f"{'plan':<7} {'içe aktarma':>12} {'ilk çizim':>10} {'özellikler':>11} {'RSS (MB)':>22}  ağır modüller")
+    for s in sonuclar:
+        print(f"{s['plan']:<7} {s['ice_aktarma_sn']:>10.2f} s {s['ilk_cizim_sn']:>8.2f} s {s['ozellik_sn']:>9.2f} s "
+              f"{s['ice_aktarma_rss_mb']:>6.0f} /{s['ilk_cizim_rss_mb']:>6.0f} /{s['ozellik_rss_mb']:>6.0f}  "
+              f"{', '.join(s['yuklu_moduller']) or '-'}{'  HATA: ' + '; '.join(s['hata']) if s['hata'] else ''}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,202 @@
+# KazKaz AI Finansal Danışman - Aşama Bazlı Kıyaslama (Streamlit dışında)
+import gc
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Tahmin motorunun disk önbelleği ölçümleri kirletmesin; modüller içe aktarılmadan önce ayarlanmalı
+os.environ.setdefault("KAZKAZ_TAHMIN_DIZINI", tempfile.mkdtemp(prefix="kazkaz-kiyaslama-"))
+
+import numpy as np
+import pandas as pd
+
+from kiyaslama.sentetik import csv_baytlari, sentetik_defter
+
+ASAMALAR = ['yukleme', 'analiz', 'anomali', 'grafik', 'tahmin', 'pdf']
+VARSAYILAN_OLCEKLER = [1_000, 10_000, 100_000, 1_000_000]
+
+
+class YuklenenDosya(io.BytesIO):
+    """Streamlit UploadedFile'ın validate_and_load_data'nın kullandığı kısmı (name, getvalue, size)."""
+
+    def __init__(self, veri, name):
+        super().__init__(veri)
+        self.name = name
+        self.size = len(veri)
+
+
+def _uygulama():
+    # app_v1 içe aktarılırken sayfa ayarları çağrılır; Streamlit dışında bunlar yalnızca uyarı üretir
+    import logging
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    import app_v1
+    return app_v1
+
+
+def _onbellekleri_temizle():
+    from analiz_motoru import ANALIZ_ONBELLEGI, GRAFIK_ONBELLEGI, SON_ANOMALILER, SON_KUPLER
+    from onbellek import CERCEVE_HAVUZU, YUKLEME_ONBELLEGI
+    from tahmin_motoru import MOTOR_SECIMLERI, SON_FITLER, TAHMIN_DIZINI, TAHMIN_GRAFIK_ONBELLEGI, TAHMIN_ONBELLEGI
+    for onbellek in (YUKLEME_ONBELLEGI, CERCEVE_HAVUZU, ANALIZ_ONBELLEGI, GRAFIK_ONBELLEGI, SON_ANOMALILER, SON_KUPLER,
+                     TAHMIN_ONBELLEGI, TAHMIN_GRAFIK_ONBELLEGI, SON_FITLER, MOTOR_SECIMLERI):
+        onbellek.clear()
+    if os.path.isdir(TAHMIN_DIZINI):
+        for ad in os.listdir(TAHMIN_DIZINI):
+            os.remove(os.path.join(TAHMIN_DIZINI, ad))
+
+
+def olc(islem, tekrar=3, bellek=True):
+    """`islem()`i soğuk önbellekle `tekrar` kez çalıştırır; süre ve tepe bellek ölçümlerini döndürür.
+
+    Süreler tracemalloc kapalıyken ölçülür (izleme yavaşlatır); tepe bellek ayrı bir
+    çalıştırmada Python/NumPy ayırmalarından alınır. Son çalıştırmanın sonucu da döner.
+    """
+    sureler, sonuc = [], None
+    for _ in range(tekrar):
+        _onbellekleri_temizle()
+        gc.collect()
+        baslangic = time.perf_counter()
+        sonuc = islem()
+        sureler.append(time.perf_counter() - baslangic)
+    olcum = {'sure_sn': statistics.median(sureler), 'en_iyi_sn': min(sureler), 'tekrar': tekrar}
+    if bellek:
+        _onbellekleri_temizle()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            islem()
+            olcum['tepe_bellek_mb'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return olcum, sonuc
+
+
+def _ortam():
+    try:
+        surum = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip() or None
+    except OSError:
+        surum = None
+    return {
+        'zaman': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git': surum,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cekirdek': os.cpu_count(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def _rss_tepe_mb():
+    tepe = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return tepe / 2 ** 20 if sys.platform == 'darwin' else tepe / 1024  # macOS bayt, Linux KiB döndürür
+
+
+def olcek_calistir(satir, asamalar=ASAMALAR, tekrar=3, bellek=True, motor=None, **uretici_ayarlari):
+    """Tek bir ölçekte istenen aşamaları sırayla ölçer; her aşama için bir sonuç sözlüğü döndürür.
+
+    Aşamalar birbirinin çıktısını kullanır (yükleme -> analiz -> tahmin -> pdf); sonraki bir
+    aşamanın ihtiyaç duyduğu ölçülmeyen aşamalar yine de bir kez çalıştırılır. 'anomali' aşaması
+    kayan metrikleri günlük küpü kurmak dahil soğuk önbellekle ölçer. 'grafik' aşaması
+    en uzun seriler için günlük görünümün figürlerini üretir ve tarayıcıya gidecek JSON yükünü
+    (inceltilmiş ve tam çözünürlük) raporlar.
+    """
+    app = _uygulama()
+    from analiz_motoru import GRAFIK_ADLARI, anomali_getir, calistir_analiz, grafik_getir, tum_grafikler
+    from grafik_inceltme import yuk_boyutu
+    from rapor import generate_pdf_report
+    from tahmin_motoru import prophet_tahmini_yap, tahmin_grafigi
+
+    defter = sentetik_defter(satir, **uretici_ayarlari)
+    veri = csv_baytlari(defter)
+    del defter
+    ayarlar = {'motor': motor} if motor else None
+    sonuclar = []
+
+    def kaydet(asama, islem):
+        if asama not in asamalar:
+            return islem()
+        try:
+            olcum, sonuc = olc(islem, tekrar, bellek)
+        except Exception as e:
+            sonuclar.append({'olcek': satir, 'asama': asama, 'hata': f"{type(e).__name__}: {e}"})
+            return None
+        sonuclar.append({'olcek': satir, 'asama': asama, 'csv_mb': len(veri) / 2 ** 20, **olcum})
+        return sonuc
+
+    yuklenen = kaydet('yukleme', lambda: app.validate_and_load_data("Dosya Yükle", YuklenenDosya(veri, "defter.csv")))
+    df = yuklenen[0] if yuklenen else None
+    if df is None:
+        return sonuclar
+    analiz = kaydet('analiz', lambda: calistir_analiz(df))
+    if not analiz or 'hata' in analiz:
+        return sonuclar
+    if 'anomali' in asamalar:
+        kaydet('anomali', lambda: anomali_getir(df))
+    if 'grafik' in asamalar:
+        gunluk = calistir_analiz(df, 'D')
+        grafikler = kaydet('grafik', lambda: tum_grafikler(gunluk))
+        if grafikler and sonuclar[-1]['asama'] == 'grafik':
+            sonuclar[-1]['nokta'] = len(gunluk['donem_veri'])
+            sonuclar[-1]['yuk_kb'] = sum(yuk_boyutu(fig) for _, fig in grafikler) / 1024
+            sonuclar[-1]['tam_yuk_kb'] = sum(yuk_boyutu(grafik_getir(gunluk, ad, tam_cozunurluk=True)) for ad in GRAFIK_ADLARI) / 1024
+    aylik_gelir = analiz['aylik_veri'][['Gelir']]
+    if 'tahmin' in asamalar:
+        kaydet('tahmin', lambda: prophet_tahmini_yap(aylik_gelir, ayarlar))
+    if 'pdf' in asamalar:
+        try:
+            forecast_fig, grafik_notu = tahmin_grafigi(aylik_gelir, ayarlar), None
+        except Exception as e:
+            # PDF yine ölçülür; yalnızca tahmin grafiği olmadan
+            forecast_fig, grafik_notu = None, f"Tahmin grafiği üretilemedi: {type(e).__name__}: {e}"
+        pdf = kaydet('pdf', lambda: generate_pdf_report(analiz, "Kıyaslama yorumu.", forecast_fig))
+        if sonuclar[-1]['asama'] == 'pdf':
+            if grafik_notu:
+                sonuclar[-1]['not'] = grafik_notu
+            if pdf is None and 'hata' not in sonuclar[-1]:
+                sonuclar[-1]['hata'] = "PDF üretilmedi (DejaVuSans.ttf bulunamadı)"
+    return sonuclar
+
+
+def kiyaslama_calistir(olcekler=VARSAYILAN_OLCEKLER, asamalar=ASAMALAR, tekrar=3, bellek=True, motor=None, **uretici_ayarlari):
+    """Tüm ölçekleri çalıştırır ve JSON'a yazılabilir bir rapor sözlüğü döndürür."""
+    sonuclar = []
+    for satir in olcekler:
+        sonuclar.extend(olcek_calistir(satir, asamalar, tekrar, bellek, motor, **uretici_ayarlari))
+    return {
+        'ortam': _ortam(),
+        'parametreler': {'olcekler': list(olcekler), 'asamalar': list(asamalar), 'tekrar': tekrar,
+                         'motor': motor, **uretici_ayarlari},
+        'sonuclar': sonuclar,
+        'rss_tepe_mb': _rss_tepe_mb(),
+    }
+
+
+def karsilastir(onceki, simdiki, esik=1.2):
+    """İki rapordaki ortak (ölçek, aşama) sürelerini oranlar; (satırlar, gerileme var mı) döndürür."""
+    eski = {(s['olcek'], s['asama']): s for s in onceki['sonuclar'] if 'sure_sn' in s}
+    satirlar, gerileme = [], False
+    for s in simdiki['sonuclar']:
+        e = eski.get((s['olcek'], s['asama']))
+        if e is None or 'sure_sn' not in s:
+            continue
+        oran = s['sure_sn'] / e['sure_sn'] if e['sure_sn'] else float('inf')
+        geriledi = oran > esik
+        gerileme |= geriledi
+        satirlar.append({'olcek': s['olcek'], 'asama': s['asama'], 'onceki_sn': e['sure_sn'],
+                         'simdiki_sn': s['sure_sn'], 'oran': oran, 'gerileme': geriledi})
+    return satirlar, gerileme
+
+
+def rapor_yaz(rapor, yol):
+    with open(yol, 'w', encoding='utf-8') as f:
+        json.dump(rapor, f, ensure_ascii=False, indent=2)
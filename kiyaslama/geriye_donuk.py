@@ -0,0 +1,26 @@
+# KazKaz AI Finansal Danışman - Tahmin Motorlarının Geriye Dönük Testi
+# Kullanım: python -m kiyaslama.geriye_donuk [defter.csv] [--motorlar holt,sezonsal_naif]
+import argparse
+import sys
+
+from kiyaslama.sentetik import sentetik_defter
+
+
+def main(argv=None):
+    import pandas as pd
+    from tahmin_motoru import TAHMIN_MOTORLARI, geriye_donuk_test
+    ayristirici = argparse.ArgumentParser(prog="python -m kiyaslama.geriye_donuk", description="KazKaz tahmin motorlarının geriye dönük testi")
+    ayristirici.add_argument("csv", nargs="?", help="Tarih ve Gelir sütunlu defter; verilmezse sentetik defter kullanılır")
+    ayristirici.add_argument("--motorlar", default=",".join(TAHMIN_MOTORLARI), help="Virgülle ayrılmış motor adları")
+    ayristirici.add_argument("--satir", type=int, default=100_000, help="Sentetik defterin satır sayısı")
+    ayristirici.add_argument("--gun", type=int, default=1095, help="Sentetik defterin kapsadığı gün sayısı")
+    args = ayristirici.parse_args(argv)
+
+    veri = pd.read_csv(args.csv, parse_dates=['Tarih']) if args.csv else sentetik_defter(args.satir, gun=args.gun)
+    aylik = veri.set_index('Tarih')[['Gelir']].resample('M').sum()
+    print(geriye_donuk_test(aylik, motorlar=tuple(args.motorlar.split(','))).to_string(index=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,55 @@
+# KazKaz AI Finansal Danışman - Grafik İnceltme Yük Kıyaslaması
+# Kullanım: python -m kiyaslama.inceltme [--gun 3650] [--hedef 1000]
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def ornek_figurler(gun=3650, tohum=0):
+    """Panelin günlük siklikteki gelir/gider, net kâr ve kâr marjı grafiklerinin eşdeğerleri."""
+    import plotly.express as px
+    rng = np.random.default_rng(tohum)
+    tarih = pd.date_range('2015-01-01', periods=gun, freq='D', name='Tarih')
+    seri = pd.DataFrame({'Gelir': rng.lognormal(8, 0.4, gun), 'Gider': rng.lognormal(7.8, 0.4, gun)}, index=tarih)
+    seri['Net Kar'] = seri['Gelir'] - seri['Gider']
+    seri['Kar Marjı'] = seri['Net Kar'] / seri['Gelir'] * 100
+    return {
+        'fig_bar': px.bar(seri, x=seri.index, y=['Gelir', 'Gider'], barmode='group'),
+        'fig_line': px.line(seri, x=seri.index, y='Net Kar', markers=True),
+        'fig_marj': px.area(seri, x=seri.index, y='Kar Marjı', markers=True),
+    }
+
+
+def inceltme_kiyasla(gun=3650, hedef=None):
+    """Her örnek figür için tam ve inceltilmiş yük boyutunu (KB), iz başına en fazla noktayı ve süreyi ölçer."""
+    from grafik_inceltme import HEDEF_NOKTA, figuru_incelt, yuk_boyutu
+    hedef = hedef or HEDEF_NOKTA
+    satirlar = []
+    for ad, fig in ornek_figurler(gun).items():
+        baslangic = time.perf_counter()
+        ince = figuru_incelt(fig, hedef=hedef)
+        sure = time.perf_counter() - baslangic
+        tam = figuru_incelt(fig, hedef=None)
+        satirlar.append({'ad': ad, 'tam_kb': yuk_boyutu(fig) / 1024, 'ince_kb': yuk_boyutu(ince) / 1024,
+                         'iz_basina_nokta': max(len(iz.x) for iz in ince.data), 'sure_ms': sure * 1000,
+                         'tam_iz_tipi': tam.data[0].type})
+    return satirlar
+
+
+def main(argv=None):
+    ayristirici = argparse.ArgumentParser(prog="python -m kiyaslama.inceltme", description="KazKaz grafik inceltme yük kıyaslaması")
+    ayristirici.add_argument("--gun", type=int, default=3650, help="Günlük seri uzunluğu")
+    ayristirici.add_argument("--hedef", type=int, default=None, help="İz başına hedef nokta (varsayılan: HEDEF_NOKTA)")
+    args = ayristirici.parse_args(argv)
+
+    for s in inceltme_kiyasla(args.gun, args.hedef):
+        print(f"{s['ad']:<9} {args.gun} nokta | yük: {s['tam_kb']:8.1f} KB -> {s['ince_kb']:7.1f} KB "
+              f"({s['iz_basina_nokta']} nokta/iz, {s['sure_ms']:.1f} ms) | tam çözünürlük: {s['tam_iz_tipi']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
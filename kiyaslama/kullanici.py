@@ -0,0 +1,47 @@
+# KazKaz AI Finansal Danışman - Önbellekli Profil ve Toplu Geri Bildirim Yazımı Kıyaslaması
+# Kullanım: python -m kiyaslama.kullanici [--tekrar 200] [--gecikme 0.05]
+import argparse
+import sys
+import time
+
+
+def main(argv=None):
+    from kullanici_servisi import PROFIL_ONBELLEGI, BellekFirestore, GeriBildirimTamponu, profil_getir
+    ayristirici = argparse.ArgumentParser(prog="python -m kiyaslama.kullanici", description="KazKaz Firestore profil ve geri bildirim kıyaslaması (ağ erişimi olmadan)")
+    ayristirici.add_argument("--tekrar", type=int, default=200, help="Yeniden çalıştırma / geri bildirim sayısı")
+    ayristirici.add_argument("--gecikme", type=float, default=0.05, help="Sahte Firestore'un gidiş-dönüş gecikmesi (sn)")
+    args = ayristirici.parse_args(argv)
+
+    db = BellekFirestore(gecikme=args.gecikme)
+    db.collection('users').document('u1').set({'subscription_plan': 'Pro', 'email': 'a@b.c'})
+    PROFIL_ONBELLEGI.clear()
+    baslangic = time.perf_counter()
+    for _ in range(args.tekrar):
+        db.collection('users').document('u1').get().to_dict()
+    dogrudan = time.perf_counter() - baslangic
+    baslangic = time.perf_counter()
+    for _ in range(args.tekrar):
+        profil_getir(db, 'u1')
+    onbellekli = time.perf_counter() - baslangic
+
+    db.commit_sayisi = db.yazma = 0
+    baslangic = time.perf_counter()
+    for i in range(args.tekrar):
+        db.collection('feedback').document().set({'user_id': 'u1', 'feedback': 'positive', 'sira': i})
+    tek_tek = time.perf_counter() - baslangic
+
+    db.basarisiz_commit = 1  # ilk toplu yazım hata verir, yeniden denenir
+    tampon = GeriBildirimTamponu(db, aralik=0.5)
+    baslangic = time.perf_counter()
+    for i in range(args.tekrar):
+        tampon.ekle({'user_id': 'u1', 'feedback': 'positive', 'sira': i})
+    tamponlu = time.perf_counter() - baslangic
+    tampon.bosalt()
+    print(f"{args.tekrar} yeniden çalıştırma | profil: {dogrudan:.3f} sn -> {onbellekli * 1000:.2f} ms | "
+          f"geri bildirim (çağıran tarafta): {tek_tek:.3f} sn -> {tamponlu * 1000:.2f} ms | "
+          f"toplu yazım: {db.commit_sayisi} commit, {tampon.yazilan} belge, kayıp: {tampon.basarisiz + tampon.dusurulen}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
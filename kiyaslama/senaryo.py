@@ -0,0 +1,41 @@
+# KazKaz AI Finansal Danışman - Monte Carlo Senaryo Simülasyonu Kıyaslaması
+# Kullanım: python -m kiyaslama.senaryo [--yol 10000] [--satir 100000]
+import argparse
+import sys
+import time
+
+from kiyaslama.sentetik import sentetik_defter
+
+
+def senaryo_girdileri(satir=100_000, gun=1095, tohum=0):
+    """Sentetik defterden (tahmin, aylık gelir, kategori giderleri) üçlüsünü Holt motoruyla hazırlar."""
+    from ozet_kupu import donem_tablosu, kup_olustur
+    from senaryo_motoru import kategori_giderleri
+    from tahmin_motoru import prophet_tahmini_yap
+    kup = kup_olustur(sentetik_defter(satir, gun=gun, tohum=tohum))
+    aylik = donem_tablosu(kup, 'M')
+    _, tahmin = prophet_tahmini_yap(aylik[['Gelir']], {'motor': 'holt'})
+    return tahmin, aylik['Gelir'], kategori_giderleri(kup)
+
+
+def main(argv=None):
+    from senaryo_motoru import TUM_GIDERLER, VARSAYILAN_YOL, senaryo_simule_et
+    ayristirici = argparse.ArgumentParser(prog="python -m kiyaslama.senaryo", description="KazKaz Monte Carlo senaryo kıyaslaması")
+    ayristirici.add_argument("--yol", type=int, default=VARSAYILAN_YOL, help="Simüle edilen yol sayısı")
+    ayristirici.add_argument("--satir", type=int, default=100_000, help="Sentetik defterin satır sayısı")
+    args = ayristirici.parse_args(argv)
+
+    tahmin, aylik_gelir, giderler = senaryo_girdileri(args.satir)
+    senaryolar = ({}, {'gelir_buyume': -20.0}, {'gider_soklari': {'Kategori 1': 50.0}, 'baslangic_nakit': 10_000.0},
+                  {'gelir_buyume': -90.0, 'gider_soklari': {TUM_GIDERLER: 80.0}, 'baslangic_nakit': 500_000.0})
+    for senaryo in senaryolar:
+        baslangic = time.perf_counter()
+        sonuc = senaryo_simule_et(tahmin, aylik_gelir, giderler, yol=args.yol, **senaryo)
+        sure = time.perf_counter() - baslangic
+        print(f"{str(senaryo):<100} {args.yol:,} yol x {sonuc['ufuk']} ay: {sure * 1000:6.1f} ms | zarar: %{sonuc['toplam_zarar_olasiligi'] * 100:.1f} "
+              f"| nakit bitme: %{sonuc['nakit_bitme_olasiligi'] * 100:.1f} | medyan net: {sonuc['net_yuzdelik']['P50'].sum():,.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+# KazKaz AI Finansal Danışman - Sentetik Defter Üretici (kıyaslama için)
+import io
+
+import numpy as np
+import pandas as pd
+
+SUTUNLAR = ['Tarih', 'Gelir', 'Gider', 'Kategori', 'Satilan_Urun_Adi']
+
+
+def _zipf_agirliklari(adet, us=1.1):
+    # Gerçek defterlerde birkaç kategori/ürün hareketlerin çoğunu oluşturur
+    agirlik = 1.0 / np.arange(1, adet + 1) ** us
+    return agirlik / agirlik.sum()
+
+
+def sentetik_defter(satir, kategori_sayisi=12, urun_sayisi=50, baslangic='2021-01-01', gun=730, iade_orani=0.02, tohum=0):
+    """ornek_veri.csv ile aynı şemada, tekrarlanabilir (tohumlu) sentetik defter üretir.
+
+    Tarihler `baslangic`tan itibaren `gun` güne yayılır ve sıralıdır; gelirde yıllık
+    mevsimsellik ve hafif bir büyüme eğilimi vardır. Satırların `iade_orani` kadarı
+    negatif gelirdir (iade), böylece "yalnızca pozitif tutarlar" kuralları da sınanır.
+    """
+    rng = np.random.default_rng(tohum)
+    gunler = np.sort(rng.integers(0, gun, size=satir))
+    tarih = pd.Timestamp(baslangic) + pd.to_timedelta(gunler, unit='D')
+
+    mevsim = 1 + 0.25 * np.sin(2 * np.pi * gunler / 365.25)
+    egilim = 1 + 0.3 * gunler / max(gun, 1)
+    gelir = np.round(rng.lognormal(mean=5.0, sigma=0.8, size=satir) * mevsim * egilim, 2)
+    iade = rng.random(satir) < iade_orani
+    gelir[iade] = -np.round(gelir[iade] * rng.random(iade.sum()), 2)
+    gider = np.round(rng.lognormal(mean=4.5, sigma=0.9, size=satir), 2)
+
+    kategoriler = pd.Categorical.from_codes(rng.choice(kategori_sayisi, size=satir, p=_zipf_agirliklari(kategori_sayisi)),
+                                            [f"Kategori {i + 1}" for i in range(kategori_sayisi)])
+    urunler = pd.Categorical.from_codes(rng.choice(urun_sayisi, size=satir, p=_zipf_agirliklari(urun_sayisi)),
+                                        [f"Ürün {i + 1}" for i in range(urun_sayisi)])
+    return pd.DataFrame({'Tarih': tarih, 'Gelir': gelir, 'Gider': gider, 'Kategori': kategoriler, 'Satilan_Urun_Adi': urunler})
+
+
+def csv_baytlari(df):
+    """Defteri kullanıcının yükleyeceği biçimde (YYYY-MM-DD tarihli) CSV baytlarına çevirir."""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        return df.to_csv(index=False, date_format='%Y-%m-%d').encode('utf-8')
+    tablo = pa.table({
+        'Tarih': pa.array(df['Tarih'].to_numpy().astype('datetime64[D]')),
+        'Gelir': pa.array(df['Gelir']),
+        'Gider': pa.array(df['Gider']),
+        'Kategori': pa.array(df['Kategori']).cast(pa.string()),
+        'Satilan_Urun_Adi': pa.array(df['Satilan_Urun_Adi']).cast(pa.string()),
+    })
+    tampon = io.BytesIO()
+    pacsv.write_csv(tablo, tampon, pacsv.WriteOptions(quoting_style='none'))
+    return tampon.getvalue()
@@ -0,0 +1,53 @@
+# KazKaz AI Finansal Danışman - Artımlı Google Sheets Senkronizasyonu Kıyaslaması
+# Kullanım: python -m kiyaslama.sheets [--satir 200000] [--ek 500]
+import argparse
+import sys
+import time
+
+SAYFA_BASLIKLARI = ['Tarih', 'Gelir', 'Gider', 'Kategori', 'Satilan_Urun_Adi']
+
+
+def sentetik_sayfa(adet):
+    """Sheets'in döndüreceği biçimde (tarih metin, tutar sayı) başlıksız `adet` satır üretir."""
+    import pandas as pd
+    tarihler = pd.date_range('2020-01-01', periods=adet, freq='15min').strftime('%Y-%m-%d').tolist()
+    return [[t, i % 997 * 1.5, i % 389 * 2.25, f"K{i % 12}", f"Ü{i % 40}"] for i, t in enumerate(tarihler)]
+
+
+def main(argv=None):
+    import pandas as pd
+    from sheets_senkron import YerelSheetsIstemcisi, sayfa_senkronize
+    ayristirici = argparse.ArgumentParser(prog="python -m kiyaslama.sheets", description="KazKaz artımlı Sheets senkronizasyonu kıyaslaması")
+    ayristirici.add_argument("--satir", type=int, default=200_000, help="Sayfadaki toplam veri satırı")
+    ayristirici.add_argument("--ek", type=int, default=500, help="İlk senkrondan sonra eklenen satır sayısı")
+    args = ayristirici.parse_args(argv)
+
+    satirlar = sentetik_sayfa(args.satir)
+    istemci = YerelSheetsIstemcisi({'defter': [SAYFA_BASLIKLARI] + satirlar[:args.satir - args.ek]})
+
+    baslangic = time.perf_counter()
+    pd.DataFrame(istemci.open_by_url('defter').sheet1.get_all_records())
+    tam_cekim = time.perf_counter() - baslangic
+
+    baslangic = time.perf_counter()
+    sayfa_senkronize(istemci, 'defter', tam=True)
+    ilk = time.perf_counter() - baslangic
+
+    istemci.satir_ekle('defter', satirlar[args.satir - args.ek:])
+    istemci.okunan_hucre = istemci.cagri_sayisi = 0
+    baslangic = time.perf_counter()
+    df, yeni = sayfa_senkronize(istemci, 'defter')
+    artimli = time.perf_counter() - baslangic
+    artimli_hucre, artimli_cagri = istemci.okunan_hucre, istemci.cagri_sayisi
+
+    baslangic = time.perf_counter()
+    sayfa_senkronize(istemci, 'defter')
+    degismeyen = time.perf_counter() - baslangic
+    print(f"{args.satir} satır | get_all_records: {tam_cekim:.3f} sn | ilk senkron: {ilk:.3f} sn | "
+          f"+{yeni} satır: {artimli * 1000:.1f} ms ({artimli_cagri} çağrı, {artimli_hucre} hücre) | "
+          f"değişmeyen: {degismeyen * 1000:.2f} ms | toplam: {len(df)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
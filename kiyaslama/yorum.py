@@ -0,0 +1,37 @@
+# KazKaz AI Finansal Danışman - Eşzamanlı ve Önbellekli AI Yorumu Kıyaslaması
+# Kullanım: python -m kiyaslama.yorum [--istem 3] [--gecikme 0.5]
+import argparse
+import sys
+import time
+
+
+def main(argv=None):
+    from yorum_servisi import YORUM_HATA_MESAJI, YORUM_ONBELLEGI, YerelArkaUc, yorum_istemi, yorumlari_uret
+    ayristirici = argparse.ArgumentParser(prog="python -m kiyaslama.yorum", description="KazKaz AI yorum kıyaslaması (ağ erişimi olmadan)")
+    ayristirici.add_argument("--istem", type=int, default=3, help="Aynı sayfada üretilen yorum sayısı")
+    ayristirici.add_argument("--gecikme", type=float, default=0.5, help="Sahte arka ucun ilk parçaya kadar gecikmesi (sn)")
+    args = ayristirici.parse_args(argv)
+
+    istekler = {i: (yorum_istemi(f"örnek veri {i}"), None, YORUM_HATA_MESAJI) for i in range(args.istem)}
+    arka_uc = YerelArkaUc(gecikme=args.gecikme)
+    YORUM_ONBELLEGI.clear()
+    baslangic = time.perf_counter()
+    for i in istekler:
+        yorumlari_uret(arka_uc, {i: istekler[i]})
+    sirali = time.perf_counter() - baslangic
+
+    YORUM_ONBELLEGI.clear()
+    baslangic = time.perf_counter()
+    yorumlari_uret(arka_uc, istekler)
+    eszamanli = time.perf_counter() - baslangic
+
+    baslangic = time.perf_counter()
+    yorumlari_uret(arka_uc, istekler)
+    onbellekli = time.perf_counter() - baslangic
+    print(f"{args.istem} istem | sıralı: {sirali:.3f} sn | eşzamanlı: {eszamanli:.3f} sn | "
+          f"önbellekten: {onbellekli * 1000:.2f} ms | API çağrısı: {arka_uc.cagri_sayisi}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
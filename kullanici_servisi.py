@@ -0,0 +1,244 @@
+# KazKaz AI Finansal Danışman - Önbellekli Kullanıcı Profili ve Toplu Geri Bildirim Yazımı (Firestore)
+import atexit
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from izleme import asama
+from onbellek import SinirliOnbellek
+
+VARSAYILAN_PLAN = 'Temel'
+
+# Plan yalnızca abonelik sayfasından değişir ve o anda önbellekten silinir; TTL başka
+# süreçlerde/örneklerde yapılan değişikliklerin en geç ne kadar sonra görüleceğini belirler.
+PROFIL_ONBELLEGI = SinirliOnbellek(max_oge=4096, ttl=float(os.environ.get("KAZKAZ_PROFIL_TTL", "60")))
+
+# Firestore toplu yazımında tek seferde en fazla 500 işlem olabilir
+PARTI_BOYUTU = 400
+TAMPON_BOYUTU = int(os.environ.get("KAZKAZ_GERI_BILDIRIM_TAMPONU", "10000"))
+BOSALTMA_ARALIGI = float(os.environ.get("KAZKAZ_GERI_BILDIRIM_ARALIGI", "2.0"))
+MAX_DENEME = 5
+
+_tampon = None
+_tampon_kilidi = threading.Lock()
+
+
+def profil_getir(db, uid, email=None):
+    """Kullanıcı profilini (subscription_plan dahil) döndürür; her yeniden çalıştırmada Firestore'a gidilmez.
+
+    Belge yoksa varsayılan planla oluşturulur.
+    """
+    def oku():
+        with asama('firestore', detay='profil_okuma'):
+            user_doc = db.collection('users').document(uid).get()
+        if user_doc.exists:
+            profil = user_doc.to_dict()
+            profil.setdefault('subscription_plan', VARSAYILAN_PLAN)
+            return profil
+        profil = {'subscription_plan': VARSAYILAN_PLAN, 'email': email}
+        db.collection('users').document(uid).set(profil)
+        return dict(profil)
+    return PROFIL_ONBELLEGI.get_or_compute(uid, oku)
+
+
+def plan_guncelle(db, uid, plan):
+    """Abonelik planını yazar ve profili önbellekten düşürür (sonraki okuma taze gelir)."""
+    db.collection('users').document(uid).update({'subscription_plan': plan})
+    PROFIL_ONBELLEGI.pop(uid)
+
+
+class GeriBildirimTamponu:
+    """Geri bildirim belgelerini bellekte biriktirip arka planda Firestore toplu yazımıyla gönderir.
+
+    Tampon `max_boyut` ile sınırlıdır; dolduğunda yeni olaylar düşürülür ve
+    `dusurulen` sayacı artar. Başarısız toplu yazımlar artan beklemeyle
+    `max_deneme` kez yeniden denenir, sonra `basarisiz` sayacına eklenir.
+    Firestore emülatörüyle (FIRESTORE_EMULATOR_HOST) ya da BellekFirestore ile
+    ağ erişimi olmadan çalıştırılabilir.
+
+    Belgenin `zaman_alani` alanına olayın sıraya alındığı an (UTC) yazılır; SERVER_TIMESTAMP
+    toplu yazımın işlendiği anı verir ve bu, tıklamadan `aralik` saniyeye kadar sonra olabilir.
+    """
+
+    def __init__(self, db, koleksiyon='feedback', max_boyut=TAMPON_BOYUTU, parti_boyutu=PARTI_BOYUTU,
+                 aralik=BOSALTMA_ARALIGI, max_deneme=MAX_DENEME, zaman_alani='timestamp'):
+        self.db = db
+        self.koleksiyon = koleksiyon
+        self.zaman_alani = zaman_alani
+        self.parti_boyutu = parti_boyutu
+        self.aralik = aralik
+        self.max_deneme = max_deneme
+        self._kuyruk = queue.Queue(maxsize=max_boyut)
+        self._uyandir = threading.Event()
+        self._yazma_kilidi = threading.Lock()
+        self._baslatma_kilidi = threading.Lock()
+        self._is_parcacigi = None
+        self.yazilan = 0
+        self.dusurulen = 0
+        self.basarisiz = 0
+
+    def ekle(self, belge):
+        """Belgeyi sıraya alma zamanıyla birlikte sıraya alır ve hemen döner; tampon doluysa False döndürür."""
+        belge = {self.zaman_alani: datetime.now(timezone.utc), **belge}
+        try:
+            # Belge kimliği baştan verilir; yanıtı kaybolan bir yazım yeniden denenirse kopya oluşmaz
+            self._kuyruk.put_nowait((uuid.uuid4().hex, belge))
+        except queue.Full:
+            self.dusurulen += 1
+            return False
+        self._baslat()
+        if self._kuyruk.qsize() >= self.parti_boyutu:
+            self._uyandir.set()
+        return True
+
+    def _baslat(self):
+        if self._is_parcacigi is None or not self._is_parcacigi.is_alive():
+            with self._baslatma_kilidi:
+                if self._is_parcacigi is None or not self._is_parcacigi.is_alive():
+                    self._is_parcacigi = threading.Thread(target=self._dongu, name="kazkaz-geri-bildirim", daemon=True)
+                    self._is_parcacigi.start()
+
+    def _dongu(self):
+        while True:
+            self._uyandir.wait(self.aralik)
+            self._uyandir.clear()
+            self.bosalt()
+
+    def _parti_al(self):
+        parti = []
+        while len(parti) < self.parti_boyutu:
+            try:
+                parti.append(self._kuyruk.get_nowait())
+            except queue.Empty:
+                break
+        return parti
+
+    def bosalt(self):
+        """Bekleyen tüm belgeleri parti parti yazar (arka plan iş parçacığı ve kapanışta çağrılır)."""
+        with self._yazma_kilidi:
+            while True:
+                parti = self._parti_al()
+                if not parti:
+                    return
+                self._partiyi_yaz(parti)
+
+    def _partiyi_yaz(self, parti):
+        for deneme in range(self.max_deneme):
+            try:
+                batch = self.db.batch()
+                for belge_id, belge in parti:
+                    batch.set(self.db.collection(self.koleksiyon).document(belge_id), belge)
+                with asama('firestore', satir=len(parti), detay='geri_bildirim_yazimi'):
+                    batch.commit()
+                self.yazilan += len(parti)
+                return
+            except Exception:
+                time.sleep(min(0.2 * 2 ** deneme, 5.0))
+        self.basarisiz += len(parti)
+
+    def bekleyen(self):
+        return self._kuyruk.qsize()
+
+
+def geri_bildirim_tamponu(db):
+    """Süreç genelindeki geri bildirim tamponunu döndürür (ilk kullanımda kurulur)."""
+    global _tampon
+    with _tampon_kilidi:
+        if _tampon is None:
+            _tampon = GeriBildirimTamponu(db)
+            # Süreç kapanırken bekleyen geri bildirimler kaybolmasın
+            atexit.register(_tampon.bosalt)
+        return _tampon
+
+
+class _BellekBelgeGoruntusu:
+    def __init__(self, veri):
+        self._veri = veri
+        self.exists = veri is not None
+
+    def to_dict(self):
+        return dict(self._veri) if self._veri is not None else None
+
+
+class _BellekBelge:
+    def __init__(self, db, koleksiyon, belge_id):
+        self._db = db
+        self._koleksiyon = koleksiyon
+        self.id = belge_id
+
+    def get(self):
+        self._db._gidis()
+        self._db.okuma += 1
+        return _BellekBelgeGoruntusu(self._db.veriler.get(self._koleksiyon, {}).get(self.id))
+
+    def set(self, veri):
+        self._db._gidis()
+        self._db.yazma += 1
+        self._db.veriler.setdefault(self._koleksiyon, {})[self.id] = dict(veri)
+
+    def update(self, veri):
+        self._db._gidis()
+        self._db.yazma += 1
+        belgeler = self._db.veriler.get(self._koleksiyon, {})
+        if self.id not in belgeler:
+            raise KeyError(f"Belge bulunamadı: {self._koleksiyon}/{self.id}")
+        belgeler[self.id].update(veri)
+
+
+class _BellekKoleksiyon:
+    def __init__(self, db, ad):
+        self._db = db
+        self._ad = ad
+
+    def document(self, belge_id=None):
+        return _BellekBelge(self._db, self._ad, belge_id or uuid.uuid4().hex)
+
+
+class _BellekParti:
+    def __init__(self, db):
+        self._db = db
+        self._islemler = []
+
+    def set(self, belge, veri):
+        self._islemler.append((belge, dict(veri)))
+
+    def commit(self):
+        self._db._gidis()
+        if self._db.basarisiz_commit > 0:
+            self._db.basarisiz_commit -= 1
+            raise ConnectionError("Geçici Firestore hatası (sahte)")
+        for belge, veri in self._islemler:
+            self._db.veriler.setdefault(belge._koleksiyon, {})[belge.id] = veri
+        self._db.yazma += len(self._islemler)
+        self._db.commit_sayisi += 1
+
+
+class BellekFirestore:
+    """Test ve kıyaslama için bellek içi sahte Firestore istemcisi.
+
+    Her ağ gidiş-dönüşü `gecikme` saniye bekler; `basarisiz_commit` sonraki kaç
+    toplu yazımın hata vereceğini belirler (yeniden deneme testi için).
+    """
+
+    def __init__(self, gecikme=0.0, basarisiz_commit=0):
+        self.veriler = {}
+        self.gecikme = gecikme
+        self.basarisiz_commit = basarisiz_commit
+        self.gidis_donus = 0
+        self.okuma = 0
+        self.yazma = 0
+        self.commit_sayisi = 0
+
+    def _gidis(self):
+        self.gidis_donus += 1
+        if self.gecikme:
+            time.sleep(self.gecikme)
+
+    def collection(self, ad):
+        return _BellekKoleksiyon(self, ad)
+
+    def batch(self):
+        return _BellekParti(self)
@@ -0,0 +1,261 @@
+# KazKaz AI Finansal Danışman - Süreç Genelinde Paylaşılan Önbellek Yardımcıları
+import hashlib
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Bütçeye bağlı önbelleklerin (veri setleri, küpler, figürler, PDF'ler) toplamı için süreç başına üst sınır.
+# Aşılırsa süreç genelinde en uzun süredir kullanılmayan kayıtlar çıkarılır ve ilk ihtiyaçta yeniden üretilir.
+BELLEK_BUTCESI_MB = float(os.environ.get("KAZKAZ_BELLEK_BUTCESI_MB", "1024"))
+# Plotly figürlerinde izlerin dışında kalan yerleşim/şablon için kaba pay
+_FIGUR_TABANI = 16 * 1024
+
+
+def nesne_boyutu(deger, _gorulen=None):
+    """Önbellekteki bir değerin yaklaşık bellek boyutu (bayt).
+
+    DataFrame/Series/ndarray gerçek boyutlarıyla, sözlük/liste/demetler içerikleriyle,
+    Plotly figürleri izlerindeki dizilerle sayılır; iç içe yapılarda aynı nesne bir kez sayılır.
+    """
+    gorulen = set() if _gorulen is None else _gorulen
+    if id(deger) in gorulen:
+        return 0
+    gorulen.add(id(deger))
+    if isinstance(deger, pd.DataFrame):
+        return int(deger.memory_usage(index=True, deep=True).sum())
+    if isinstance(deger, (pd.Series, pd.Index)):
+        return int(deger.memory_usage(deep=True))
+    if isinstance(deger, np.ndarray):
+        return deger.nbytes
+    if isinstance(deger, dict):
+        return sys.getsizeof(deger) + sum(nesne_boyutu(k, gorulen) + nesne_boyutu(v, gorulen) for k, v in deger.items())
+    if isinstance(deger, (list, tuple, set, frozenset)):
+        return sys.getsizeof(deger) + sum(nesne_boyutu(v, gorulen) for v in deger)
+    if hasattr(deger, 'to_plotly_json') and hasattr(deger, 'data'):
+        return _FIGUR_TABANI + sum(nesne_boyutu(iz.to_plotly_json(), gorulen) for iz in deger.data)
+    return sys.getsizeof(deger)
+
+
+class BellekButcesi:
+    """Birden çok SinirliOnbellek'in kayıtlarını tek bir bayt bütçesi altında, süreç geneli LRU sırasıyla tutar.
+
+    Aynı nesne birden çok önbellekte bulunuyorsa (ör. yükleme önbelleği ve içerik havuzu)
+    bir kez sayılır. Boyutlar nesne_boyutu ile yaklaşık hesaplanır; çıkarılan kayıtlar
+    get_or_compute ile ilk ihtiyaçta yeniden üretilir.
+    """
+
+    def __init__(self, max_bayt):
+        self.max_bayt = max_bayt
+        self._sira = OrderedDict()  # (id(önbellek), anahtar) -> (önbellek, anahtar, id(değer))
+        self._nesneler = {}  # id(değer) -> [boyut, kayıt sayısı]
+        self._kilit = threading.Lock()
+        self.kullanilan = 0
+        self.cikarilan = 0
+
+    def _birak(self, sira_anahtari):
+        # Kilit tutulurken çağrılır
+        kayit = self._sira.pop(sira_anahtari, None)
+        if kayit is None:
+            return None
+        nesne = self._nesneler[kayit[2]]
+        nesne[1] -= 1
+        if nesne[1] == 0:
+            del self._nesneler[kayit[2]]
+            self.kullanilan -= nesne[0]
+        return kayit
+
+    def ekle(self, onbellek, anahtar, deger):
+        """Kaydı bütçeye ekler; bütçe aşılırsa en eski kayıtları kendi önbelleklerinden çıkarır."""
+        # Boyut kilit dışında hesaplanır; nesne başka bir kayıtla zaten sayılıyorsa tekrar hesaplanmaz
+        boyut = None if id(deger) in self._nesneler else nesne_boyutu(deger)
+        kurbanlar = []
+        with self._kilit:
+            self._birak((id(onbellek), anahtar))
+            if boyut is None and id(deger) not in self._nesneler:
+                boyut = nesne_boyutu(deger)  # aynı kayıt yenilendi veya bu arada çıkarıldı
+            self._sira[(id(onbellek), anahtar)] = (onbellek, anahtar, id(deger))
+            nesne = self._nesneler.setdefault(id(deger), [boyut, 0])
+            if nesne[1] == 0:
+                self.kullanilan += nesne[0]
+            nesne[1] += 1
+            # En son eklenen kayıt bütçeden büyük olsa bile kalır (bir sonraki eklemede çıkar)
+            while self.kullanilan > self.max_bayt and len(self._sira) > 1:
+                kurbanlar.append(self._birak(next(iter(self._sira))))
+                self.cikarilan += 1
+        # Önbellek kilitleri bütçe kilidi bırakıldıktan sonra alınır (kilit sırası: önbellek -> bütçe)
+        for kurban_onbellek, kurban_anahtar, kurban_kimlik in kurbanlar:
+            kurban_onbellek._butceden_cikar(kurban_anahtar, kurban_kimlik)
+
+    def dokun(self, onbellek, anahtar):
+        with self._kilit:
+            if (id(onbellek), anahtar) in self._sira:
+                self._sira.move_to_end((id(onbellek), anahtar))
+
+    def birak(self, onbellek, anahtar):
+        with self._kilit:
+            self._birak((id(onbellek), anahtar))
+
+    def ozet(self):
+        """Tanılama paneli için kullanım özeti."""
+        with self._kilit:
+            return {'kullanilan_mb': self.kullanilan / 2 ** 20, 'butce_mb': self.max_bayt / 2 ** 20,
+                    'kayit': len(self._sira), 'nesne': len(self._nesneler), 'cikarilan': self.cikarilan}
+
+
+BELLEK_BUTCESI = BellekButcesi(int(BELLEK_BUTCESI_MB * 2 ** 20))
+
+
+class SinirliOnbellek:
+    """Eleman sayısı sınırlı, en eski kullanılanı (LRU) çıkaran, thread-safe önbellek.
+
+    Streamlit her etkileşimde betiği baştan çalıştırır; ancak içe aktarılan
+    modüller süreç boyunca yaşar. Bu yüzden bu sınıfın modül seviyesindeki
+    örnekleri tüm oturumlar arasında paylaşılır. `ttl` (saniye) verilirse
+    kayıtlar bu süre sonunda geçersiz sayılır. `butce` (BellekButcesi) verilirse
+    kayıtlar ayrıca süreç geneli bellek bütçesine sayılır ve bütçe aşıldığında çıkarılabilir.
+    """
+
+    def __init__(self, max_oge=32, ttl=None, butce=None):
+        if max_oge < 1:
+            raise ValueError("max_oge en az 1 olmalıdır.")
+        self.max_oge = max_oge
+        self.ttl = ttl
+        self.butce = butce
+        self._veri = OrderedDict()
+        self._kilit = threading.RLock()
+        self.isabet = 0
+        self.iska = 0
+
+    def get(self, anahtar, varsayilan=None):
+        with self._kilit:
+            if anahtar in self._veri:
+                zaman, deger = self._veri[anahtar]
+                if self.ttl is None or time.monotonic() - zaman < self.ttl:
+                    self._veri.move_to_end(anahtar)
+                    self.isabet += 1
+                    if self.butce is not None:
+                        self.butce.dokun(self, anahtar)
+                    return deger
+                del self._veri[anahtar]
+                if self.butce is not None:
+                    self.butce.birak(self, anahtar)
+            self.iska += 1
+            return varsayilan
+
+    def set(self, anahtar, deger):
+        with self._kilit:
+            self._veri[anahtar] = (time.monotonic(), deger)
+            self._veri.move_to_end(anahtar)
+            cikan = []
+            while len(self._veri) > self.max_oge:
+                cikan.append(self._veri.popitem(last=False)[0])
+        if self.butce is not None:
+            for eski in cikan:
+                self.butce.birak(self, eski)
+            self.butce.ekle(self, anahtar, deger)
+
+    def _butceden_cikar(self, anahtar, kimlik):
+        # Bütçe tarafından çağrılır; kayıt bu arada yenilenmişse dokunulmaz
+        with self._kilit:
+            kayit = self._veri.get(anahtar)
+            if kayit is not None and id(kayit[1]) == kimlik:
+                del self._veri[anahtar]
+
+    def get_or_compute(self, anahtar, hesapla):
+        """Anahtar önbellekte yoksa `hesapla()` sonucunu kaydedip döndürür."""
+        deger = self.get(anahtar, _YOK)
+        if deger is _YOK:
+            deger = hesapla()
+            self.set(anahtar, deger)
+        return deger
+
+    def pop(self, anahtar, varsayilan=None):
+        with self._kilit:
+            kayit = self._veri.pop(anahtar, None)
+            if kayit is not None and self.butce is not None:
+                self.butce.birak(self, anahtar)
+            return varsayilan if kayit is None else kayit[1]
+
+    def kosullu_sil(self, kosul):
+        """`kosul(anahtar)` True dönen tüm kayıtları siler (ör. bir kullanıcıya ait girdiler)."""
+        with self._kilit:
+            for anahtar in [a for a in self._veri if kosul(a)]:
+                del self._veri[anahtar]
+                if self.butce is not None:
+                    self.butce.birak(self, anahtar)
+
+    def clear(self):
+        with self._kilit:
+            if self.butce is not None:
+                for anahtar in self._veri:
+                    self.butce.birak(self, anahtar)
+            self._veri.clear()
+
+    def __contains__(self, anahtar):
+        with self._kilit:
+            kayit = self._veri.get(anahtar)
+            return kayit is not None and (self.ttl is None or time.monotonic() - kayit[0] < self.ttl)
+
+    def __len__(self):
+        with self._kilit:
+            return len(self._veri)
+
+
+_YOK = object()
+
+
+def bayt_parmak_izi(veri):
+    """Ham dosya içeriği için kısa bir içerik özeti (SHA-256) döndürür."""
+    return hashlib.sha256(veri).hexdigest()
+
+
+# Paylaşılan (salt okunur) çerçevelerin parmak izleri: her yeniden çalıştırmada tüm satırlar tekrar özetlenmez
+_bilinen_izler = {}  # id(df) -> (zayıf referans, parmak izi)
+
+
+def veri_parmak_izi(df):
+    """DataFrame'in içerik tabanlı parmak izini döndürür (sütunlar, tipler ve değerler)."""
+    bilinen = _bilinen_izler.get(id(df))
+    if bilinen is not None and bilinen[0]() is df:
+        return bilinen[1]
+    h = hashlib.sha256()
+    h.update(repr(list(df.columns)).encode())
+    h.update(repr([str(t) for t in df.dtypes]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def _izi_hatirla(df, iz):
+    kimlik = id(df)
+
+    def unut(ref):
+        if _bilinen_izler.get(kimlik, (None,))[0] is ref:
+            _bilinen_izler.pop(kimlik, None)
+    _bilinen_izler[kimlik] = (weakref.ref(df, unut), iz)
+
+
+def cerceve_paylas(df):
+    """Tabloyu içerik parmak izine göre tekilleştirir; aynı içerik daha önce görüldüyse o nesneyi döndürür.
+
+    Aynı dosyayı/defteri açan oturumlar tek bir kopyayı paylaşır. Dönen tablo oturumlar
+    arasında ortaktır ve değiştirilmemelidir (analiz kodu girdiyi zaten değiştirmez).
+    """
+    iz = veri_parmak_izi(df)
+    paylasilan = CERCEVE_HAVUZU.get(iz)
+    if paylasilan is not None:
+        return paylasilan
+    _izi_hatirla(df, iz)
+    CERCEVE_HAVUZU.set(iz, df)
+    return df
+
+
+# Yüklenen dosyaların ayrıştırılmış hâli: (dosya adı, içerik özeti) -> DataFrame
+YUKLEME_ONBELLEGI = SinirliOnbellek(max_oge=16, butce=BELLEK_BUTCESI)
+# İçerik parmak izi -> oturumlar arasında paylaşılan tablo (bkz. cerceve_paylas)
+CERCEVE_HAVUZU = SinirliOnbellek(max_oge=64, butce=BELLEK_BUTCESI)
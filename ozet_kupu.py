@@ -0,0 +1,187 @@
+# KazKaz AI Finansal Danışman - Günlük Özet Küpü (Tarih x Kategori x Ürün)
+import numpy as np
+import pandas as pd
+
+from veri_yukleme import KATEGORIK_SUTUNLAR, TUTAR_SUTUNLARI
+
+# Panelde seçilebilen dönem sıklıkları (pandas resample kısaltması -> görünen ad)
+SIKLIKLAR = {'D': 'Günlük', 'W': 'Haftalık', 'M': 'Aylık', 'Q': 'Çeyreklik', 'Y': 'Yıllık'}
+
+# Net toplamların yanında, kırılımlarda kullanılan "yalnızca pozitif tutarlar" da ayrı tutulur
+POZITIF_SUTUNLAR = {'Gelir': 'Gelir_pozitif', 'Gider': 'Gider_pozitif'}
+
+
+def kup_olustur(df):
+    """Ham satırları (gün, Kategori, Satilan_Urun_Adi) hücrelerine toplar; veri başına bir kez çalışır.
+
+    Her hücrede net Gelir/Gider ve yalnızca pozitif tutarların toplamı bulunur. Böylece
+    toplamlar, dönem tabloları ve kırılımlar ham satırlar yerine hücreler üzerinden,
+    calistir_analiz'in kurallarıyla birebir aynı sonuçla hesaplanabilir.
+    """
+    olculer = pd.DataFrame(index=df.index)
+    for col in TUTAR_SUTUNLARI:
+        tutar = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        olculer[col] = tutar
+        olculer[POZITIF_SUTUNLAR[col]] = tutar.where(tutar > 0, 0)
+    anahtarlar = [pd.DatetimeIndex(df['Tarih']).normalize().rename('Tarih')]
+    anahtarlar += [df[col] for col in KATEGORIK_SUTUNLAR if col in df.columns]
+    kup = olculer.groupby(anahtarlar, observed=True, dropna=False, sort=False).sum().reset_index()
+    return kup.sort_values('Tarih', kind='stable', ignore_index=True)
+
+
+_GUN_NS = 86_400 * 10 ** 9
+_KARISIM = (np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB), np.uint64(0x9E3779B97F4A7C15))
+
+
+def _karistir(x):
+    # splitmix64 son karıştırma adımı: ham bitleri (tarih, tutar, kategori kodu özeti) iyi dağılmış özetlere çevirir.
+    # Büyük tablolarda geçici dizi ayırmamak için x yerinde değiştirilir
+    with np.errstate(over='ignore'):
+        x ^= x >> np.uint64(30)
+        x *= _KARISIM[0]
+        x ^= x >> np.uint64(27)
+        x *= _KARISIM[1]
+        x ^= x >> np.uint64(31)
+    return x
+
+
+def _sutun_ozeti(seri):
+    if isinstance(seri.dtype, pd.CategoricalDtype):
+        # Kategoriler (birkaç düzine) özetlenip kodlarla yayılır; eksik değer ayrı bir sabit alır
+        kategoriler = pd.util.hash_array(seri.cat.categories.to_numpy(dtype=object))
+        kodlar = seri.cat.codes.to_numpy()
+        return np.where(kodlar >= 0, kategoriler[np.maximum(kodlar, 0)], _KARISIM[2])
+    degerler = seri.to_numpy()
+    if degerler.dtype.kind in 'fiuM' and degerler.dtype.itemsize == 8:
+        return degerler.view(np.uint64)  # ham bitler; satır özeti sonda bir kez karıştırılır
+    return pd.util.hash_array(degerler)
+
+
+def _gun_degerleri(tarih):
+    # Günün başlangıcı (ns); DatetimeIndex.normalize ile aynıdır ama frekans çıkarımı yapmaz
+    tarih = pd.DatetimeIndex(tarih)
+    if tarih.tz is not None:
+        return tarih.normalize().asi8
+    ns = tarih.asi8
+    return np.where(tarih.isna(), ns, ns - ns % _GUN_NS)
+
+
+def gun_imzalari(df):
+    """Her gün için o günün satırlarından (sıraları dahil) tek bir uint64 imza üretir.
+
+    İki tablonun imzaları karşılaştırılarak eklenen, değişen ve silinen günler bulunur
+    (bkz. kup_guncelle). Sütunlar ham bitleri üzerinden karıştırılır; yeniden toplamaya
+    göre çok ucuzdur. Kayan nokta bitlerindeki zararsız farklar (ör. -0.0) günü yalnızca
+    gereksiz yere yeniden toplatır, sonucu değiştirmez.
+    """
+    gunler = _gun_degerleri(df['Tarih'])
+    sirali = bool(len(gunler) == 0 or (gunler[1:] >= gunler[:-1]).all())
+    if sirali:
+        # Defterler çoğunlukla tarih sıralıdır: gün sınırları tek geçişte bulunur, gruplama gerekmez
+        baslar = np.flatnonzero(np.r_[True, gunler[1:] != gunler[:-1]]) if len(gunler) else np.array([], dtype=int)
+        sira = np.arange(len(gunler)) - np.repeat(baslar, np.diff(np.r_[baslar, len(gunler)]))
+    else:
+        sira = pd.Series(gunler).groupby(gunler).cumcount().to_numpy()
+    # Satırın gün içindeki sırası da imzaya katılır: yer değiştiren satırlar hücre sırasını değiştirir
+    satir = sira.astype(np.uint64) + np.uint64(1)
+    with np.errstate(over='ignore'):
+        for col in df.columns:
+            satir *= _KARISIM[2]
+            satir ^= _sutun_ozeti(df[col])
+    karisik = _karistir(satir)
+    if sirali:
+        return pd.Series(np.add.reduceat(karisik, baslar) if len(baslar) else karisik,
+                         index=pd.DatetimeIndex(gunler[baslar], name='Tarih'))
+    return pd.Series(karisik, index=pd.DatetimeIndex(gunler, name='Tarih')).groupby(level=0).sum()
+
+
+def degisen_gunler(eski_imzalar, imzalar):
+    """İki imza serisinden eklenen/değişen ve silinen günleri (DatetimeIndex) döndürür."""
+    ortak = imzalar.index.intersection(eski_imzalar.index)
+    farkli = ortak[eski_imzalar.reindex(ortak).to_numpy() != imzalar.reindex(ortak).to_numpy()]
+    return imzalar.index.difference(eski_imzalar.index).union(farkli), eski_imzalar.index.difference(imzalar.index)
+
+
+def kup_guncelle(eski_kup, eski_imzalar, df, imzalar):
+    """Önceki küpü yalnızca imzası değişen günler için yeniden toplar; (küp, değişen gün sayısı) döndürür.
+
+    Değişmeyen günlerin hücreleri olduğu gibi korunur, eklenen/değişen günlerin hücreleri o
+    günlerin tüm satırlarından yeniden kurulur, silinen günler atılır. Gün içi hücre sırası
+    ve kategorik tipler de korunduğundan sonuç kup_olustur(df) ile birebir aynıdır. Tarih
+    sıralı defterlerde ilk değişen günden önceki satır ve hücrelere hiç dokunulmaz.
+    """
+    sutunlar = ['Tarih'] + [col for col in KATEGORIK_SUTUNLAR if col in df.columns]
+    if list(eski_kup.columns[:len(sutunlar)]) != sutunlar or len(eski_kup.columns) != len(sutunlar) + 2 * len(TUTAR_SUTUNLARI):
+        return kup_olustur(df), len(imzalar)
+    degisen, silinen = degisen_gunler(eski_imzalar, imzalar)
+    dokunulan = degisen.union(silinen)
+    # Küp tarihe göre sıralıdır: ilk değişen günden öncesi olduğu gibi kalır, yalnızca kuyruk süzülür
+    ilk = eski_kup['Tarih'].searchsorted(dokunulan[0]) if len(dokunulan) else len(eski_kup)
+    on, kuyruk = eski_kup.iloc[:ilk], eski_kup.iloc[ilk:]
+    kuyruk = kuyruk[~kuyruk['Tarih'].isin(dokunulan)]
+    if len(degisen):
+        tarih = df['Tarih']
+        bas = tarih.searchsorted(degisen[0]) if tarih.is_monotonic_increasing else 0
+        aday = df.iloc[bas:]
+        yeni = kup_olustur(aday[np.isin(_gun_degerleri(aday['Tarih']), degisen.asi8)])
+        kuyruk = pd.concat([kuyruk, yeni]).sort_values('Tarih', kind='stable') if len(kuyruk) else yeni
+    parcalar = [parca for parca in (on, kuyruk) if len(parca)]
+    if not parcalar:
+        return kup_olustur(df), len(dokunulan)
+    kup = pd.concat(parcalar, ignore_index=True)
+    for col in sutunlar[1:]:
+        if kup[col].dtype != df[col].dtype:
+            kup[col] = kup[col].astype(df[col].dtype)
+    return kup, len(dokunulan)
+
+
+def kup_filtrele(kup, baslangic=None, bitis=None, **secimler):
+    """Tarih aralığına (dahil) ve boyut seçimlerine (ör. Kategori='Kira') göre hücreleri süzer."""
+    maske = pd.Series(True, index=kup.index)
+    if baslangic is not None:
+        maske &= kup['Tarih'] >= pd.Timestamp(baslangic)
+    if bitis is not None:
+        maske &= kup['Tarih'] <= pd.Timestamp(bitis)
+    for boyut, deger in secimler.items():
+        maske &= kup[boyut] == deger
+    return kup if maske.all() else kup[maske]
+
+
+def donem_tablosu(kup, siklik='M'):
+    """Dönem başına Gelir, Gider, Net Kar ve Kar Marjı tablosu (hareketsiz dönemler 0)."""
+    gunluk = kup.groupby('Tarih', sort=True)[TUTAR_SUTUNLARI].sum()
+    tablo = gunluk.resample(siklik).sum()
+    tablo['Net Kar'] = tablo['Gelir'] - tablo['Gider']
+    tablo['Kar Marjı'] = (tablo['Net Kar'] / tablo['Gelir'] * 100).fillna(0)
+    return tablo
+
+
+def dagilim(kup, boyut, deger):
+    """Boyut değeri başına pozitif `deger` toplamı (ör. kategori bazında gider)."""
+    olcu = POZITIF_SUTUNLAR[deger]
+    seri = kup.loc[kup[olcu] > 0].groupby(boyut, observed=True)[olcu].sum()
+    seri.index.name = boyut
+    return seri.rename(deger)
+
+
+def kirilim_tablosu(kup, boyut, deger, siklik='M'):
+    """Her boyut değeri için dönemlik pozitif `deger` serilerini geniş tablo (dönem x grup) olarak döndürür."""
+    olcu = POZITIF_SUTUNLAR[deger]
+    hucreler = kup.loc[kup[olcu] > 0, ['Tarih', boyut, olcu]]
+    genis = hucreler.groupby([boyut, pd.Grouper(key='Tarih', freq=siklik)], observed=True)[olcu].sum().unstack(0, fill_value=0)
+    genis.columns.name = 'grup'
+    return genis.reindex(_donemler(kup, siklik), fill_value=0)
+
+
+def grup_serisi(kup, boyut, grup, deger, siklik='M'):
+    """Tek bir boyut değerinin (ör. bir ürün) dönemlik pozitif `deger` serisi."""
+    hucreler = kup_filtrele(kup, **{boyut: grup})
+    olcu = POZITIF_SUTUNLAR[deger]
+    seri = hucreler.groupby('Tarih', sort=True)[olcu].sum().resample(siklik).sum()
+    return seri.reindex(_donemler(kup, siklik), fill_value=0).rename(deger)
+
+
+def _donemler(kup, siklik):
+    # Grouper ile aynı etiketleri üretmek için ilk ve son günü aynı şekilde yeniden örnekle
+    uclar = pd.Series(0, index=pd.DatetimeIndex([kup['Tarih'].min(), kup['Tarih'].max()], name='Tarih'))
+    return uclar.resample(siklik).sum().index
@@ -0,0 +1,174 @@
+# KazKaz AI Finansal Danışman - PDF Rapor Üretimi (arka planda, bellek içi grafiklerle)
+import functools
+import io
+import os
+
+from analiz_motoru import tum_grafikler
+from bagimliliklar import fpdf
+from is_kuyrugu import ARKA_PLAN_ONCELIGI, ZAMANLAYICI
+from izleme import asama
+from onbellek import BELLEK_BUTCESI, SinirliOnbellek
+from ozet_kupu import SIKLIKLAR
+from tahmin_motoru import prophet_tahmini_yap, tahmin_grafigi, tahmin_isi
+from yorum_servisi import tahmin_yorumu_uret
+
+# Bu dosyanın çalışması için DejaVuSans.ttf dosyasının projenin ana klasöründe olması gerekir.
+FONT_YOLU = os.path.join(os.path.dirname(os.path.abspath(__file__)), "DejaVuSans.ttf")
+
+GRAFIK_BASLIKLARI = {
+    "fig_bar": '{siklik} Gelir & Gider',
+    "fig_line": '{siklik} Net Kar Trendi',
+    "fig_pie": 'Gider Dağılımı',
+}
+
+# Hazır PDF baytları: (analiz parmak izi, tahmin anahtarı, yorum var mı) -> bytes
+PDF_ONBELLEGI = SinirliOnbellek(max_oge=32, butce=BELLEK_BUTCESI)
+
+
+def font_mevcut():
+    return os.path.exists(FONT_YOLU)
+
+
+@functools.lru_cache(maxsize=None)
+def _pdf_sinifi():
+    # fpdf yalnızca ilk rapor üretilirken yüklenir (Uzman planı); sınıf bir kez tanımlanır
+    class PDF(fpdf().FPDF):
+        def header(self):
+            # GÜNCELLENDİ: Unicode fontu kullan
+            self.set_font('DejaVu', 'B', 15)
+            self.cell(0, 10, 'KazKaz AI Finansal Analiz Raporu', 0, 1, 'C')
+            self.ln(10)
+
+        def chapter_title(self, title):
+            # GÜNCELLENDİ: Unicode fontu kullan
+            self.set_font('DejaVu', 'B', 12)
+            self.cell(0, 10, title, 0, 1, 'L')
+            self.ln(4)
+
+        def chapter_body(self, body):
+            # GÜNCELLENDİ: Unicode fontu kullan
+            self.set_font('DejaVu', '', 10)
+            self.multi_cell(0, 5, body)
+            self.ln()
+
+        def add_metric(self, label, value):
+            # GÜNCELLENDİ: Unicode fontu kullan
+            self.set_font('DejaVu', 'B', 10)
+            self.cell(95, 8, label, 1, 0, 'L')
+            self.set_font('DejaVu', '', 10)
+            # GÜNCELLENDİ: Hataları önlemek için değeri string'e çevir
+            self.cell(95, 8, str(value), 1, 1, 'R')
+
+    return PDF
+
+
+def grafikleri_png_yap(figurler, ilerleme=None):
+    """Figürleri bellek içi PNG'ye çevirir; diske geçici dosya yazılmaz.
+
+    `figurler` (ad, figür) listesidir; aynı sırayla (ad, bytes) listesi döner. Her figür
+    paylaşılan zamanlayıcıda bir iştir ve boştaki işçilerde paralel çizilir; PDF işinin
+    içinden çağrıldığında henüz başlamamış figürleri PDF işçisi kendisi çizer.
+    """
+    with asama('pdf_grafik', satir=len(figurler), detay='kaleido'):
+        # Grafik önbelleğindeki figürler oturumlar arasında ortaktır; aynı figür aynı anda bir kez çizilir
+        isler = [(ad, ZAMANLAYICI.gonder('png', id(fig), functools.partial(_png_yap, fig), ad=f"Grafik ({ad})")) for ad, fig in figurler]
+        sonuclar = []
+        for i, (ad, is_) in enumerate(isler, start=1):
+            sonuclar.append((ad, is_.sonuc()))
+            if ilerleme:
+                ilerleme(0.3 + 0.6 * i / len(isler), f"Grafikler hazırlanıyor ({i}/{len(isler)})")
+        return sonuclar
+
+
+def _png_yap(fig, ilerleme):
+    return fig.to_image(format='png', scale=2)
+
+
+def generate_pdf_report(analiz, stratejik_yorum=None, forecast_fig=None, ilerleme=None):
+    """Analiz, tahmin grafiği ve stratejik yorumdan PDF üretir; font yoksa None döner."""
+    with asama('pdf'):
+        return _pdf_olustur(analiz, stratejik_yorum, forecast_fig, ilerleme)
+
+
+def _pdf_olustur(analiz, stratejik_yorum, forecast_fig, ilerleme):
+    pdf = _pdf_sinifi()()
+
+    try:
+        pdf.add_font("DejaVu", "", FONT_YOLU, uni=True)
+        pdf.add_font("DejaVu", "B", FONT_YOLU, uni=True) # Kalın (Bold) versiyonu için
+    except FileNotFoundError:
+        return None # Font yoksa PDF oluşturmayı durdur
+
+    pdf.add_page()
+
+    # Genel Bakış
+    pdf.chapter_title('Genel Finansal Durum')
+    pdf.add_metric('Toplam Gelir:', f"{analiz['toplam_gelir']:,.2f} TL")
+    pdf.add_metric('Toplam Gider:', f"{analiz['toplam_gider']:,.2f} TL")
+    pdf.add_metric('Net Kar:', f"{analiz['net_kar']:,.2f} TL")
+    pdf.add_metric('Kar Marjı:', f"{analiz['kar_marji']:.2f}%")
+    pdf.add_metric('En Yüksek Gider Kategorisi:', analiz['en_yuksek_gider_kategorisi'])
+    pdf.ln(10)
+
+    # Grafikler (tahmin grafiği dahil) tek seferde, paralel olarak resme çevrilir
+    figurler = [(ad, fig) for ad, fig in tum_grafikler(analiz) if fig]
+    if forecast_fig:
+        figurler.append(("forecast", forecast_fig))
+    for name, png in grafikleri_png_yap(figurler, ilerleme):
+        if name in GRAFIK_BASLIKLARI: pdf.chapter_title(GRAFIK_BASLIKLARI[name].format(siklik=SIKLIKLAR[analiz.get('siklik', 'M')]))
+        if name == "forecast": pdf.chapter_title('Gelecek Gelir Tahmini')
+        pdf.image(io.BytesIO(png), x=None, y=None, w=180)
+        pdf.ln(5)
+
+    # Stratejik Yorum
+    if stratejik_yorum:
+        pdf.chapter_title('Stratejik Tahmin Analizi')
+        pdf.chapter_body(stratejik_yorum)
+
+    if ilerleme:
+        ilerleme(0.95, "PDF birleştiriliyor")
+    return bytes(pdf.output(dest='S'))
+
+
+def rapor_hazirla(analiz, api_key=None, ilerleme=None, ayarlar=None):
+    """PDF için tahmin, stratejik yorum ve raporu sırayla hazırlar.
+
+    Paneldeki arka plan işi ve toplu_rapor.py aynı akışı kullanır; api_key yoksa yorum atlanır.
+    `ayarlar` tahmin motoru ayarlarıdır (varsayılan: uygulamanın politikası); panel,
+    tahmin sekmesinin kullandığı sabitlenmiş ayarları (bkz. tahmin_motoru.ayarlari_sabitle) verir.
+    """
+    ilerleme = ilerleme or (lambda oran, durum: None)
+    ilerleme(0.1, "Tahmin hazırlanıyor")
+    # Tahmin tek sefer fit edilir (tahmin_motoru önbelleği); PDF ve tahmin sekmesi aynı sonucu kullanır.
+    # Sekmenin sıradaki tahmin işi varsa PDF işi onu devralır, çalışıyorsa bitmesini bekler
+    tahmin_isi_, ayarlar = tahmin_isi(analiz['aylik_veri'], ayarlar)
+    if tahmin_isi_ is not None:
+        tahmin_isi_.sonuc()
+    model, tahmin = prophet_tahmini_yap(analiz['aylik_veri'], ayarlar)
+    forecast_fig = None
+    stratejik_yorum = "Tahmin için yeterli veri yok."
+    if model and tahmin is not None:
+        forecast_fig = tahmin_grafigi(analiz['aylik_veri'], ayarlar)
+        if api_key:
+            ilerleme(0.2, "Stratejik yorum üretiliyor")
+            stratejik_yorum = tahmin_yorumu_uret(api_key, tahmin)
+    return generate_pdf_report(analiz, stratejik_yorum, forecast_fig, ilerleme)
+
+
+def pdf_isi_baslat(anahtar, hazirla, oncelik=ARKA_PLAN_ONCELIGI, oturum=None):
+    """`hazirla(ilerleme_bildir)` çağrısını paylaşılan zamanlayıcıda (bkz. is_kuyrugu.py) çalıştırır ve Is döndürür.
+
+    Aynı anahtar için sırada veya çalışmakta olan bir iş varsa yenisi başlatılmaz; başarıyla
+    biten sonuç PDF_ONBELLEGI'ne yazılır, böylece tekrar indirmeler ücretsizdir. Kuyruk
+    doluysa is_kuyrugu.KuyrukDolu fırlatılır.
+    """
+    return ZAMANLAYICI.gonder('pdf', anahtar, functools.partial(_isi_calistir, anahtar, hazirla), oncelik, oturum, ad="PDF raporu")
+
+
+def _isi_calistir(anahtar, hazirla, ilerleme):
+    ilerleme(0.05, "Hazırlanıyor")
+    pdf_bytes = hazirla(ilerleme)
+    if pdf_bytes:
+        PDF_ONBELLEGI.set(anahtar, pdf_bytes)
+    ilerleme(1.0, "Tamamlandı")
+    return pdf_bytes
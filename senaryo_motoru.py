@@ -0,0 +1,149 @@
+# KazKaz AI Finansal Danışman - Monte Carlo Senaryo Simülasyonu (Tahmin Üzerinde, Vektörel)
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from hizli_tahmin import Z_80
+from izleme import asama
+from onbellek import BELLEK_BUTCESI, SinirliOnbellek
+from tahmin_motoru import prophet_tahmini_yap, tahmin_anahtari
+
+VARSAYILAN_YOL = 10_000
+VARSAYILAN_UFUK = 12
+# Gider tabanı son TABAN_AY ayın ortalamasıdır; sapmalar son ORNEK_AY aydan yeniden örneklenir
+TABAN_AY = 12
+ORNEK_AY = 36
+YUZDELIKLER = (5, 25, 50, 75, 95)
+TUM_GIDERLER = '(Tüm giderler)'
+
+# Kaydırıcı değişikliklerinde aynı senaryo yeniden simüle edilmez
+SENARYO_ONBELLEGI = SinirliOnbellek(max_oge=256, butce=BELLEK_BUTCESI)
+
+
+def kategori_giderleri(kup):
+    """Küpten aylık net gider tablosu (ay x Kategori); Kategori yoksa tek sütun."""
+    if 'Kategori' in kup.columns:
+        kategori = kup['Kategori'].astype(object).where(kup['Kategori'].notna(), '(Kategorisiz)').astype(str)
+    else:
+        kategori = pd.Series(TUM_GIDERLER, index=kup.index)
+    tablo = kup['Gider'].groupby([kup['Tarih'], kategori.rename('Kategori')]).sum().unstack('Kategori', fill_value=0)
+    return tablo.resample('M').sum()
+
+
+def _gecmis_orneklem(tahmin, aylik_gelir, giderler):
+    # Geçmiş aylar için gelir artığı (standartlaştırılmış) ve kategori gider sapmaları aynı
+    # aydan birlikte örneklenir; böylece gelir ile gider arasındaki ilişki korunur.
+    gecmis = tahmin.set_index('ds')['yhat'].reindex(aylik_gelir.index)
+    artik = (aylik_gelir - gecmis).dropna()
+    artik = artik[artik != 0] if (artik != 0).any() else artik  # Holt'un başlangıç ayları artıksızdır
+    aylar = artik.index.intersection(giderler.index)[-ORNEK_AY:]
+    if len(aylar) == 0:
+        aylar = giderler.index[-1:]
+        artik = pd.Series(0.0, index=aylar)
+    olcek = artik.std(ddof=1) if len(artik) > 1 else 0.0
+    eps = (artik.reindex(aylar) / olcek).to_numpy() if olcek > 0 else np.zeros(len(aylar))
+
+    taban = giderler.iloc[-TABAN_AY:].mean().to_numpy()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sapma = np.where(taban > 0, giderler.reindex(aylar).to_numpy() / taban - 1, 0.0)
+    return eps, taban, sapma
+
+
+def senaryo_simule_et(tahmin, aylik_gelir, giderler, gelir_buyume=0.0, gider_soklari=None,
+                      baslangic_nakit=0.0, ufuk=VARSAYILAN_UFUK, yol=VARSAYILAN_YOL, tohum=0):
+    """Tahmin üzerinde `yol` adet aylık gelir/gider yolu simüle eder; nakit pisti ve zarar olasılıklarını döndürür.
+
+    Gelir: tahmin (yhat) x yıllık `gelir_buyume` (%) değişimi + tahmin aralığından çıkan
+    sapma x geçmiş artıklardan yeniden örneklenmiş standart şok. Tahmin ufkunun ötesinde son
+    tahmin değeri sabit tutulur, belirsizlik karekök(ay) ile büyür. Gider: Kategori başına son
+    TABAN_AY ayın ortalaması x (1 + şok %) x aynı geçmiş aydan örneklenen göreli sapma.
+    `gider_soklari` {Kategori: %} sözlüğüdür; TUM_GIDERLER anahtarı tüm kategorilere uygulanır.
+    Aynı girdi ve `tohum` için sonuç birebir aynıdır.
+    """
+    gider_soklari = gider_soklari or {}
+    gelecek = tahmin[tahmin['ds'] > aylik_gelir.index[-1]]
+    yhat = gelecek['yhat'].to_numpy(dtype=float)[:ufuk]
+    sigma = ((gelecek['yhat_upper'] - gelecek['yhat_lower']) / (2 * Z_80)).to_numpy(dtype=float)[:ufuk]
+    if len(yhat) < ufuk:
+        # Tahmin ufkunun ötesi: son değer sabit, belirsizlik karekök(ay) ile büyür
+        ek = np.arange(1, ufuk - len(yhat) + 1)
+        son_yhat = yhat[-1] if len(yhat) else aylik_gelir.iloc[-1]
+        son_sigma = sigma[-1] if len(sigma) else 0.0
+        yhat = np.concatenate([yhat, np.full(len(ek), son_yhat)])
+        sigma = np.concatenate([sigma, son_sigma * np.sqrt(1 + ek / max(len(gelecek), 1))])
+    aylar = pd.date_range(aylik_gelir.index[-1], periods=ufuk + 1, freq='M')[1:]
+
+    eps, taban, sapma = _gecmis_orneklem(tahmin, aylik_gelir, giderler)
+    kategoriler = list(giderler.columns)
+    carpan = np.array([1 + (gider_soklari.get(k, 0.0) + gider_soklari.get(TUM_GIDERLER, 0.0)) / 100 for k in kategoriler])
+    senaryo_taban = taban * carpan
+    # Her geçmiş ay için toplam gider tek bir sayıya indirgenir; yollar yalnızca bir indeks dizisidir
+    ay_gideri = senaryo_taban.sum() + sapma @ senaryo_taban
+
+    rng = np.random.default_rng(tohum)
+    secim = rng.integers(0, len(eps), size=(yol, ufuk))
+    buyume = (1 + gelir_buyume / 100) ** (np.arange(1, ufuk + 1) / 12)
+    gelir = yhat * buyume + sigma * eps[secim]
+    gider = ay_gideri[secim]
+    net = gelir - gider
+    nakit = baslangic_nakit + np.cumsum(net, axis=1)
+
+    tukenen = nakit < 0
+    # Nakdin ilk kez eksiye düştüğü ay (1..ufuk); hiç düşmeyen yollar ufuk + 1 olarak sayılır
+    pist = np.where(tukenen.any(axis=1), tukenen.argmax(axis=1) + 1, ufuk + 1)
+    pist_dagilimi = pd.Series(np.bincount(pist, minlength=ufuk + 2)[1:] / yol,
+                              index=[str(i) for i in range(1, ufuk + 1)] + [f">{ufuk}"], name='Olasılık')
+    yuzdelik = lambda x: pd.DataFrame(np.percentile(x, YUZDELIKLER, axis=0).T, index=aylar, columns=[f"P{p}" for p in YUZDELIKLER])
+    return {
+        'aylar': aylar,
+        'yol': yol,
+        'ufuk': ufuk,
+        'net_yuzdelik': yuzdelik(net),
+        'nakit_yuzdelik': yuzdelik(nakit),
+        'zarar_olasiligi': pd.Series((net < 0).mean(axis=0), index=aylar, name='Zarar Olasılığı'),
+        'toplam_zarar_olasiligi': float((net.sum(axis=1) < 0).mean()),
+        'nakit_bitme_olasiligi': float((pist <= ufuk).mean()),
+        'pist_medyan': int(np.median(pist)),
+        'pist_dagilimi': pist_dagilimi,
+        'beklenen_net': float(net.sum(axis=1).mean()),
+    }
+
+
+def senaryo_getir(analiz, gelir_buyume=0.0, gider_soklari=None, baslangic_nakit=0.0,
+                  ufuk=VARSAYILAN_UFUK, yol=VARSAYILAN_YOL, tohum=0, ayarlar=None):
+    """Analizin aylık gelir tahmini üzerinde senaryoyu simüle eder; senaryo parametrelerine göre önbelleklidir."""
+    aylik_gelir = analiz['aylik_veri']['Gelir']
+    _, tahmin = prophet_tahmini_yap(analiz['aylik_veri'][['Gelir']], ayarlar)
+    if tahmin is None:
+        return None
+    soklar = tuple(sorted((k, round(float(v), 4)) for k, v in (gider_soklari or {}).items() if v))
+    anahtar = (analiz['parmak_izi'], tahmin_anahtari(analiz['aylik_veri'][['Gelir']], ayarlar), round(float(gelir_buyume), 4),
+               soklar, round(float(baslangic_nakit), 2), int(ufuk), int(yol), int(tohum))
+
+    def hesapla():
+        giderler = SENARYO_ONBELLEGI.get_or_compute((analiz['parmak_izi'], 'giderler'), lambda: kategori_giderleri(analiz['kup']))
+        with asama('senaryo', satir=yol, detay=f"{ufuk} ay"):
+            return senaryo_simule_et(tahmin, aylik_gelir, giderler, gelir_buyume, dict(soklar), baslangic_nakit, ufuk, yol, tohum)
+    return SENARYO_ONBELLEGI.get_or_compute(anahtar, hesapla)
+
+
+def nakit_yelpaze_grafigi(sonuc):
+    """Nakit bakiyesinin yüzdelik bantları (P5-P95, P25-P75) ve medyanı."""
+    tablo = sonuc['nakit_yuzdelik']
+    fig = go.Figure()
+    for alt, ust, renk in (('P5', 'P95', 'rgba(0, 114, 178, 0.15)'), ('P25', 'P75', 'rgba(0, 114, 178, 0.3)')):
+        fig.add_trace(go.Scatter(x=tablo.index, y=tablo[alt], mode='lines', line=dict(width=0), hoverinfo='skip', showlegend=False))
+        fig.add_trace(go.Scatter(x=tablo.index, y=tablo[ust], mode='lines', line=dict(width=0), fill='tonexty',
+                                 fillcolor=renk, name=f"{alt}-{ust}"))
+    fig.add_trace(go.Scatter(x=tablo.index, y=tablo['P50'], mode='lines+markers', name='Medyan', line=dict(color='#0072B2', width=2)))
+    fig.add_hline(y=0, line_dash='dash', line_color='red')
+    fig.update_layout(title=f"Nakit Bakiyesi Dağılımı ({sonuc['yol']:,} yol)", xaxis_title="Ay", yaxis_title="Nakit (TL)")
+    return fig
+
+
+def pist_grafigi(sonuc):
+    """Nakdin ilk kez eksiye düştüğü ayın dağılımı (nakit pisti)."""
+    dagilim = sonuc['pist_dagilimi']
+    fig = go.Figure(go.Bar(x=dagilim.index, y=dagilim.values * 100))
+    fig.update_layout(title="Nakit Pisti Dağılımı", xaxis_title="Nakdin tükendiği ay", yaxis_title="Olasılık (%)")
+    return fig
@@ -0,0 +1,215 @@
+# KazKaz AI Finansal Danışman - Artımlı Google Sheets Senkronizasyonu
+import os
+import threading
+
+import pandas as pd
+
+from onbellek import BELLEK_BUTCESI, SinirliOnbellek
+from veri_yukleme import KATEGORIK_SUTUNLAR, eksik_sutun_hatasi, tarih_formati_bul, tipleri_duzenle
+
+# Her batch_get çağrısında okunan blok sayısı ve blok başına satır (kota: çağrı başına, hücre başına değil)
+BLOK_SATIR = int(os.environ.get("KAZKAZ_SHEETS_BLOK_SATIR", "5000"))
+CAGRI_BASINA_BLOK = 4
+# Tutarlar ham sayı olarak, tarihler sayfada görünen metin olarak gelsin (seri numarası değil)
+OKUMA_AYARLARI = {'value_render_option': 'UNFORMATTED_VALUE', 'date_time_render_option': 'FORMATTED_STRING'}
+
+# Sayfa URL'si -> SenkronDurumu; aynı sayfayı çeken tüm kullanıcılar aynı kopyayı paylaşır
+SAYFA_ONBELLEGI = SinirliOnbellek(max_oge=64, butce=BELLEK_BUTCESI)
+_url_kilitleri = {}
+_kilitler_kilidi = threading.Lock()
+
+
+class SenkronDurumu:
+    """Bir sayfanın en son senkronize edilmiş hâli."""
+
+    def __init__(self, tablo, basliklar, satir_sayisi, son_satir, revizyon, df, tarih_formati):
+        self.tablo = tablo
+        self.basliklar = basliklar
+        self.satir_sayisi = satir_sayisi  # başlık hariç, okunmuş ham satır sayısı
+        self.son_satir = son_satir
+        self.revizyon = revizyon
+        self.df = df
+        self.tarih_formati = tarih_formati
+
+
+def _kilit(url):
+    with _kilitler_kilidi:
+        return _url_kilitleri.setdefault(url, threading.Lock())
+
+
+def _revizyon(tablo):
+    # Drive'daki son değişiklik zamanı; alınamazsa None (o zaman satır kuyruğu kontrol edilir)
+    try:
+        return tablo.get_lastUpdateTime()
+    except Exception:
+        return None
+
+
+def _satirlari_oku(sayfa, ilk_satir):
+    """`ilk_satir`dan (1 tabanlı) itibaren veri bitene kadar blok blok okur; (başlıklar, satırlar) döndürür.
+
+    Başlık satırı ilk çağrıya eklenir, ayrı bir istek yapılmaz. Dolu gelmeyen ilk blokta
+    okuma biter; API aralık sonundaki boş satırları zaten döndürmez.
+    """
+    basliklar, satirlar, bas = None, [], ilk_satir
+    while True:
+        araliklar = [f"{b}:{b + BLOK_SATIR - 1}" for b in range(bas, bas + BLOK_SATIR * CAGRI_BASINA_BLOK, BLOK_SATIR)]
+        if basliklar is None:
+            araliklar.insert(0, "1:1")
+        bloklar = sayfa.batch_get(araliklar, **OKUMA_AYARLARI)
+        if basliklar is None:
+            basliklar = [str(b) for b in bloklar[0][0]] if bloklar[0] else []
+            bloklar = bloklar[1:]
+        for blok in bloklar:
+            satirlar.extend(blok)
+            if len(blok) < BLOK_SATIR:
+                return basliklar, satirlar
+        bas += BLOK_SATIR * CAGRI_BASINA_BLOK
+
+
+def _tipli_tablo(basliklar, satirlar, tarih_formati):
+    """Ham hücre listelerini tek seferde tipli DataFrame'e çevirir (satır başına sözlük kurulmaz)."""
+    genislik = len(basliklar)
+    # API satır sonundaki boş hücreleri göndermez (tamamen boş satır [] gelir ve atlanır)
+    dolu = [satir if len(satir) == genislik else (list(satir) + [''] * genislik)[:genislik] for satir in satirlar if satir]
+    df = pd.DataFrame(dolu, columns=basliklar, dtype=object)
+    df = df.mask(df.eq(''))
+    if eksik_sutun_hatasi(df.columns):
+        return df, tarih_formati  # Eksik sütun hatasını tablo_dogrula bildirir
+    tarih_formati = tarih_formati or tarih_formati_bul(df['Tarih'])
+    return tipleri_duzenle(df, fmt=tarih_formati), tarih_formati
+
+
+def _birlestir(eski, yeni):
+    birlesik = pd.concat([eski, yeni], ignore_index=True)
+    for col in KATEGORIK_SUTUNLAR:
+        if col in birlesik.columns and not isinstance(birlesik[col].dtype, pd.CategoricalDtype):
+            birlesik[col] = birlesik[col].astype('category')
+    return birlesik
+
+
+def _tam_senkron(tablo, revizyon):
+    basliklar, satirlar = _satirlari_oku(tablo.sheet1, 2)
+    df, tarih_formati = _tipli_tablo(basliklar, satirlar, None)
+    son_satir = list(satirlar[-1]) if satirlar else None
+    return SenkronDurumu(tablo, basliklar, len(satirlar), son_satir, revizyon, df, tarih_formati)
+
+
+def sayfa_senkronize(istemci, url, tam=False):
+    """Sayfayı önbellekteki kopyaya göre artımlı senkronize eder; (df, yeni satır sayısı) döndürür.
+
+    - Revizyon (Drive son değişiklik zamanı) değişmediyse hiç değer okunmaz.
+    - Aksi hâlde başlık, bilinen son satır ve sonrası tek batch_get ile okunur; yalnızca
+      yeni satırlar tiplenip mevcut tabloya eklenir.
+    - Başlık ya da bilinen son satır değişmişse (düzenleme/silme), ya da revizyon değiştiği
+      hâlde yeni satır yoksa sayfa baştan okunur. `tam=True` her zaman baştan okur.
+
+    Yeni satır eklenirken aynı anda ortadaki bir satır düzenlendiyse bu fark edilmez;
+    defterlerin sona eklenerek büyüdüğü varsayılır.
+    """
+    with _kilit(url):
+        durum = None if tam else SAYFA_ONBELLEGI.get(url)
+        tablo = durum.tablo if durum is not None else istemci.open_by_url(url)
+        revizyon = _revizyon(tablo)
+        if durum is not None and revizyon is not None and revizyon == durum.revizyon:
+            return durum.df, 0
+
+        if durum is not None and durum.son_satir is not None:
+            # Bilinen son satır (başlık satırı 1 olduğundan satir_sayisi + 1. satır) tekrar okunur
+            basliklar, satirlar = _satirlari_oku(tablo.sheet1, durum.satir_sayisi + 1)
+            kuyruk_ayni = bool(satirlar) and list(satirlar[0]) == durum.son_satir
+            yeni = satirlar[1:]
+            if basliklar == durum.basliklar and kuyruk_ayni and (yeni or revizyon is None):
+                if yeni:
+                    eklenecek, _ = _tipli_tablo(basliklar, yeni, durum.tarih_formati)
+                    durum = SenkronDurumu(tablo, basliklar, durum.satir_sayisi + len(yeni), list(yeni[-1]),
+                                          revizyon, _birlestir(durum.df, eklenecek), durum.tarih_formati)
+                    SAYFA_ONBELLEGI.set(url, durum)
+                else:
+                    durum.revizyon = revizyon
+                return durum.df, len(yeni)
+
+        durum = _tam_senkron(tablo, revizyon)
+        SAYFA_ONBELLEGI.set(url, durum)
+        return durum.df, len(durum.df)
+
+
+class _YerelSayfa:
+    def __init__(self, istemci, url):
+        self._istemci = istemci
+        self._url = url
+
+    def batch_get(self, araliklar, **ayarlar):
+        self._istemci.cagri_sayisi += 1
+        satirlar = self._istemci.tablolar[self._url]
+        sonuc = []
+        for aralik in araliklar:
+            bas, bit = (int(x) for x in aralik.split(':'))
+            blok = [list(s) for s in satirlar[bas - 1:bit]]
+            self._istemci.okunan_hucre += sum(len(s) for s in blok)
+            sonuc.append(blok)
+        return sonuc
+
+    def get_all_records(self):
+        self._istemci.cagri_sayisi += 1
+        basliklar, *veri = self._istemci.tablolar[self._url]
+        self._istemci.okunan_hucre += sum(len(s) for s in veri) + len(basliklar)
+        return [dict(zip(basliklar, satir)) for satir in veri]
+
+
+class _YerelTablo:
+    def __init__(self, istemci, url):
+        self._istemci = istemci
+        self.sheet1 = _YerelSayfa(istemci, url)
+        self._url = url
+
+    def get_lastUpdateTime(self):
+        self._istemci.cagri_sayisi += 1
+        return str(self._istemci.revizyonlar[self._url])
+
+
+class YerelSheetsIstemcisi:
+    """Ağ erişimi olmadan test ve kıyaslama için sahte gspread istemcisi.
+
+    Sayfalar başlık dahil satır listeleri olarak tutulur; `cagri_sayisi` ve
+    `okunan_hucre` API kotası yerine kullanılabilir. `varsayilan` verilirse
+    bilinmeyen her URL bu sayfanın bir kopyasını açar.
+    """
+
+    def __init__(self, tablolar=None, varsayilan=None):
+        self.tablolar = {url: [list(s) for s in satirlar] for url, satirlar in (tablolar or {}).items()}
+        self.revizyonlar = {url: 0 for url in self.tablolar}
+        self.varsayilan = varsayilan
+        self.cagri_sayisi = 0
+        self.okunan_hucre = 0
+
+    @staticmethod
+    def csvden(yol):
+        """CSV dosyasını Sheets'in döndüreceği biçimde (sayılar sayı, tarihler metin) satır listesine çevirir."""
+        df = pd.read_csv(yol, dtype={'Tarih': str})
+        return [list(df.columns)] + df.astype(object).where(df.notna(), '').values.tolist()
+
+    def open_by_url(self, url):
+        self.cagri_sayisi += 1
+        if url not in self.tablolar:
+            if self.varsayilan is None:
+                raise KeyError(f"Sayfa bulunamadı: {url}")
+            self.tablolar[url] = [list(s) for s in self.varsayilan]
+            self.revizyonlar[url] = 0
+        return _YerelTablo(self, url)
+
+    def satir_ekle(self, url, satirlar):
+        self.tablolar[url].extend(list(s) for s in satirlar)
+        self.revizyonlar[url] += 1
+
+    def hucre_guncelle(self, url, satir, sutun, deger):
+        """1 tabanlı (başlık = 1. satır) hücreyi değiştirir."""
+        self.tablolar[url][satir - 1][sutun - 1] = deger
+        self.revizyonlar[url] += 1
+
+
+def yerel_istemci():
+    """KAZKAZ_SHEETS_ISTEMCISI=yerel ise örnek veriyle dolu sahte istemciyi, değilse None döndürür."""
+    if os.environ.get("KAZKAZ_SHEETS_ISTEMCISI") != "yerel":
+        return None
+    return YerelSheetsIstemcisi(varsayilan=YerelSheetsIstemcisi.csvden(os.path.join(os.path.dirname(os.path.abspath(__file__)), "ornek_veri.csv")))
@@ -0,0 +1,502 @@
+# KazKaz AI Finansal Danışman - Gelir Tahmin Motoru (Prophet / NumPy + Önbellek)
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from bagimliliklar import plotly_express, prophet, prophet_plot, prophet_serialize
+from grafik_inceltme import HEDEF_NOKTA, figuru_incelt
+from hizli_tahmin import holt_fit, sezonsal_naif_fit
+from is_kuyrugu import ARKA_PLAN_ONCELIGI, ZAMANLAYICI, IsIptal
+from izleme import asama
+from onbellek import BELLEK_BUTCESI, SinirliOnbellek
+
+# Model ayarları önbellek anahtarının parçasıdır; ayar değişirse yeni bir fit yapılır.
+# motor: 'prophet', 'holt', 'sezonsal_naif' veya 'otomatik' (bkz. motor_sec)
+VARSAYILAN_AYARLAR = {
+    'motor': os.environ.get("KAZKAZ_TAHMIN_MOTORU", "otomatik"),
+    'yearly_seasonality': True,
+    'weekly_seasonality': False,
+    'daily_seasonality': False,
+    'periods': 3,
+    'freq': 'M',
+}
+
+# Eğitilmiş modeller ve tahmin tabloları yeniden başlatmalardan sonra da kullanılabilsin diye diske yazılır.
+TAHMIN_DIZINI = os.environ.get("KAZKAZ_TAHMIN_DIZINI", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".tahmin_onbellegi"))
+MAX_DISK_TAHMIN = int(os.environ.get("KAZKAZ_MAX_DISK_TAHMIN", "256"))
+
+# Prophet'in yıllık mevsimselliği bu kadar aydan kısa serilerde anlamsızdır
+PROPHET_MIN_AY = 24
+# 1 dakikalık yük ortalaması / çekirdek sayısı bu değeri aşarsa hızlı motora geçilir
+YUK_ESIGI = float(os.environ.get("KAZKAZ_YUK_ESIGI", "1.0"))
+
+TAHMIN_ONBELLEGI = SinirliOnbellek(max_oge=64)
+TAHMIN_GRAFIK_ONBELLEGI = SinirliOnbellek(max_oge=64, butce=BELLEK_BUTCESI)
+TOPLU_TAHMIN_ONBELLEGI = SinirliOnbellek(max_oge=16, butce=BELLEK_BUTCESI)
+# (ayarlar, serinin ilk ayı) -> son eğitilen model; veri yenilendiğinde yeni fit bundan sıcak başlar
+SON_FITLER = SinirliOnbellek(max_oge=64)
+# (seri özeti, istenen ayarlar) -> 'otomatik' politikasının seri için verdiği ilk karar (bkz. ayarlari_sabitle)
+MOTOR_SECIMLERI = SinirliOnbellek(max_oge=256)
+_secim_kilidi = threading.Lock()
+
+# Kırılım bazlı toplu tahmin için süreç havuzu (ilk kullanımda kurulur, süreç boyunca yaşar).
+# Toplu tahmin zamanlayıcıda tek işçi tutarken fitler havuzda çalışır; havuz, diğer işçilerin
+# işleriyle birlikte çekirdekleri fazla aşmasın diye zamanlayıcının işçi bütçesinin yarısıyla sınırlıdır.
+TOPLU_ISCI_SAYISI = int(os.environ.get("KAZKAZ_TOPLU_ISCI", str(max(1, ZAMANLAYICI.isci_sayisi // 2))))
+_havuz = None
+_havuz_kilidi = threading.Lock()
+
+# Aynı seri için eşzamanlı iki oturumun iki kez fit yapmasını engeller
+_anahtar_kilitleri = {}
+_kilitler_kilidi = threading.Lock()
+
+
+def _gelir_serisi(aylik_gelir):
+    """Aylık veri tablosundan yalnızca tahminde kullanılan 'Gelir' sütununu ayırır."""
+    if isinstance(aylik_gelir, pd.DataFrame):
+        aylik_gelir = aylik_gelir['Gelir']
+    seri = aylik_gelir.astype(float)
+    seri.index = pd.DatetimeIndex(seri.index, name='Tarih')
+    return seri.rename('Gelir')
+
+
+def sistem_yuklu():
+    """Makinenin çekirdek başına yükü eşiği aşıyorsa True döndürür (getloadavg yoksa False)."""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1) >= YUK_ESIGI
+    except (AttributeError, OSError):
+        return False
+
+
+def motor_sec(aylik_gelir, istenen='otomatik'):
+    """'otomatik' politikasını somut bir motora çevirir.
+
+    Kısa serilerde (< PROPHET_MIN_AY) veya sistem yüklüyken NumPy Holt motoru,
+    aksi hâlde Prophet kullanılır. Açıkça istenen motor olduğu gibi döner.
+    """
+    if istenen != 'otomatik':
+        if istenen not in TAHMIN_MOTORLARI:
+            raise ValueError(f"Bilinmeyen tahmin motoru: {istenen}")
+        return istenen
+    if len(aylik_gelir) < PROPHET_MIN_AY or sistem_yuklu():
+        return 'holt'
+    return 'prophet'
+
+
+def _seri_ozeti(seri, *parcalar):
+    h = hashlib.sha256()
+    for parca in parcalar:
+        h.update(parca.encode())
+    h.update(seri.index.asi8.tobytes())
+    h.update(seri.to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def ayarlari_sabitle(aylik_gelir, ayarlar=None):
+    """Varsayılanlarla birleştirilmiş, motoru somut (ör. 'otomatik' değil 'holt') ayarları döndürür.
+
+    'otomatik' politikası sistem yükünü okuduğundan karar seri başına bir kez verilir ve
+    MOTOR_SECIMLERI'nde saklanır; yük sonradan değişse de aynı seri aynı motorla (ve aynı
+    önbellek anahtarıyla) tahmin edilir. Dönen ayarlar sonraki tüm çağrılara aynen verilir.
+    """
+    ayarlar = {**VARSAYILAN_AYARLAR, **(ayarlar or {})}
+    if ayarlar['motor'] != 'otomatik':
+        motor_sec(aylik_gelir, ayarlar['motor'])  # bilinmeyen motor adını reddeder
+        return ayarlar
+    secim_anahtari = _seri_ozeti(_gelir_serisi(aylik_gelir), json.dumps(ayarlar, sort_keys=True))
+    with _secim_kilidi:
+        ayarlar['motor'] = MOTOR_SECIMLERI.get_or_compute(secim_anahtari, lambda: motor_sec(aylik_gelir, 'otomatik'))
+    return ayarlar
+
+
+def tahmin_anahtari(aylik_gelir, ayarlar=None):
+    """Aylık gelir serisi ve model ayarlarından içerik tabanlı önbellek anahtarı üretir.
+
+    'otomatik' motor, seri için sabitlenmiş karara çevrilir (bkz. ayarlari_sabitle); anahtar
+    sistem yüküyle değişmez.
+    """
+    ayarlar = ayarlari_sabitle(aylik_gelir, ayarlar)
+    return _seri_ozeti(_gelir_serisi(aylik_gelir), json.dumps(ayarlar, sort_keys=True))
+
+
+@contextmanager
+def _kilit_al(anahtar):
+    """Anahtara özel kilidi tutar; kilidi tutan ya da bekleyen kalmayınca kayıt sözlükten silinir.
+
+    Kayıt [kilit, kullanıcı sayısı] çiftidir; sayaç kilit beklenmeden önce artırıldığı için
+    bekleyenler varken kayıt silinmez ve aynı anahtara ikinci bir kilit açılmaz.
+    """
+    with _kilitler_kilidi:
+        kayit = _anahtar_kilitleri.setdefault(anahtar, [threading.Lock(), 0])
+        kayit[1] += 1
+    try:
+        with kayit[0]:
+            yield
+    finally:
+        with _kilitler_kilidi:
+            kayit[1] -= 1
+            if kayit[1] == 0:
+                del _anahtar_kilitleri[anahtar]
+
+
+def _disk_yollari(anahtar):
+    return os.path.join(TAHMIN_DIZINI, f"{anahtar}.model.json"), os.path.join(TAHMIN_DIZINI, f"{anahtar}.tahmin.pkl")
+
+
+def _diskten_oku(anahtar):
+    model_yolu, tahmin_yolu = _disk_yollari(anahtar)
+    if not (os.path.exists(model_yolu) and os.path.exists(tahmin_yolu)):
+        return None
+    try:
+        with open(model_yolu, encoding='utf-8') as f:
+            model = prophet_serialize().model_from_json(f.read())
+        forecast = pd.read_pickle(tahmin_yolu)
+    except Exception:
+        # Yarım yazılmış veya uyumsuz dosya: yok say, yeniden fit edilecek
+        return None
+    os.utime(model_yolu)  # LRU sırası için son kullanım zamanını güncelle
+    return model, forecast
+
+
+def _diske_yaz(anahtar, model, forecast):
+    try:
+        os.makedirs(TAHMIN_DIZINI, exist_ok=True)
+        model_yolu, tahmin_yolu = _disk_yollari(anahtar)
+        # Önce geçici dosyaya yaz, sonra atomik olarak yerine taşı
+        forecast.to_pickle(tahmin_yolu + ".tmp")
+        os.replace(tahmin_yolu + ".tmp", tahmin_yolu)
+        with open(model_yolu + ".tmp", 'w', encoding='utf-8') as f:
+            f.write(prophet_serialize().model_to_json(model))
+        os.replace(model_yolu + ".tmp", model_yolu)
+        _disk_temizle()
+    except OSError:
+        pass  # Disk önbelleği en iyi çaba esasına göre çalışır
+
+
+def _disk_temizle():
+    """Disk önbelleği sınırı aşarsa en uzun süredir kullanılmayan tahminleri siler."""
+    modeller = [os.path.join(TAHMIN_DIZINI, f) for f in os.listdir(TAHMIN_DIZINI) if f.endswith(".model.json")]
+    if len(modeller) <= MAX_DISK_TAHMIN:
+        return
+    modeller.sort(key=os.path.getmtime)
+    for model_yolu in modeller[:len(modeller) - MAX_DISK_TAHMIN]:
+        anahtar = os.path.basename(model_yolu)[:-len(".model.json")]
+        for yol in _disk_yollari(anahtar):
+            try:
+                os.remove(yol)
+            except FileNotFoundError:
+                pass
+
+
+def _prophet_fit(seri, ayarlar, onceki=None):
+    # Prophet/Stan yüklemesi pahalıdır; yalnızca bu motor gerçekten seçildiğinde içe aktarılır
+    prophet_df = seri.reset_index().rename(columns={'Tarih': 'ds', 'Gelir': 'y'})
+
+    def yeni_model():
+        return prophet().Prophet(yearly_seasonality=ayarlar['yearly_seasonality'],
+                                 weekly_seasonality=ayarlar['weekly_seasonality'],
+                                 daily_seasonality=ayarlar['daily_seasonality'])
+    model = yeni_model()
+    baslangic_degerleri = _prophet_sicak_baslangic(onceki, model, prophet_df)
+    try:
+        model.fit(prophet_df, **({'init': baslangic_degerleri} if baslangic_degerleri else {}))
+    except Exception:
+        if not baslangic_degerleri:
+            raise
+        # Sıcak başlangıç optimizasyonu başarısızsa soğuk fitle aynı sonuca dönülür
+        model = yeni_model()
+        model.fit(prophet_df)
+    future = model.make_future_dataframe(periods=ayarlar['periods'], freq=ayarlar['freq'])
+    forecast = model.predict(future)
+    return model, forecast
+
+
+def _prophet_sicak_baslangic(onceki, model, prophet_df):
+    """Önceki model aynı serinin ön ekiyle eğitildiyse (yeni ay eklendi / son ay güncellendi)
+    optimizasyonu onun MAP parametrelerinden başlatır; sonuç soğuk fitle optimizer toleransı içinde aynıdır."""
+    params = getattr(onceki, 'params', None)
+    if not params or getattr(onceki, 'mcmc_samples', 1) != 0 or getattr(onceki, 'history', None) is None:
+        return None
+    eski = onceki.history
+    n = len(eski)
+    if n < 2 or len(prophet_df) < n or not eski['ds'].iloc[:-1].equals(prophet_df['ds'].iloc[:n - 1]) \
+            or not np.array_equal(eski['y'].to_numpy()[:-1], prophet_df['y'].to_numpy()[:n - 1]):
+        return None
+    # Değişim noktası sayısı geçmiş uzunluğuna bağlıdır (bkz. Prophet.set_changepoints); uyuşmazsa kullanılamaz
+    degisim_noktasi = min(model.n_changepoints, int(np.floor(len(prophet_df) * model.changepoint_range)) - 1)
+    if params['delta'].shape[-1] != max(degisim_noktasi, 1):
+        return None
+    try:
+        return {**{ad: float(params[ad][0][0]) for ad in ('k', 'm', 'sigma_obs')},
+                **{ad: params[ad][0].tolist() for ad in ('delta', 'beta')}}
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def _holt(seri, ayarlar, onceki=None):
+    return holt_fit(seri, periods=ayarlar['periods'], freq=ayarlar['freq'],
+                    onceki=onceki if getattr(onceki, 'motor', None) == 'holt' else None)
+
+
+def _sezonsal_naif(seri, ayarlar, onceki=None):
+    # Kapalı formlu ve tek geçişlidir; önceki modelden devam etmeye gerek yok
+    return sezonsal_naif_fit(seri, periods=ayarlar['periods'], freq=ayarlar['freq'])
+
+
+# Her motor (seri, ayarlar, onceki=None) alır ve (model, forecast) döndürür; forecast en az
+# ds / yhat / yhat_lower / yhat_upper sütunlarını geçmiş + gelecek satırlar için içerir.
+# `onceki`, aynı serinin (aynı başlangıç ayı ve ayarlar) son eğitilen modelidir; motor
+# bunu sıcak başlangıç için kullanabilir ya da yok sayabilir.
+TAHMIN_MOTORLARI = {
+    'prophet': _prophet_fit,
+    'holt': _holt,
+    'sezonsal_naif': _sezonsal_naif,
+}
+# Yalnızca fit süresi yüksek motorlar diske yazılır; NumPy motorları milisaniyeler içinde yeniden fit edilir
+_DISKE_YAZILAN_MOTORLAR = {'prophet'}
+
+
+def prophet_tahmini_yap(aylik_gelir, ayarlar=None):
+    """Seçilen motor (varsayılan: otomatik politika) ile tahmin yapar.
+
+    Aynı seri ve ayarlar için model bir kez eğitilir: önce bellekteki, sonra diskteki
+    önbelleğe bakılır; ikisinde de yoksa fit edilip her ikisine de yazılır. Aynı ayla
+    başlayan serinin son modeli motora verilir: yeni ay eklendiğinde Holt ızgarası kaldığı
+    adımdan devam eder, Prophet optimizasyonu önceki parametrelerden başlar.
+    """
+    if len(aylik_gelir) < 2: return None, None
+    ayarlar = ayarlari_sabitle(aylik_gelir, ayarlar)
+    anahtar = tahmin_anahtari(aylik_gelir, ayarlar)
+
+    sonuc = TAHMIN_ONBELLEGI.get(anahtar)
+    if sonuc is not None:
+        return sonuc
+    with _kilit_al(anahtar):
+        sonuc = TAHMIN_ONBELLEGI.get(anahtar)
+        if sonuc is None:
+            diske_yazilir = ayarlar['motor'] in _DISKE_YAZILAN_MOTORLAR
+            sonuc = _diskten_oku(anahtar) if diske_yazilir else None
+            seri = _gelir_serisi(aylik_gelir)
+            seri_anahtari = (json.dumps(ayarlar, sort_keys=True), seri.index[0])
+            if sonuc is None:
+                onceki = SON_FITLER.get(seri_anahtari)
+                with asama('tahmin_fit', satir=len(aylik_gelir), detay=ayarlar['motor'] if onceki is None else f"{ayarlar['motor']}/sicak"):
+                    sonuc = TAHMIN_MOTORLARI[ayarlar['motor']](seri, ayarlar, onceki)
+                if diske_yazilir:
+                    _diske_yaz(anahtar, *sonuc)
+            TAHMIN_ONBELLEGI.set(anahtar, sonuc)
+            SON_FITLER.set(seri_anahtari, sonuc[0])
+    return sonuc
+
+
+def tahmin_grafigi(aylik_gelir, ayarlar=None, tam_cozunurluk=False):
+    """Önbellekteki tahminden Plotly grafiğini üretir; PDF ve sekme aynı figürü paylaşır.
+
+    Uzun seriler LTTB ile inceltilir; `tam_cozunurluk` tüm noktaları WebGL izleriyle gönderir.
+    """
+    model, tahmin = prophet_tahmini_yap(aylik_gelir, ayarlar)
+    if model is None or tahmin is None:
+        return None
+    anahtar = tahmin_anahtari(aylik_gelir, ayarlar)
+    if tam_cozunurluk:
+        return TAHMIN_GRAFIK_ONBELLEGI.get_or_compute((anahtar, 'tam'), lambda: _izli_tahmin_figuru(model, tahmin, hedef=None))
+    return TAHMIN_GRAFIK_ONBELLEGI.get_or_compute(anahtar, lambda: _izli_tahmin_figuru(model, tahmin))
+
+
+def tahmin_isi(aylik_gelir, ayarlar=None, oncelik=ARKA_PLAN_ONCELIGI, oturum=None):
+    """Tahmin fitini ve grafiğini paylaşılan zamanlayıcıya (bkz. is_kuyrugu.py) gönderir.
+
+    (Is, sabitlenmiş ayarlar) döndürür. Çağıran sonraki prophet_tahmini_yap / tahmin_grafigi /
+    tahmin_anahtari çağrılarına bu ayarları verir; böylece iş ile okuma aynı motoru ve anahtarı
+    kullanır. Tahmin ve grafiği bellekte hazırsa ya da seri tahmin için çok kısaysa Is yerine
+    None döner. Aynı seri ve ayarlar için sırada veya çalışmakta olan iş varsa yenisi açılmaz.
+    Kuyruk doluysa is_kuyrugu.KuyrukDolu fırlatılır.
+    """
+    ayarlar = ayarlari_sabitle(aylik_gelir, ayarlar)
+    if len(aylik_gelir) < 2:
+        return None, ayarlar
+    anahtar = tahmin_anahtari(aylik_gelir, ayarlar)
+    if anahtar in TAHMIN_ONBELLEGI and anahtar in TAHMIN_GRAFIK_ONBELLEGI:
+        return None, ayarlar
+    is_ = ZAMANLAYICI.gonder('tahmin', anahtar, lambda ilerleme: tahmin_grafigi(aylik_gelir, ayarlar), oncelik, oturum, ad="Gelir tahmini")
+    return is_, ayarlar
+
+
+def _izli_tahmin_figuru(model, tahmin, hedef=HEDEF_NOKTA):
+    with asama('grafik', satir=len(tahmin), detay='tahmin' if hedef else 'tahmin/tam'):
+        return figuru_incelt(_tahmin_figuru(model, tahmin), hedef=hedef)
+
+
+def _tahmin_figuru(model, tahmin):
+    if not hasattr(model, 'motor'):
+        return prophet_plot().plot_plotly(model, tahmin, xlabel="Tarih", ylabel="Gelir")
+    # NumPy motorları için plot_plotly görünümüne yakın bir figür
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=tahmin['ds'], y=tahmin['yhat_lower'], mode='lines', line=dict(width=0), hoverinfo='skip', showlegend=False))
+    fig.add_trace(go.Scatter(x=tahmin['ds'], y=tahmin['yhat_upper'], mode='lines', line=dict(width=0), fill='tonexty',
+                             fillcolor='rgba(0, 114, 178, 0.2)', hoverinfo='skip', showlegend=False))
+    fig.add_trace(go.Scatter(x=tahmin['ds'], y=tahmin['yhat'], mode='lines', name='Tahmin', line=dict(color='#0072B2', width=2)))
+    fig.add_trace(go.Scatter(x=model.history['ds'], y=model.history['y'], mode='markers', name='Gerçekleşen', marker=dict(color='black', size=4)))
+    fig.update_layout(xaxis_title="Tarih", yaxis_title="Gelir", showlegend=False)
+    return fig
+
+
+def geriye_donuk_test(aylik_gelir, motorlar=('prophet', 'holt', 'sezonsal_naif'), ufuk=3, min_egitim=6):
+    """Kayan başlangıç noktalı geriye dönük test ile motorların doğruluğunu ve fit süresini karşılaştırır.
+
+    Her başlangıç noktasında seri o noktaya kadar kesilir, `ufuk` ay tahmin edilir ve
+    gerçekleşen değerlerle karşılaştırılır. Önbellek kullanılmaz; süreler saf fit süresidir.
+    """
+    seri = _gelir_serisi(aylik_gelir)
+    satirlar = []
+    for motor in motorlar:
+        ayarlar = {**VARSAYILAN_AYARLAR, 'motor': motor, 'periods': ufuk}
+        hatalar, gercekler, kapsanan, sureler = [], [], [], []
+        for kesim in range(min_egitim, len(seri) - ufuk + 1):
+            egitim, test = seri.iloc[:kesim], seri.iloc[kesim:kesim + ufuk].to_numpy()
+            baslangic = time.perf_counter()
+            _, forecast = TAHMIN_MOTORLARI[motor](egitim, ayarlar)
+            sureler.append(time.perf_counter() - baslangic)
+            gelecek = forecast.iloc[-ufuk:]
+            hatalar.append(test - gelecek['yhat'].to_numpy())
+            gercekler.append(test)
+            kapsanan.append((test >= gelecek['yhat_lower'].to_numpy()) & (test <= gelecek['yhat_upper'].to_numpy()))
+        if not sureler:
+            continue
+        hatalar, gercekler = np.concatenate(hatalar), np.concatenate(gercekler)
+        sifir_olmayan = gercekler != 0
+        satirlar.append({
+            'motor': motor,
+            'deneme': len(sureler),
+            'mae': float(np.abs(hatalar).mean()),
+            'rmse': float(np.sqrt((hatalar ** 2).mean())),
+            'mape': float(np.abs(hatalar[sifir_olmayan] / gercekler[sifir_olmayan]).mean() * 100) if sifir_olmayan.any() else float('nan'),
+            'aralik_kapsamasi': float(np.concatenate(kapsanan).mean()),
+            'ort_fit_ms': float(np.mean(sureler) * 1000),
+        })
+    return pd.DataFrame(satirlar)
+
+
+def _toplu_havuz():
+    global _havuz
+    with _havuz_kilidi:
+        if _havuz is None:
+            # Streamlit çok iş parçacıklıdır; fork yerine spawn ile kilit kopyalama sorunlarından kaçınılır
+            _havuz = ProcessPoolExecutor(max_workers=TOPLU_ISCI_SAYISI, mp_context=multiprocessing.get_context('spawn'))
+        return _havuz
+
+
+def _toplu_parca_isle(parca, ayarlar):
+    """Süreç havuzunda çalışır: bir grup serisini sırayla fit eder, (grup, tablo, hata) listesi döndürür."""
+    sonuclar = []
+    for grup, seri in parca:
+        try:
+            motor = motor_sec(seri, ayarlar['motor'])
+            _, forecast = TAHMIN_MOTORLARI[motor](seri, {**ayarlar, 'motor': motor})
+            tablo = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].assign(motor=motor)
+            sonuclar.append((grup, tablo, None))
+        except Exception as e:
+            sonuclar.append((grup, None, str(e)))
+    return sonuclar
+
+
+def toplu_tahmin_anahtari(genis_tablo, boyut, ayarlar=None):
+    """Geniş tablonun içeriği, boyut ve ayarlardan toplu tahmin önbellek/iş anahtarı üretir."""
+    ayarlar = {**VARSAYILAN_AYARLAR, **(ayarlar or {})}
+    h = hashlib.sha256(json.dumps(ayarlar, sort_keys=True).encode())
+    h.update(boyut.encode())
+    h.update(pd.util.hash_pandas_object(genis_tablo.T.reset_index(), index=False).values.tobytes())
+    h.update(genis_tablo.index.asi8.tobytes())
+    return h.hexdigest()
+
+
+def toplu_tahmin(genis_tablo, boyut, ayarlar=None, max_isci=None, ilerleme=None):
+    """Geniş tablodaki (ay x grup) her sütun için ayrı bir model fit eder.
+
+    Seriler işçi sayısının birkaç katı parçaya bölünüp süreç havuzuna dağıtılır; sonuçlar
+    boyut, grup, ds, y, yhat, yhat_lower, yhat_upper, motor sütunlu tek bir düzenli tabloda
+    toplanır. (tablo, {grup: hata mesajı}) döndürür. max_isci=1 verilirse havuz kullanılmaz.
+    Bu fonksiyon çağıranı bloklar; arayüz toplu_tahmin_isi ile zamanlayıcı üzerinden çalıştırır.
+    """
+    ayarlar = {**VARSAYILAN_AYARLAR, **(ayarlar or {})}
+    if genis_tablo.empty or len(genis_tablo) < 2:
+        return pd.DataFrame(), {}
+    return TOPLU_TAHMIN_ONBELLEGI.get_or_compute(toplu_tahmin_anahtari(genis_tablo, boyut, ayarlar),
+                                                 lambda: _toplu_tahmin_hesapla(genis_tablo, boyut, ayarlar, max_isci, ilerleme))
+
+
+def toplu_tahmin_isi(genis_tablo, boyut, ayarlar=None, oncelik=ARKA_PLAN_ONCELIGI, oturum=None):
+    """Toplu tahmini paylaşılan zamanlayıcıya 'toplu_tahmin' işi olarak gönderir (bkz. tahmin_isi).
+
+    İş, geniş tablonun parmak izine göre anahtarlanır; aynı tablo için sırada veya çalışmakta
+    olan iş varsa ona ortak olunur. Sonuç bellekte hazırsa ya da tablo tahmin için çok kısaysa
+    None döner. Kuyruk doluysa is_kuyrugu.KuyrukDolu fırlatılır.
+    """
+    if genis_tablo.empty or len(genis_tablo) < 2:
+        return None
+    anahtar = toplu_tahmin_anahtari(genis_tablo, boyut, ayarlar)
+    if anahtar in TOPLU_TAHMIN_ONBELLEGI:
+        return None
+    return ZAMANLAYICI.gonder('toplu_tahmin', anahtar, lambda ilerleme: toplu_tahmin(genis_tablo, boyut, ayarlar, ilerleme=ilerleme),
+                             oncelik, oturum, ad=f"{boyut} bazlı tahmin")
+
+
+def _toplu_tahmin_hesapla(genis_tablo, boyut, ayarlar, max_isci, ilerleme=None):
+    isler = [(grup, _gelir_serisi(genis_tablo[grup])) for grup in genis_tablo.columns]
+    isci = max_isci or TOPLU_ISCI_SAYISI
+    if isci <= 1 or len(isler) <= 1:
+        ham = _toplu_parca_isle(isler, ayarlar)
+    else:
+        # Küçük NumPy fitlerinde süreçler arası iletişim maliyeti baskın olmasın diye parçalara bölünür
+        parca_sayisi = min(len(isler), isci * 4)
+        parcalar = [isler[i::parca_sayisi] for i in range(parca_sayisi)]
+        havuz = _toplu_havuz()
+        gelecekler = [havuz.submit(_toplu_parca_isle, parca, ayarlar) for parca in parcalar]
+        ham = []
+        try:
+            for biten, gelecek in enumerate(as_completed(gelecekler), 1):
+                ham.extend(gelecek.result())
+                if ilerleme is not None:
+                    ilerleme(biten / parca_sayisi, f"{len(ham)}/{len(isler)} seri tahmin edildi")
+        except IsIptal:
+            # İş artık istenmiyor; henüz başlamamış parçalar havuzu meşgul etmesin
+            for gelecek in gelecekler:
+                gelecek.cancel()
+            raise
+        sira = {grup: i for i, (grup, _) in enumerate(isler)}
+        ham.sort(key=lambda sonuc: sira[sonuc[0]])
+
+    tablolar, hatalar = [], {}
+    for grup, tablo, hata in ham:
+        if hata is not None:
+            hatalar[grup] = hata
+            continue
+        gercek = genis_tablo[grup].rename('y')
+        tablolar.append(tablo.assign(boyut=boyut, grup=grup).merge(gercek, left_on='ds', right_index=True, how='left'))
+    if not tablolar:
+        return pd.DataFrame(), hatalar
+    sonuc = pd.concat(tablolar, ignore_index=True)
+    return sonuc[['boyut', 'grup', 'ds', 'y', 'yhat', 'yhat_lower', 'yhat_upper', 'motor']], hatalar
+
+
+def toplu_tahmin_grafigi(tablo, max_grup=12):
+    """Toplu tahmin tablosundan, toplam tutarı en yüksek `max_grup` grup için tek bir panelli grafik üretir."""
+    if tablo.empty:
+        return None
+    en_buyukler = tablo.groupby('grup')['y'].sum().nlargest(max_grup).index
+    secili = tablo[tablo['grup'].isin(en_buyukler)]
+    fig = plotly_express().line(secili, x='ds', y='yhat', facet_col='grup', facet_col_wrap=3, facet_row_spacing=0.08,
+                  title=f"{tablo['boyut'].iloc[0]} Bazlı Aylık Tahminler", height=260 * ((len(en_buyukler) + 2) // 3))
+    fig.update_yaxes(matches=None, title=None)
+    fig.update_xaxes(title=None)
+    fig.for_each_annotation(lambda a: a.update(text=a.text.split("=", 1)[-1]))
+    return fig
@@ -0,0 +1,63 @@
+# Anomali motoru: +1 gün artımlı sonuç soğuk hesapla aynı, enjekte edilen sıçramalar yakalanır
+import numpy as np
+import pandas as pd
+import pytest
+
+from anomali_motoru import PENCERE_GUN, anomali_hesapla, donem_degisimleri
+from kiyaslama.sentetik import sentetik_defter
+from ozet_kupu import kup_olustur
+
+
+@pytest.fixture(scope='module')
+def kup():
+    return kup_olustur(sentetik_defter(20_000, gun=900, tohum=5))
+
+
+def _ayni(a, b):
+    np.testing.assert_array_equal(a['z'], b['z'])
+    np.testing.assert_array_equal(a['ort'], b['ort'])
+    pd.testing.assert_frame_equal(a['kayan'], b['kayan'])
+    pd.testing.assert_frame_equal(a['gun_anomalileri'], b['gun_anomalileri'])
+
+
+def test_bir_gun_eklenince_artimli_soguk_hesapla_ayni(kup):
+    # İmzalar olmadan da önceki matrisle karşılaştırılıp yalnızca yeni gün hesaplanır
+    onceki = anomali_hesapla(kup[kup['Tarih'] < kup['Tarih'].max()])
+    artimli = anomali_hesapla(kup, onceki)
+    assert artimli['yeniden_hesaplanan_gun'] == 1
+    _ayni(artimli, anomali_hesapla(kup))
+
+
+def test_farkli_ayarlarla_onceki_kullanilmaz(kup):
+    onceki = anomali_hesapla(kup, pencere=PENCERE_GUN // 2)
+    sonuc = anomali_hesapla(kup, onceki)
+    assert sonuc['yeniden_hesaplanan_gun'] == len(sonuc['gunler'])
+    _ayni(sonuc, anomali_hesapla(kup))
+
+
+def test_gunluk_sicrama_yakalanir(kup):
+    gun = kup['Tarih'].drop_duplicates().iloc[500]
+    kategori = kup.loc[kup['Tarih'] == gun, 'Kategori'].iloc[0]
+    bozuk = kup.copy()
+    maske = (bozuk['Tarih'] == gun) & (bozuk['Kategori'] == kategori)
+    bozuk.loc[maske, 'Gelir'] = bozuk.loc[maske, 'Gelir'] * 50
+
+    anomaliler = anomali_hesapla(bozuk)['gun_anomalileri']
+    bulunan = anomaliler[(anomaliler['Tarih'] == gun) & (anomaliler['Kategori'] == str(kategori)) & (anomaliler['Ölçü'] == 'Gelir')]
+    assert len(bulunan) == 1 and bulunan['Z'].iloc[0] > 0
+    assert bulunan['Tutar'].iloc[0] == pytest.approx(bozuk.loc[maske, 'Gelir'].sum())
+
+
+def test_donem_degisimleri(kup):
+    donem = donem_degisimleri(kup, 'M')
+    pd.testing.assert_series_equal(donem['Gelir Δ%'], donem['Gelir'].pct_change() * 100, check_names=False)
+    pd.testing.assert_series_equal(donem['Net Kar Δ'], donem['Net Kar'].diff(), check_names=False)
+    # Yarım kalan son ay düşük görünse de anomali sayılmaz
+    assert donem.index[-1] > kup['Tarih'].max() and not donem['Anomali'].iloc[-1]
+
+    ay = donem.index[20]
+    bozuk = kup.copy()
+    maske = bozuk['Tarih'].dt.to_period('M') == ay.to_period('M')
+    bozuk.loc[maske, 'Gelir'] = bozuk.loc[maske, 'Gelir'] * 3
+    sonuc = donem_degisimleri(bozuk, 'M')
+    assert sonuc.loc[ay, 'Anomali'] and sonuc.loc[ay, 'Gelir Z'] > 0
@@ -0,0 +1,84 @@
+# Artımlı yeniden analiz (küp, anomali motoru, Holt sıcak başlangıcı) tam yeniden hesapla birebir aynı olmalı
+import numpy as np
+import pandas as pd
+import pytest
+
+from anomali_motoru import anomali_hesapla
+from hizli_tahmin import holt_fit
+from kiyaslama.artimli import yenileme_senaryosu
+from kiyaslama.sentetik import sentetik_defter
+from ozet_kupu import donem_tablosu, gun_imzalari, kup_guncelle, kup_olustur
+from veri_yukleme import kompakt_yap
+
+
+def _defter():
+    return kompakt_yap(sentetik_defter(20_000, gun=900, tohum=3))
+
+
+def _eklenmis():
+    # Son 30 gün eklenir, eski defterin son günü yarımdır
+    return yenileme_senaryosu(20_000, gun=900, ekle_gun=30, tohum=3)
+
+
+def _orta_gun_duzenlenmis():
+    yeni = _defter()
+    gun = yeni['Tarih'].dt.normalize().unique()[450]
+    eski = yeni.copy()
+    maske = yeni['Tarih'].dt.normalize() == gun
+    yeni.loc[maske, 'Gelir'] = yeni.loc[maske, 'Gelir'] * 2
+    return eski, yeni
+
+
+def _gun_silinmis():
+    eski = _defter()
+    gunler = eski['Tarih'].dt.normalize()
+    yeni = eski[(gunler != gunler.unique()[400]) & (gunler != gunler.max())].reset_index(drop=True)
+    return eski, yeni
+
+
+SENARYOLAR = {'eklenmis': _eklenmis, 'orta_gun_duzenlenmis': _orta_gun_duzenlenmis, 'gun_silinmis': _gun_silinmis}
+
+
+@pytest.fixture(params=list(SENARYOLAR))
+def senaryo(request):
+    return SENARYOLAR[request.param]()
+
+
+def test_kup_guncelle_tam_kupla_ayni(senaryo):
+    eski, yeni = senaryo
+    kup, degisen = kup_guncelle(kup_olustur(eski), gun_imzalari(eski), yeni, gun_imzalari(yeni))
+    tam = kup_olustur(yeni)
+    assert degisen > 0
+    pd.testing.assert_frame_equal(kup, tam)
+
+
+def test_kup_guncelle_degisiklik_yoksa_dokunmaz():
+    df = _defter()
+    kup, degisen = kup_guncelle(kup_olustur(df), gun_imzalari(df), df, gun_imzalari(df))
+    assert degisen == 0
+    pd.testing.assert_frame_equal(kup, kup_olustur(df))
+
+
+def test_anomali_artimli_soguk_hesapla_ayni(senaryo):
+    eski, yeni = senaryo
+    eski_kup, kup = kup_olustur(eski), kup_olustur(yeni)
+    onceki = anomali_hesapla(eski_kup, imzalar=gun_imzalari(eski))
+    artimli = anomali_hesapla(kup, onceki, imzalar=gun_imzalari(yeni))
+    soguk = anomali_hesapla(kup)
+    assert artimli['yeniden_hesaplanan_gun'] < len(soguk['gunler'])
+    np.testing.assert_array_equal(artimli['z'], soguk['z'])
+    pd.testing.assert_frame_equal(artimli['kayan'], soguk['kayan'])
+    pd.testing.assert_frame_equal(artimli['gun_anomalileri'], soguk['gun_anomalileri'])
+
+
+def _aylik_gelir(df):
+    return donem_tablosu(kup_olustur(df), 'M')['Gelir'].rename_axis('Tarih')
+
+
+def test_holt_sicak_baslangic_soguk_fitle_ayni(senaryo):
+    eski, yeni = senaryo
+    onceki, _ = holt_fit(_aylik_gelir(eski))
+    sicak_model, sicak = holt_fit(_aylik_gelir(yeni), onceki=onceki)
+    soguk_model, soguk = holt_fit(_aylik_gelir(yeni))
+    assert sicak_model.parametreler == soguk_model.parametreler
+    pd.testing.assert_frame_equal(sicak, soguk)
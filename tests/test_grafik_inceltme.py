@@ -0,0 +1,58 @@
+# Grafik inceltme: iz başına nokta sınırı, uç noktaların korunması ve yük küçülmesi
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+from grafik_inceltme import figuru_incelt, lttb_indeksleri, yuk_boyutu
+from kiyaslama.inceltme import ornek_figurler
+
+GUN = 5000
+HEDEF = 1000
+
+
+@pytest.fixture(scope='module')
+def figurler():
+    return ornek_figurler(GUN)
+
+
+def test_lttb_uclari_ve_tepeyi_korur():
+    y = np.zeros(10_000)
+    y[4321] = 50.0
+    secilen = lttb_indeksleri(np.arange(y.size), y, 100)
+    assert len(secilen) == 100
+    assert secilen[0] == 0 and secilen[-1] == y.size - 1
+    assert 4321 in secilen
+    assert np.all(np.diff(secilen) > 0)
+
+
+@pytest.mark.parametrize('ad', ['fig_bar', 'fig_line', 'fig_marj'])
+def test_iz_basina_nokta_hedefi_asmaz(figurler, ad):
+    ince = figuru_incelt(figurler[ad], hedef=HEDEF)
+    for iz in ince.data:
+        assert len(iz.x) <= HEDEF
+        assert len(iz.x) == len(iz.y)
+
+
+def test_gruplu_cubuklar_hizali_kalir(figurler):
+    ince = figuru_incelt(figurler['fig_bar'], hedef=HEDEF)
+    gelir, gider = ince.data
+    np.testing.assert_array_equal(np.asarray(gelir.x), np.asarray(gider.x))
+
+
+@pytest.mark.parametrize('ad', ['fig_bar', 'fig_line', 'fig_marj'])
+def test_yuk_boyutu_kuculur(figurler, ad):
+    fig = figurler[ad]
+    assert yuk_boyutu(figuru_incelt(fig, hedef=HEDEF)) < yuk_boyutu(fig) / 3
+
+
+def test_tam_cozunurluk_tum_noktalari_webgl_ile_gonderir(figurler):
+    tam = figuru_incelt(figurler['fig_line'], hedef=None)
+    assert len(tam.data[0].x) == GUN
+    assert tam.data[0].type == 'scattergl'
+
+
+def test_kisa_seri_oldugu_gibi_doner():
+    fig = go.Figure(go.Scatter(x=pd.date_range('2024-01-01', periods=50), y=np.arange(50)))
+    assert figuru_incelt(fig, hedef=HEDEF) is fig
+    assert yuk_boyutu(None) == 0
@@ -0,0 +1,130 @@
+# Paylaşılan iş zamanlayıcısı: tekilleştirme, öncelik, kuyruk sınırı, iptal ve iç içe işler
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import tahmin_motoru
+from is_kuyrugu import IsIptal, IsZamanlayici, KuyrukDolu
+
+
+def _kaydeden(sira, ad):
+    def islem(ilerleme):
+        sira.append(ad)
+        return ad
+    return islem
+
+
+@pytest.fixture
+def tek_isci():
+    """Tek işçisi bir kapı işiyle meşgul edilmiş zamanlayıcı; kapı açılınca sıradakiler çalışır."""
+    z = IsZamanlayici(isci_sayisi=1, kuyruk_siniri=2)
+    kapi = threading.Event()
+    z.gonder('t', 'kapi', lambda ilerleme: kapi.wait())
+    while z.ozet()['calisan'] == 0:
+        time.sleep(0.01)
+    yield z, kapi
+    kapi.set()
+
+
+def test_ayni_is_tekillesir_ve_oncelik_sirasi(tek_isci):
+    z, kapi = tek_isci
+    sira = []
+    temel = z.gonder('t', 'a', _kaydeden(sira, 'temel'), oncelik=2, oturum='s1')
+    assert z.gonder('t', 'a', _kaydeden(sira, 'kopya'), oncelik=2, oturum='s2') is temel
+    uzman = z.gonder('t', 'u', _kaydeden(sira, 'uzman'), oncelik=0, oturum='s3')
+    assert (uzman.sira(), temel.sira()) == (1, 2)
+    kapi.set()
+    assert (uzman.sonuc(5), temel.sonuc(5)) == ('uzman', 'temel')
+    assert sira == ['uzman', 'temel']
+
+
+def test_kuyruk_dolunca_dusuk_oncelikli_is_yer_acar(tek_isci):
+    z, kapi = tek_isci
+    temel = z.gonder('t', 'a', _kaydeden([], 'temel'), oncelik=2)
+    z.gonder('t', 'u', _kaydeden([], 'uzman'), oncelik=0)
+    z.gonder('t', 'p', _kaydeden([], 'pro'), oncelik=1)
+    with pytest.raises(KuyrukDolu):
+        temel.sonuc(5)
+    with pytest.raises(KuyrukDolu):
+        z.gonder('t', 'b', _kaydeden([], 'arka plan'), oncelik=9)
+
+
+def test_yeniden_calistirmada_istenmeyen_is_iptal_edilir(tek_isci):
+    z, kapi = tek_isci
+    istenen = z.gonder('t', 'a', _kaydeden([], 'a'), oturum='s')
+    birakilan = z.gonder('t', 'b', _kaydeden([], 'b'), oturum='s')
+    z.calistirma_baslat('s')
+    z.sahiplen(istenen, 's')
+    z.calistirma_bitti('s')
+    with pytest.raises(IsIptal):
+        birakilan.sonuc(5)
+    kapi.set()
+    assert istenen.sonuc(5) == 'a'
+
+
+def test_calisan_is_bir_sonraki_ilerlemede_durur():
+    z = IsZamanlayici(isci_sayisi=1)
+    basladi = threading.Event()
+
+    def uzun(ilerleme):
+        for i in range(500):
+            ilerleme(i / 500, "adım")
+            basladi.set()
+            time.sleep(0.01)
+    is_ = z.gonder('pdf', 'k', uzun, oturum='s')
+    basladi.wait(5)
+    z.oturumu_unut('s')
+    with pytest.raises(IsIptal):
+        is_.sonuc(5)
+
+
+@pytest.mark.parametrize('isci_sayisi', [1, 4])
+def test_ic_ice_isler_bos_iscilerde_paralel_calisir(isci_sayisi):
+    z = IsZamanlayici(isci_sayisi=isci_sayisi)
+
+    def alt(i):
+        def islem(ilerleme):
+            time.sleep(0.1)
+            return i, threading.current_thread().name
+        return islem
+
+    def ust(ilerleme):
+        isler = [z.gonder('png', i, alt(i)) for i in range(4)]
+        return [is_.sonuc() for is_ in isler]
+    sonuclar = z.calistir('pdf', 'k', ust, zaman_asimi=10)
+    assert [i for i, _ in sonuclar] == [0, 1, 2, 3]
+    # Tek işçide üst iş alt işleri kendisi çalıştırır (kilitlenmez); çok işçide işler dağıtılır
+    calisanlar = {ad for _, ad in sonuclar}
+    assert len(calisanlar) == 1 if isci_sayisi == 1 else len(calisanlar) > 1
+
+
+def test_tahmin_isi_motor_kararini_sabitler(monkeypatch):
+    seri = pd.DataFrame({'Gelir': range(1, 31)}, index=pd.date_range('2020-01-01', periods=30, freq='MS'), dtype=float)
+    monkeypatch.setattr(tahmin_motoru, 'sistem_yuklu', lambda: True)
+    is_, ayarlar = tahmin_motoru.tahmin_isi(seri, {'motor': 'otomatik'})
+    is_.sonuc(30)
+    monkeypatch.setattr(tahmin_motoru, 'sistem_yuklu', lambda: False)
+    assert ayarlar['motor'] == 'holt'
+    assert tahmin_motoru.tahmin_anahtari(seri) == tahmin_motoru.tahmin_anahtari(seri, ayarlar)
+    assert tahmin_motoru.tahmin_isi(seri)[0] is None
+
+
+def test_toplu_tahmin_zamanlayicida_calisir(monkeypatch):
+    z = IsZamanlayici(isci_sayisi=1)
+    monkeypatch.setattr(tahmin_motoru, 'ZAMANLAYICI', z)
+    monkeypatch.setattr(tahmin_motoru, 'TOPLU_ISCI_SAYISI', 2)
+    tahmin_motoru.TOPLU_TAHMIN_ONBELLEGI.clear()
+    aylar = pd.date_range('2020-01-31', periods=30, freq='M')
+    genis = pd.DataFrame({f"K{k}": [100.0 * (k + 1) + i * (k + 2) for i in range(30)] for k in range(6)}, index=aylar)
+    ayarlar = {'motor': 'holt'}
+
+    is_ = tahmin_motoru.toplu_tahmin_isi(genis, 'Kategori', ayarlar, oncelik=1, oturum='o1')
+    assert is_.tur == 'toplu_tahmin' and is_.oncelik == 1
+    assert tahmin_motoru.toplu_tahmin_isi(genis, 'Kategori', ayarlar, oncelik=1, oturum='o2') in (is_, None)
+    tablo, hatalar = is_.sonuc(60)
+    assert hatalar == {} and is_.ilerleme == 1.0
+    assert tahmin_motoru.toplu_tahmin_isi(genis, 'Kategori', ayarlar) is None  # Sonuç önbellekte
+    tahmin_motoru.TOPLU_TAHMIN_ONBELLEGI.clear()
+    pd.testing.assert_frame_equal(tablo, tahmin_motoru.toplu_tahmin(genis, 'Kategori', ayarlar, max_isci=1)[0])
@@ -0,0 +1,98 @@
+# Kullanıcı servisi: profil önbelleği ve toplu geri bildirim yazımında yeniden deneme / kayıpsızlık
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+import kullanici_servisi
+from kullanici_servisi import VARSAYILAN_PLAN, BellekFirestore, GeriBildirimTamponu, plan_guncelle, profil_getir
+
+# Arka plan iş parçacığı testte kendiliğinden boşaltmasın; boşaltmayı test çağırır
+UZUN_ARALIK = 3600
+
+
+@pytest.fixture(autouse=True)
+def _temiz_onbellek():
+    kullanici_servisi.PROFIL_ONBELLEGI.clear()
+    yield
+    kullanici_servisi.PROFIL_ONBELLEGI.clear()
+
+
+def test_profil_tekrar_okunmaz_ve_plan_guncellemesi_gorulur():
+    db = BellekFirestore()
+    db.collection('users').document('u1').set({'subscription_plan': 'Pro', 'email': 'a@b.c'})
+    okuma = db.okuma
+    for _ in range(20):
+        assert profil_getir(db, 'u1')['subscription_plan'] == 'Pro'
+    assert db.okuma == okuma + 1
+
+    plan_guncelle(db, 'u1', 'Premium')
+    assert profil_getir(db, 'u1')['subscription_plan'] == 'Premium'
+    assert db.okuma == okuma + 2
+
+
+def test_olmayan_profil_varsayilan_planla_olusturulur():
+    db = BellekFirestore()
+    assert profil_getir(db, 'yeni', email='y@b.c') == {'subscription_plan': VARSAYILAN_PLAN, 'email': 'y@b.c'}
+    assert db.veriler['users']['yeni']['subscription_plan'] == VARSAYILAN_PLAN
+
+
+def _doldur(tampon, adet):
+    assert all(tampon.ekle({'user_id': 'u1', 'sira': i}) for i in range(adet))
+
+
+def test_toplu_yazim_kayipsiz_ve_partili():
+    db = BellekFirestore()
+    tampon = GeriBildirimTamponu(db, parti_boyutu=100, aralik=UZUN_ARALIK)
+    _doldur(tampon, 1_000)
+    tampon.bosalt()
+    assert tampon.bekleyen() == 0 and tampon.yazilan == 1_000
+    assert sorted(b['sira'] for b in db.veriler['feedback'].values()) == list(range(1_000))
+    assert db.commit_sayisi >= 1_000 // 100  # Parti boyutu aşılmaz
+    assert db.gidis_donus == db.commit_sayisi  # Belge başına değil, parti başına bir gidiş-dönüş
+
+
+def test_basarisiz_toplu_yazim_yeniden_denenir():
+    db = BellekFirestore(basarisiz_commit=1)
+    tampon = GeriBildirimTamponu(db, aralik=UZUN_ARALIK)
+    _doldur(tampon, 50)
+    tampon.bosalt()
+    assert tampon.yazilan == 50 and tampon.basarisiz == 0
+    assert len(db.veriler['feedback']) == 50
+
+
+def test_denemeler_tukenince_basarisiz_sayilir():
+    db = BellekFirestore(basarisiz_commit=10)
+    tampon = GeriBildirimTamponu(db, aralik=UZUN_ARALIK, max_deneme=2)
+    _doldur(tampon, 5)
+    tampon.bosalt()
+    assert tampon.yazilan == 0 and tampon.basarisiz == 5
+    assert 'feedback' not in db.veriler
+
+
+def test_dolu_tampon_yeni_olaylari_duser():
+    tampon = GeriBildirimTamponu(BellekFirestore(), max_boyut=5, aralik=UZUN_ARALIK)
+    sonuclar = [tampon.ekle({'sira': i}) for i in range(8)]
+    assert sonuclar == [True] * 5 + [False] * 3
+    assert tampon.dusurulen == 3 and tampon.bekleyen() == 5
+
+
+def test_zaman_siraya_alindigi_andir_toplu_yazim_ani_degil():
+    db = BellekFirestore()
+    tampon = GeriBildirimTamponu(db, aralik=UZUN_ARALIK)
+    once = datetime.now(timezone.utc)
+    _doldur(tampon, 3)
+    sonra = datetime.now(timezone.utc)
+    time.sleep(0.05)  # Boşaltma tıklamadan sonra gelir
+    tampon.bosalt()
+    zamanlar = [b['timestamp'] for b in db.veriler['feedback'].values()]
+    assert len(zamanlar) == 3 and all(once <= z <= sonra for z in zamanlar)
+
+
+def test_verilen_zaman_korunur():
+    db = BellekFirestore()
+    tampon = GeriBildirimTamponu(db, aralik=UZUN_ARALIK)
+    zaman = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    tampon.ekle({'timestamp': zaman})
+    tampon.bosalt()
+    assert [b['timestamp'] for b in db.veriler['feedback'].values()] == [zaman]
@@ -0,0 +1,52 @@
+# Senaryo simülasyonu: sabit tohumla tekrarlanabilirlik ve şokların yönü
+import pandas as pd
+import pytest
+
+from kiyaslama.senaryo import senaryo_girdileri
+from senaryo_motoru import TUM_GIDERLER, senaryo_simule_et
+
+YOL = 2_000
+
+
+@pytest.fixture(scope='module')
+def girdiler():
+    return senaryo_girdileri(20_000)
+
+
+def _simule(girdiler, **senaryo):
+    return senaryo_simule_et(*girdiler, yol=YOL, **senaryo)
+
+
+def test_ayni_tohum_ayni_sonuc(girdiler):
+    senaryo = {'gelir_buyume': -10.0, 'gider_soklari': {'Kategori 1': 20.0}, 'baslangic_nakit': 5_000.0, 'tohum': 7}
+    ilk, tekrar = _simule(girdiler, **senaryo), _simule(girdiler, **senaryo)
+    for alan in ('net_yuzdelik', 'nakit_yuzdelik'):
+        pd.testing.assert_frame_equal(ilk[alan], tekrar[alan])
+    pd.testing.assert_series_equal(ilk['pist_dagilimi'], tekrar['pist_dagilimi'])
+    assert ilk['beklenen_net'] == tekrar['beklenen_net']
+
+
+def test_farkli_tohum_farkli_orneklem(girdiler):
+    assert _simule(girdiler, tohum=1)['beklenen_net'] != _simule(girdiler, tohum=2)['beklenen_net']
+
+
+@pytest.mark.parametrize('senaryo, yon', [
+    ({'gelir_buyume': -30.0}, -1),
+    ({'gelir_buyume': 30.0}, 1),
+    ({'gider_soklari': {'Kategori 1': 50.0}}, -1),
+    ({'gider_soklari': {TUM_GIDERLER: 50.0}}, -1),
+    ({'gider_soklari': {TUM_GIDERLER: -50.0}}, 1),
+])
+def test_sok_yonu(girdiler, senaryo, yon):
+    # Aynı tohumla şoklar aynı rastgele yollara uygulanır; fark yalnızca şoktan gelir
+    taban, sokli = _simule(girdiler), _simule(girdiler, **senaryo)
+    assert (sokli['beklenen_net'] - taban['beklenen_net']) * yon > 0
+    assert (sokli['toplam_zarar_olasiligi'] - taban['toplam_zarar_olasiligi']) * yon <= 0
+
+
+def test_baslangic_nakdi_pisti_uzatir(girdiler):
+    zararli = {'gelir_buyume': -90.0, 'gider_soklari': {TUM_GIDERLER: 80.0}}
+    az, cok = _simule(girdiler, baslangic_nakit=0.0, **zararli), _simule(girdiler, baslangic_nakit=1e9, **zararli)
+    assert az['toplam_zarar_olasiligi'] > 0.5
+    assert cok['nakit_bitme_olasiligi'] < az['nakit_bitme_olasiligi']
+    assert (cok['nakit_yuzdelik']['P50'] > az['nakit_yuzdelik']['P50']).all()
@@ -0,0 +1,80 @@
+# Artımlı Sheets senkronizasyonu: eklemeler, değişmeyen sayfa ve düzenlemelerde tam okumayla eşdeğerlik
+import pandas as pd
+import pytest
+
+import sheets_senkron
+from sheets_senkron import YerelSheetsIstemcisi, sayfa_senkronize
+
+ADET = 1_000
+SAYFA_BASLIKLARI = ['Tarih', 'Gelir', 'Gider', 'Kategori', 'Satilan_Urun_Adi']
+
+
+@pytest.fixture(autouse=True)
+def _kucuk_bloklar(monkeypatch):
+    # Küçük bloklarla okuma birden çok batch_get ve blok sınırından geçer
+    monkeypatch.setattr(sheets_senkron, 'BLOK_SATIR', 64)
+    sheets_senkron.SAYFA_ONBELLEGI.clear()
+    yield
+    sheets_senkron.SAYFA_ONBELLEGI.clear()
+
+
+@pytest.fixture
+def satirlar():
+    # Sheets'in döndüreceği biçimde: tarih metin, tutar sayı
+    tarihler = pd.date_range('2020-01-01', periods=ADET, freq='h').strftime('%Y-%m-%d').tolist()
+    return [[t, i % 97 * 1.5, i % 89 * 2.25, f"K{i % 12}", f"Ü{i % 40}"] for i, t in enumerate(tarihler)]
+
+
+def _istemci(satirlar):
+    return YerelSheetsIstemcisi({'defter': [SAYFA_BASLIKLARI] + [list(s) for s in satirlar]})
+
+
+def _tam_okuma(istemci):
+    """Aynı sayfanın önbelleksiz, baştan okunmuş hâli."""
+    kopya = YerelSheetsIstemcisi({'kopya': istemci.tablolar['defter']})
+    return sayfa_senkronize(kopya, 'kopya', tam=True)[0]
+
+
+def test_tam_senkron_get_all_records_ile_ayni(satirlar):
+    istemci = _istemci(satirlar)
+    df, yeni = sayfa_senkronize(istemci, 'defter')
+    beklenen = pd.DataFrame(istemci.open_by_url('defter').sheet1.get_all_records())
+    assert yeni == len(df) == ADET
+    assert list(df.columns) == SAYFA_BASLIKLARI
+    assert (df['Tarih'].dt.strftime('%Y-%m-%d') == beklenen['Tarih']).all()
+    for col in ('Gelir', 'Gider'):
+        assert (df[col].to_numpy() == beklenen[col].to_numpy()).all()
+    for col in ('Kategori', 'Satilan_Urun_Adi'):
+        assert (df[col].astype(str) == beklenen[col]).all()
+
+
+@pytest.mark.parametrize('ek', [1, 64, 300])
+def test_eklemeden_sonra_artimli_tam_okumayla_ayni(satirlar, ek):
+    istemci = _istemci(satirlar[:ADET - ek])
+    sayfa_senkronize(istemci, 'defter')
+    istemci.satir_ekle('defter', satirlar[ADET - ek:])
+    istemci.okunan_hucre = 0
+    df, yeni = sayfa_senkronize(istemci, 'defter')
+    assert yeni == ek
+    assert istemci.okunan_hucre < len(SAYFA_BASLIKLARI) * (ek + 2) + len(SAYFA_BASLIKLARI)  # Yalnızca başlık, son satır ve yeniler
+    pd.testing.assert_frame_equal(df, _tam_okuma(istemci))
+
+
+def test_degismeyen_sayfa_deger_okumaz(satirlar):
+    istemci = _istemci(satirlar)
+    ilk, _ = sayfa_senkronize(istemci, 'defter')
+    istemci.okunan_hucre = istemci.cagri_sayisi = 0
+    df, yeni = sayfa_senkronize(istemci, 'defter')
+    assert yeni == 0 and df is ilk
+    assert istemci.okunan_hucre == 0 and istemci.cagri_sayisi == 1  # Yalnızca revizyon sorgusu
+
+
+@pytest.mark.parametrize('satir', [ADET + 1, 10])  # Bilinen son satır / ortadaki bir satır
+def test_duzenleme_tam_okumaya_duser(satirlar, satir):
+    istemci = _istemci(satirlar)
+    sayfa_senkronize(istemci, 'defter')
+    istemci.hucre_guncelle('defter', satir, 2, 12_345.0)
+    df, _ = sayfa_senkronize(istemci, 'defter')
+    pd.testing.assert_frame_equal(df, _tam_okuma(istemci))
+    if satir == ADET + 1:
+        assert df['Gelir'].iloc[-1] == 12_345.0
@@ -0,0 +1,73 @@
+# Tahmin motoru: aynı anahtar için tek fit, hata ve bekleyenler varken de anahtar kilidi tek kalır
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import tahmin_motoru
+from tahmin_motoru import prophet_tahmini_yap
+
+
+def _aylik_gelir():
+    tarih = pd.date_range('2022-01-31', periods=30, freq='M', name='Tarih')
+    return pd.DataFrame({'Gelir': np.linspace(1_000, 4_000, 30)}, index=tarih)
+
+
+def test_hata_veren_fitte_bekleyenler_ve_yeni_gelenler_ayni_kilidi_paylasir(monkeypatch):
+    tahmin_motoru.TAHMIN_ONBELLEGI.clear()
+    durum = {'etkin': 0, 'en_fazla': 0, 'cagri': 0}
+    durum_kilidi = threading.Lock()
+
+    def bozuk_motor(seri, ayarlar, onceki=None):
+        with durum_kilidi:
+            durum['etkin'] += 1
+            durum['cagri'] += 1
+            durum['en_fazla'] = max(durum['en_fazla'], durum['etkin'])
+        time.sleep(0.05)
+        with durum_kilidi:
+            durum['etkin'] -= 1
+        raise RuntimeError("fit başarısız")
+
+    monkeypatch.setitem(tahmin_motoru.TAHMIN_MOTORLARI, 'holt', bozuk_motor)
+    hatalar = []
+
+    def cagir():
+        try:
+            prophet_tahmini_yap(_aylik_gelir(), {'motor': 'holt'})
+        except RuntimeError as e:
+            hatalar.append(e)
+
+    # Çağrılar ilk fit bitmeden ve bittikten sonra kademeli gelir; hiçbir an iki fit birden çalışmaz
+    is_parcaciklari = []
+    for _ in range(5):
+        t = threading.Thread(target=cagir)
+        t.start()
+        is_parcaciklari.append(t)
+        time.sleep(0.02)
+    for t in is_parcaciklari:
+        t.join()
+    assert durum['cagri'] == len(hatalar) == 5
+    assert durum['en_fazla'] == 1
+    assert tahmin_motoru._anahtar_kilitleri == {}
+
+
+def test_basarili_fit_bir_kez_yapilir(monkeypatch):
+    tahmin_motoru.TAHMIN_ONBELLEGI.clear()
+    gercek = tahmin_motoru.TAHMIN_MOTORLARI['holt']
+    cagrilar = []
+
+    def sayan_motor(seri, ayarlar, onceki=None):
+        cagrilar.append(1)
+        time.sleep(0.05)
+        return gercek(seri, ayarlar, onceki)
+
+    monkeypatch.setitem(tahmin_motoru.TAHMIN_MOTORLARI, 'holt', sayan_motor)
+    sonuclar = []
+    is_parcaciklari = [threading.Thread(target=lambda: sonuclar.append(prophet_tahmini_yap(_aylik_gelir(), {'motor': 'holt'})))
+                       for _ in range(4)]
+    for t in is_parcaciklari: t.start()
+    for t in is_parcaciklari: t.join()
+    assert len(cagrilar) == 1
+    assert all(s is sonuclar[0] for s in sonuclar)
+    assert tahmin_motoru._anahtar_kilitleri == {}
@@ -0,0 +1,68 @@
+# Veri deposu: kenar çubuğu özeti önbellekten gelir, yazma ve silmede tazelenir
+import pytest
+
+import veri_deposu
+from kiyaslama.sentetik import sentetik_defter
+from veri_deposu import depo_ozeti, depoya_yaz, depoyu_temizle
+
+pytestmark = pytest.mark.skipif(not veri_deposu.DEPO_AKTIF, reason="pyarrow yok")
+
+
+@pytest.fixture(autouse=True)
+def _gecici_depo(monkeypatch, tmp_path):
+    monkeypatch.setattr(veri_deposu, 'DEPO_DIZINI', str(tmp_path))
+    veri_deposu.DEPO_OZETLERI.clear()
+    veri_deposu._YAZILAN_KAYNAKLAR.clear()
+    yield
+    veri_deposu.DEPO_OZETLERI.clear()
+    veri_deposu._YAZILAN_KAYNAKLAR.clear()
+
+
+@pytest.fixture
+def altbilgi_okumalari(monkeypatch):
+    okunan = []
+    gercek = veri_deposu.pq.ParquetFile
+
+    def sayan(dosya, *args, **kwargs):
+        okunan.append(dosya)
+        return gercek(dosya, *args, **kwargs)
+    monkeypatch.setattr(veri_deposu.pq, 'ParquetFile', sayan)
+    return okunan
+
+
+def test_ozet_tekrar_cagrilarda_altbilgi_okumaz(altbilgi_okumalari):
+    defter = sentetik_defter(2_000, gun=90, tohum=1)
+    depoya_yaz('u1', defter, 'a.csv')
+    ozet = depo_ozeti('u1')
+    assert ozet == (len(defter), defter['Tarih'].dt.to_period('M').nunique())
+    okunan = len(altbilgi_okumalari)
+    for _ in range(10):
+        assert depo_ozeti('u1') == ozet
+    assert len(altbilgi_okumalari) == okunan
+
+
+def test_ozet_yazma_ve_silmede_tazelenir():
+    defter = sentetik_defter(2_000, gun=90, tohum=1)
+    depoya_yaz('u1', defter, 'a.csv')
+    assert depo_ozeti('u1')[0] == len(defter)
+
+    depoya_yaz('u1', defter.iloc[:500], 'a.csv')  # Kaynağın yeni sürümü eskisinin yerine geçer
+    assert depo_ozeti('u1') == (500, defter['Tarih'].iloc[:500].dt.to_period('M').nunique())
+    depoya_yaz('u1', defter, 'b.csv')
+    assert depo_ozeti('u1')[0] == 500 + len(defter)
+
+    depoyu_temizle('u1')
+    assert depo_ozeti('u1') == (0, 0)
+    depoya_yaz('u1', defter, 'a.csv')
+    assert depo_ozeti('u1')[0] == len(defter)
+
+
+def test_icerik_anahtari_kullanici_basina_ve_silmeden_sonra_yeniden_yazilir():
+    # Aynı Sheets sayfasını çeken ikinci kullanıcı ve verisini silen kullanıcı, senkron farkı 0 olsa da depoya yazılır
+    defter = sentetik_defter(1_000, gun=60, tohum=2)
+    assert depoya_yaz('u1', defter, 'sayfa', 'iz') == len(defter)
+    assert depoya_yaz('u1', defter, 'sayfa', 'iz') == 0
+    assert depoya_yaz('u2', defter, 'sayfa', 'iz') == len(defter)
+    depoyu_temizle('u1')
+    assert depoya_yaz('u1', defter, 'sayfa', 'iz') == len(defter)
+    assert depo_ozeti('u1')[0] == depo_ozeti('u2')[0] == len(defter)
@@ -0,0 +1,59 @@
+# Veri yükleme: tek seferde ve parça parça yüklenen aynı dosya aynı analizi verir
+import numpy as np
+import pandas as pd
+import pytest
+
+import veri_yukleme
+from analiz_motoru import calistir_analiz
+from kiyaslama.sentetik import sentetik_defter
+from veri_yukleme import dosya_yukle, parcali_yukle, tablo_dogrula
+
+
+@pytest.fixture(scope='module')
+def eksik_tutarli_csv(tmp_path_factory):
+    """Bazı tutarları boş, bazıları sayı olmayan metin olan bir defter dosyası."""
+    defter = sentetik_defter(5_000, gun=400, tohum=11)
+    rng = np.random.default_rng(11)
+    defter = defter.astype({'Gelir': object, 'Gider': object})
+    defter.loc[rng.random(len(defter)) < 0.05, 'Gelir'] = None
+    defter.loc[rng.random(len(defter)) < 0.05, 'Gider'] = None
+    defter.loc[rng.random(len(defter)) < 0.01, 'Gider'] = 'yok'
+    yol = tmp_path_factory.mktemp('defter') / 'defter.csv'
+    defter.to_csv(yol, index=False)
+    return yol
+
+
+def _yukle(yol, parcali):
+    df, hata = parcali_yukle(str(yol), parca_satir=777) if parcali else dosya_yukle(str(yol))
+    assert hata is None
+    return df
+
+
+def test_eksik_tutarlar_sifir_sayilir(eksik_tutarli_csv):
+    for parcali in (False, True):
+        df = _yukle(eksik_tutarli_csv, parcali)
+        assert not df[['Gelir', 'Gider']].isna().any().any()
+
+
+def test_parcali_ve_tek_seferde_yukleme_ayni_analizi_verir(eksik_tutarli_csv):
+    tam, parcali = calistir_analiz(_yukle(eksik_tutarli_csv, False)), calistir_analiz(_yukle(eksik_tutarli_csv, True))
+    for alan in ('toplam_gelir', 'toplam_gider', 'net_kar', 'kar_marji'):
+        assert tam[alan] == pytest.approx(parcali[alan])
+    pd.testing.assert_frame_equal(tam['aylik_veri'], parcali['aylik_veri'], check_exact=False)
+    pd.testing.assert_series_equal(tam['gider_dagilimi'], parcali['gider_dagilimi'], check_exact=False, check_categorical=False)
+
+
+def test_esigi_asan_dosya_parcali_yolu_kullanir(eksik_tutarli_csv, monkeypatch):
+    monkeypatch.setattr(veri_yukleme, 'PARCALI_ESIK_BAYT', 0)
+    df, hata = dosya_yukle(str(eksik_tutarli_csv))
+    assert hata is None and len(df) < 5_000  # Günlük özete indirgenmiş
+    assert calistir_analiz(df)['toplam_gider'] == pytest.approx(calistir_analiz(_yukle(eksik_tutarli_csv, False))['toplam_gider'])
+
+
+def test_tablo_dogrula_girdi_tabloyu_degistirmez(eksik_tutarli_csv):
+    # Sheets önbelleğindeki tablo oturumlar arasında paylaşılır; doğrulama onu yerinde bozmamalı
+    ham = pd.read_csv(eksik_tutarli_csv)
+    onceki = ham.copy()
+    df, hata = tablo_dogrula(ham)
+    assert hata is None and df is not ham
+    pd.testing.assert_frame_equal(ham, onceki)
@@ -0,0 +1,105 @@
+# AI yorum servisi: eşzamanlı üretim, önbellek ve Gemini çağrılarında anahtar karışmaması
+import threading
+import time
+
+import pytest
+
+import yorum_servisi
+from yorum_servisi import GeminiArkaUcu, YORUM_HATA_MESAJI, YerelArkaUc, yorum_istemi, yorumlari_uret
+
+
+class _SahteGenai:
+    """genai.configure'ı süreç geneli tutan ve istemciyi istek başlarken okuyan sahte SDK."""
+
+    def __init__(self):
+        self.anahtar = None
+        self.kullanilan = {}
+
+    def configure(self, api_key):
+        self.anahtar = api_key
+
+    def GenerativeModel(self, model_adi):
+        sdk = self
+
+        class _Model:
+            def generate_content(self, istem, stream=False):
+                time.sleep(0.005)  # İstemci kurulumu; kilit dışındaysa başka bir configure araya girer
+                sdk.kullanilan[istem] = sdk.anahtar
+
+                def parcalar():
+                    for kelime in ("tamam", "."):
+                        time.sleep(0.001)
+                        yield type('Parca', (), {'text': kelime})()
+                return parcalar()
+        return _Model()
+
+
+@pytest.fixture(autouse=True)
+def _temiz_onbellek():
+    yorum_servisi.YORUM_ONBELLEGI.clear()
+    yield
+    yorum_servisi.YORUM_ONBELLEGI.clear()
+
+
+def _istekler(adet, yazicilar=None):
+    return {i: (yorum_istemi(f"örnek veri {i}"), (yazicilar or {}).get(i), YORUM_HATA_MESAJI) for i in range(adet)}
+
+
+def test_eszamanli_sonuc_siraliyla_ayni_ve_cagrilar_ortusur():
+    istekler = _istekler(4)
+    sirali = {}
+    for i in istekler:
+        sirali.update(yorumlari_uret(YerelArkaUc(), {i: istekler[i]}))
+    yorum_servisi.YORUM_ONBELLEGI.clear()
+
+    arka_uc = YerelArkaUc(gecikme=0.2)
+    baslangic = time.perf_counter()
+    eszamanli = yorumlari_uret(arka_uc, istekler)
+    assert time.perf_counter() - baslangic < 0.2 * len(istekler) / 2  # Toplam değil, en yavaş çağrı kadar sürer
+    assert eszamanli == sirali and arka_uc.cagri_sayisi == len(istekler)
+
+
+def test_onbellekten_tekrar_api_cagirmaz():
+    arka_uc = YerelArkaUc()
+    ilk = yorumlari_uret(arka_uc, _istekler(3))
+    yazilan = []
+    tekrar = yorumlari_uret(arka_uc, _istekler(3, {0: yazilan.append}))
+    assert tekrar == ilk and arka_uc.cagri_sayisi == 3
+    assert yazilan == [ilk[0]]
+
+
+def test_akis_yaziciya_parca_parca_gelir():
+    yazilan = []
+    metin = yorumlari_uret(YerelArkaUc(), _istekler(1, {0: yazilan.append}))[0]
+    assert len(yazilan) > 1 and yazilan[-1] == metin
+    assert all(metin.startswith(ara) for ara in yazilan)
+
+
+def test_hata_onbellege_yazilmaz():
+    class _Bozuk(YerelArkaUc):
+        async def akis(self, istem):
+            self.cagri_sayisi += 1
+            raise RuntimeError("kota")
+            yield
+
+    bozuk = _Bozuk()
+    assert yorumlari_uret(bozuk, _istekler(1)) == {0: YORUM_HATA_MESAJI}
+    assert yorumlari_uret(bozuk, _istekler(1)) == {0: YORUM_HATA_MESAJI} and bozuk.cagri_sayisi == 2
+    assert yorumlari_uret(YerelArkaUc(), _istekler(1))[0] != YORUM_HATA_MESAJI
+
+
+def test_gemini_eszamanli_cagrilar_kendi_anahtariyla_gider(monkeypatch):
+    sdk = _SahteGenai()
+    monkeypatch.setattr(yorum_servisi, 'genai', lambda: sdk)
+    beklenen = {}
+
+    def calistir(no):
+        anahtar = f"anahtar-{no}"
+        istekler = {i: (f"{anahtar} istem {i}", None, YORUM_HATA_MESAJI) for i in range(4)}
+        beklenen.update({istem: anahtar for istem, _, _ in istekler.values()})
+        assert set(yorumlari_uret(GeminiArkaUcu(anahtar), istekler).values()) == {"tamam."}
+
+    is_parcaciklari = [threading.Thread(target=calistir, args=(no,)) for no in range(4)]
+    for t in is_parcaciklari: t.start()
+    for t in is_parcaciklari: t.join()
+    assert sdk.kullanilan == beklenen
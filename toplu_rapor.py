@@ -0,0 +1,217 @@
+# KazKaz AI Finansal Danışman - Toplu (Başsız) Rapor Üretimi: Defter Dizini/Manifesto -> PDF
+import argparse
+import csv
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from analiz_motoru import calistir_analiz
+from izleme import asama, iz_baslat
+from rapor import font_mevcut, rapor_hazirla
+from veri_yukleme import dosya_yukle
+
+# Rapor düzeni veya akışı değiştiğinde artırılır; eski parmak izleri geçersiz olur ve tüm raporlar yeniden üretilir
+RAPOR_SURUMU = 1
+DEFTER_UZANTILARI = ('.csv', '.xlsx', '.xls')
+DURUM_DOSYASI = 'toplu_durum.json'
+OZET_DOSYASI = 'toplu_ozet.json'
+# Bir işçi bu kadar müşteriden sonra yenilenir; önbellekler ve parçalanan bellek birikmez
+ISCI_BASINA_GOREV = int(os.environ.get("KAZKAZ_TOPLU_RAPOR_GOREV", "50"))
+
+
+def _guvenli_ad(metin):
+    return re.sub(r'[^\w.-]+', '_', str(metin)).strip('._') or 'musteri'
+
+
+def girdileri_bul(kaynak):
+    """Dizindeki defterleri veya manifestodaki satırları [(müşteri, dosya yolu)] listesine çevirir.
+
+    Dizinde her defter dosyası bir müşteridir (müşteri = dosya adı, uzantısız). Manifesto
+    `musteri` ve `dosya` alanlı bir JSON listesi ya da aynı sütunlu bir CSV olabilir;
+    göreli yollar manifestonun bulunduğu dizine göre çözülür.
+    """
+    if os.path.isdir(kaynak):
+        return [(os.path.splitext(ad)[0], os.path.join(kaynak, ad))
+                for ad in sorted(os.listdir(kaynak)) if ad.lower().endswith(DEFTER_UZANTILARI)]
+    with open(kaynak, encoding='utf-8', newline='') as f:
+        satirlar = json.load(f) if kaynak.lower().endswith('.json') else list(csv.DictReader(f))
+    kok = os.path.dirname(os.path.abspath(kaynak))
+    return [(str(s['musteri']), os.path.join(kok, s['dosya'])) for s in satirlar]
+
+
+def dosya_parmak_izi(yol, ayarlar):
+    """Defter içeriği ve rapor ayarlarından parmak izi; ikisi de aynıysa rapor yeniden üretilmez."""
+    h = hashlib.sha256(json.dumps({'surum': RAPOR_SURUMU, **ayarlar}, sort_keys=True).encode())
+    with open(yol, 'rb') as f:
+        for parca in iter(lambda: f.read(1 << 20), b''):
+            h.update(parca)
+    return h.hexdigest()
+
+
+def _durum_oku(cikti_dizini):
+    try:
+        with open(os.path.join(cikti_dizini, DURUM_DOSYASI), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _json_yaz(yol, veri):
+    # Önce geçici dosyaya yaz, sonra atomik olarak yerine taşı (yarıda kesilen gece çalışması durumu bozmasın)
+    with open(yol + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(veri, f, ensure_ascii=False, indent=2)
+    os.replace(yol + '.tmp', yol)
+
+
+def musteri_raporu(musteri, dosya, hedef, api_key=None, siklik='M', motor=None):
+    """Tek bir müşterinin defterinden PDF üretip `hedef`e yazar; süreç havuzunda çalışır.
+
+    Hatalar fırlatılmaz, sonuç sözlüğünde döner; böylece bir müşteri diğerlerini durdurmaz.
+    """
+    sonuc = {'musteri': musteri, 'dosya': dosya, 'pdf': hedef, 'durum': 'hata', 'hata': None, 'satir': None}
+    with iz_baslat(musteri=musteri) as iz:
+        try:
+            with asama('veri_yukleme', detay=os.path.basename(dosya)) as kayit:
+                df, hata = dosya_yukle(dosya)
+                kayit.satir = None if df is None else len(df)
+            if hata:
+                raise ValueError(hata)
+            sonuc['satir'] = len(df)
+            analiz = calistir_analiz(df, siklik)
+            if 'hata' in analiz:
+                raise ValueError(analiz['hata'])
+            pdf_bytes = rapor_hazirla(analiz, api_key, ayarlar={'motor': motor} if motor else None)
+            if not pdf_bytes:
+                raise RuntimeError("PDF üretilmedi (DejaVuSans.ttf bulunamadı)")
+            with open(hedef + '.tmp', 'wb') as f:
+                f.write(pdf_bytes)
+            os.replace(hedef + '.tmp', hedef)
+            sonuc['durum'] = 'uretildi'
+        except Exception as e:
+            sonuc['hata'] = f"{type(e).__name__}: {e}"
+    sonuc['sure_sn'] = iz.sure_sn
+    asamalar = {}
+    for a in iz.asamalar:
+        asamalar[a.ad] = asamalar.get(a.ad, 0.0) + a.sure_sn
+    sonuc['asamalar'] = asamalar
+    return sonuc
+
+
+def toplu_rapor_uret(girdiler, cikti_dizini, api_key=None, siklik='M', motor=None, max_isci=None, zorla=False, ilerleme=None):
+    """[(müşteri, dosya)] listesindeki her defter için PDF üretir ve çalıştırma özetini döndürür.
+
+    Müşteriler süreç havuzunda paralel işlenir (max_isci=1 ise aynı süreçte sırayla).
+    Defter içeriği ve ayarlar bir önceki çalıştırmayla aynı olan ve PDF'i duran müşteriler
+    atlanır (`zorla` ile hepsi yeniden üretilir). Özet `cikti_dizini/toplu_ozet.json`a da yazılır.
+    `ilerleme(sonuc, bitti, toplam)` her müşteri bittiğinde ana süreçte çağrılır.
+    """
+    if not font_mevcut():
+        raise FileNotFoundError("PDF raporu için 'DejaVuSans.ttf' font dosyası bulunamadı.")
+    os.makedirs(cikti_dizini, exist_ok=True)
+    ayarlar = {'siklik': siklik, 'motor': motor, 'yorum': bool(api_key)}
+    durum = _durum_oku(cikti_dizini)
+    baslangic = time.perf_counter()
+
+    sonuclar, isler = [], []
+    for musteri, dosya in girdiler:
+        hedef = os.path.join(cikti_dizini, f"{_guvenli_ad(musteri)}.pdf")
+        try:
+            parmak_izi = dosya_parmak_izi(dosya, ayarlar)
+        except OSError as e:
+            sonuclar.append({'musteri': musteri, 'dosya': dosya, 'pdf': None, 'durum': 'hata',
+                             'hata': f"{type(e).__name__}: {e}", 'satir': None, 'sure_sn': 0.0, 'asamalar': {}})
+            continue
+        onceki = durum.get(musteri)
+        if not zorla and onceki and onceki['parmak_izi'] == parmak_izi and os.path.exists(hedef):
+            sonuclar.append({'musteri': musteri, 'dosya': dosya, 'pdf': hedef, 'durum': 'atlandi',
+                             'hata': None, 'satir': None, 'sure_sn': 0.0, 'asamalar': {}})
+            continue
+        isler.append((musteri, dosya, hedef, parmak_izi))
+
+    def bitir(sonuc, parmak_izi):
+        sonuclar.append(sonuc)
+        if sonuc['durum'] == 'uretildi':
+            durum[sonuc['musteri']] = {'parmak_izi': parmak_izi, 'pdf': os.path.basename(sonuc['pdf']),
+                                       'zaman': time.strftime('%Y-%m-%dT%H:%M:%S')}
+        if ilerleme:
+            ilerleme(sonuc, len(sonuclar), len(girdiler))
+
+    isci = max_isci or os.cpu_count() or 1
+    if isci <= 1 or len(isler) <= 1:
+        for musteri, dosya, hedef, parmak_izi in isler:
+            bitir(musteri_raporu(musteri, dosya, hedef, api_key, siklik, motor), parmak_izi)
+    else:
+        # Streamlit dışında da spawn: tahmin_motoru'nun süreç havuzuyla aynı, iş parçacığı kilitleri kopyalanmaz
+        with ProcessPoolExecutor(max_workers=min(isci, len(isler)), mp_context=multiprocessing.get_context('spawn'),
+                                 max_tasks_per_child=ISCI_BASINA_GOREV) as havuz:
+            gelecekler = {havuz.submit(musteri_raporu, musteri, dosya, hedef, api_key, siklik, motor): (musteri, dosya, hedef, parmak_izi)
+                          for musteri, dosya, hedef, parmak_izi in isler}
+            for gelecek in as_completed(gelecekler):
+                musteri, dosya, hedef, parmak_izi = gelecekler[gelecek]
+                try:
+                    sonuc = gelecek.result()
+                except Exception as e:  # İşçi süreç çöktü (ör. bellek yetmedi)
+                    sonuc = {'musteri': musteri, 'dosya': dosya, 'pdf': hedef, 'durum': 'hata',
+                             'hata': f"{type(e).__name__}: {e}", 'satir': None, 'sure_sn': None, 'asamalar': {}}
+                bitir(sonuc, parmak_izi)
+    _json_yaz(os.path.join(cikti_dizini, DURUM_DOSYASI), durum)
+
+    ozet = _ozet(sonuclar, time.perf_counter() - baslangic, isci, ayarlar)
+    _json_yaz(os.path.join(cikti_dizini, OZET_DOSYASI), ozet)
+    return ozet
+
+
+def _ozet(sonuclar, toplam_sure, isci, ayarlar):
+    sayilar = {d: sum(s['durum'] == d for s in sonuclar) for d in ('uretildi', 'atlandi', 'hata')}
+    asama_toplami = {}
+    for s in sonuclar:
+        for ad, sure in s['asamalar'].items():
+            asama_toplami[ad] = asama_toplami.get(ad, 0.0) + sure
+    uretilen = [s['sure_sn'] for s in sonuclar if s['durum'] == 'uretildi']
+    return {
+        'zaman': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'ayarlar': {**ayarlar, 'isci': isci, 'rapor_surumu': RAPOR_SURUMU},
+        'toplam': len(sonuclar), **sayilar,
+        'toplam_sure_sn': toplam_sure,
+        'musteri_ortalama_sn': sum(uretilen) / len(uretilen) if uretilen else None,
+        'asama_toplam_sn': asama_toplami,
+        'hatalar': [{'musteri': s['musteri'], 'dosya': s['dosya'], 'hata': s['hata']} for s in sonuclar if s['durum'] == 'hata'],
+        'musteriler': sorted(sonuclar, key=lambda s: s['musteri']),
+    }
+
+
+def main(argv=None):
+    ayristirici = argparse.ArgumentParser(prog="python toplu_rapor.py", description="KazKaz toplu PDF rapor üretimi")
+    ayristirici.add_argument("kaynak", help="Defter dizini veya manifesto (musteri,dosya alanlı .json / .csv)")
+    ayristirici.add_argument("--cikti", default="raporlar", help="PDF'lerin, durum ve özet dosyalarının yazılacağı dizin")
+    ayristirici.add_argument("--isci", type=int, default=None, help="Süreç sayısı (varsayılan: çekirdek sayısı; 1 = sırayla)")
+    ayristirici.add_argument("--siklik", default='M', help="Rapor dönem sıklığı (W, M, Q, Y)")
+    ayristirici.add_argument("--motor", default=None, help="Tahmin motoru (varsayılan: uygulamanın politikası)")
+    ayristirici.add_argument("--zorla", action="store_true", help="Değişmeyen defterlerin raporlarını da yeniden üret")
+    args = ayristirici.parse_args(argv)
+
+    # Stratejik yorum yalnızca anahtar (veya KAZKAZ_LLM_ARKA_UCU=yerel) varken üretilir
+    api_key = os.environ.get("GEMINI_API_KEY") or (os.environ.get("KAZKAZ_LLM_ARKA_UCU") == "yerel" and "yerel") or None
+    girdiler = girdileri_bul(args.kaynak)
+
+    def ilerleme(sonuc, bitti, toplam):
+        ek = f" ({sonuc['sure_sn']:.2f} sn)" if sonuc['durum'] == 'uretildi' else f": {sonuc['hata']}" if sonuc['hata'] else ""
+        print(f"[{bitti}/{toplam}] {sonuc['musteri']} {sonuc['durum']}{ek}", flush=True)
+
+    try:
+        ozet = toplu_rapor_uret(girdiler, args.cikti, api_key, args.siklik, args.motor, args.isci, args.zorla, ilerleme)
+    except FileNotFoundError as e:
+        print(f"Hata: {e}", file=sys.stderr)
+        return 2
+    print(f"{ozet['toplam']} müşteri | üretildi: {ozet['uretildi']} | atlandı: {ozet['atlandi']} | hata: {ozet['hata']} | "
+          f"{ozet['toplam_sure_sn']:.1f} sn -> {os.path.join(args.cikti, OZET_DOSYASI)}")
+    return 1 if ozet['hata'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
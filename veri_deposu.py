@@ -0,0 +1,210 @@
+# KazKaz AI Finansal Danışman - Kullanıcı Bazlı Sütunlu Veri Deposu (Parquet)
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from onbellek import BELLEK_BUTCESI, SinirliOnbellek, cerceve_paylas
+from veri_yukleme import KATEGORIK_SUTUNLAR, TUTAR_SUTUNLARI, ZORUNLU_SUTUNLAR, kompakt_yap
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    DEPO_AKTIF = True
+except ImportError:
+    DEPO_AKTIF = False
+
+# Yerleşim: <DEPO_DIZINI>/<kullanıcı özeti>/ay=YYYY-MM/k<kaynak özeti>-<zaman>-<rastgele>.parquet
+DEPO_DIZINI = os.environ.get("KAZKAZ_DEPO_DIZINI", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".veri_deposu"))
+OZET_SUTUNU = '_satir_ozeti'
+
+DEPO_OKUMA_ONBELLEGI = SinirliOnbellek(max_oge=32, butce=BELLEK_BUTCESI)
+# Aynı yüklemenin her yeniden çalıştırmada tekrar depoya yazılmaya çalışılmaması için (kullanıcı, kaynak, içerik)
+_YAZILAN_KAYNAKLAR = SinirliOnbellek(max_oge=256)
+# Kenar çubuğu özeti her yeniden çalıştırmada istenir; parça altbilgileri yalnızca depo değişince yeniden okunur.
+# Başka bir süreç aynı depoya yazarsa özet en geç `ttl` saniye sonra tazelenir.
+DEPO_OZETLERI = SinirliOnbellek(max_oge=1024, ttl=float(os.environ.get("KAZKAZ_DEPO_OZETI_TTL", "300")))
+_kullanici_kilitleri = {}
+_kilitler_kilidi = threading.Lock()
+
+
+def _kullanici_dizini(kullanici):
+    # Kullanıcı kimliği dosya yoluna doğrudan konmaz; özetlenerek güvenli bir dizin adı üretilir
+    return os.path.join(DEPO_DIZINI, hashlib.sha256(str(kullanici).encode()).hexdigest()[:24])
+
+
+def _kilit(kullanici):
+    with _kilitler_kilidi:
+        return _kullanici_kilitleri.setdefault(kullanici, threading.Lock())
+
+
+def _depo_sutunlari(df):
+    return ZORUNLU_SUTUNLAR + [col for col in KATEGORIK_SUTUNLAR if col in df.columns]
+
+
+def satir_ozetleri(df):
+    """Her satır için içerik özeti (uint64) üretir.
+
+    Tipler normalize edilir (tutarlar float, metinler str) ki CSV ve Sheets'ten gelen
+    aynı satır aynı özeti alsın. Aynı satırın defterde birden fazla geçmesi meşru
+    olabileceğinden, tekrar sırası da özete katılır.
+    """
+    normal = pd.DataFrame({'Tarih': pd.to_datetime(df['Tarih']).astype('datetime64[ns]')})
+    for col in TUTAR_SUTUNLARI:
+        normal[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    for col in KATEGORIK_SUTUNLAR:
+        if col in df.columns:
+            normal[col] = df[col].astype('object').where(df[col].notna(), None).astype(str)
+    ham = pd.Series(pd.util.hash_pandas_object(normal, index=False).to_numpy(), index=df.index)
+    tekrar = ham.groupby(ham, sort=False).cumcount()
+    return pd.util.hash_pandas_object(pd.DataFrame({'h': ham, 'k': tekrar}), index=False).to_numpy()
+
+
+def _ay_dizinleri(kullanici):
+    kok = _kullanici_dizini(kullanici)
+    if not os.path.isdir(kok):
+        return {}
+    return {ad[3:]: os.path.join(kok, ad) for ad in sorted(os.listdir(kok)) if ad.startswith("ay=")}
+
+
+def _kaynak_oneki(kaynak):
+    # Kaynak adı (dosya adı, Sheets URL'si) dosya adına doğrudan konmaz
+    return "k" + hashlib.sha256(str(kaynak).encode()).hexdigest()[:16] + "-"
+
+
+def _parca_dosyalari(ay_dizini, kaynak=None):
+    """Ayın parça dosyaları; `kaynak` verilirse yalnızca o kaynağınkiler."""
+    onek = "" if kaynak is None else _kaynak_oneki(kaynak)
+    return sorted(os.path.join(ay_dizini, f) for f in os.listdir(ay_dizini) if f.endswith(".parquet") and f.startswith(onek))
+
+
+def depoya_yaz(kullanici, df, kaynak='', icerik_anahtari=None):
+    """Bir kaynağın (ör. dosya adı, Sheets URL'si) satırlarını kullanıcının deposuna yazar; değişen satır sayısını döndürür.
+
+    Depo, kaynak ve ay başına tutulur. Kaynağın bir ayındaki satırlar değiştiyse o aydaki eski
+    parçaları yeni bir parçayla değiştirilir, tabloda artık bulunmayan aylarınkiler silinir;
+    satırları aynı kalan aylara dokunulmaz (yalnızca özet sütunu okunur). Böylece düzeltilmiş
+    bir dosya yeniden yüklendiğinde eski satır yenisinin yanında kalmaz. Diğer kaynakların
+    parçaları değişmez. `icerik_anahtari` verilirse aynı içerik bir daha işlenmez.
+    """
+    if not DEPO_AKTIF or df is None or df.empty:
+        return 0
+    if icerik_anahtari is not None and (kullanici, kaynak, icerik_anahtari) in _YAZILAN_KAYNAKLAR:
+        return 0
+
+    tablo = df[_depo_sutunlari(df)].copy()
+    tablo[OZET_SUTUNU] = satir_ozetleri(tablo)
+    # strftime satır başına çalışır; dönem kodları üzerinden gruplayıp yalnızca ay adlarını biçimlendiriyoruz
+    yeni_aylar = {donem.strftime('%Y-%m'): ay_tablosu for donem, ay_tablosu in tablo.groupby(tablo['Tarih'].dt.to_period('M'), sort=True)}
+    degisen = 0
+    with _kilit(kullanici):
+        mevcut_aylar = _ay_dizinleri(kullanici)
+        for ay in sorted(set(yeni_aylar) | set(mevcut_aylar)):
+            ay_tablosu = yeni_aylar.get(ay)
+            ay_dizini = mevcut_aylar.get(ay) or os.path.join(_kullanici_dizini(kullanici), f"ay={ay}")
+            eski_dosyalar = _parca_dosyalari(ay_dizini, kaynak) if ay in mevcut_aylar else []
+            eski = (pq.ParquetDataset(eski_dosyalar).read(columns=[OZET_SUTUNU]).column(OZET_SUTUNU).to_numpy()
+                    if eski_dosyalar else np.empty(0, dtype=np.uint64))
+            yeni = ay_tablosu[OZET_SUTUNU].to_numpy() if ay_tablosu is not None else np.empty(0, dtype=np.uint64)
+            # Özetler tekrar sırasını içerdiğinden kümeler eşitse ayın satırları da aynıdır
+            if len(eski) == len(yeni) and np.array_equal(np.sort(eski), np.sort(yeni)):
+                continue
+            degisen += len(np.setxor1d(eski, yeni))
+            if ay_tablosu is not None:
+                os.makedirs(ay_dizini, exist_ok=True)
+                hedef = os.path.join(ay_dizini, f"{_kaynak_oneki(kaynak)}{pd.Timestamp.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}.parquet")
+                pq.write_table(_arrow_tablosu(ay_tablosu), hedef + ".tmp")
+                os.replace(hedef + ".tmp", hedef)
+            for dosya in eski_dosyalar:
+                os.remove(dosya)
+            if not os.listdir(ay_dizini):
+                os.rmdir(ay_dizini)
+        if degisen:
+            DEPO_OZETLERI.pop(kullanici)
+    if icerik_anahtari is not None:
+        _YAZILAN_KAYNAKLAR.set((kullanici, kaynak, icerik_anahtari), True)
+    return degisen
+
+
+def _arrow_tablosu(df):
+    # Kategorik sütunlar düz metin olarak yazılır (Parquet yine sözlük kodlar); böylece farklı
+    # yüklemelerden gelen parçaların şemaları, kategori sayısından bağımsız olarak aynı kalır.
+    tablo = pa.Table.from_pandas(df, preserve_index=False)
+    for col in KATEGORIK_SUTUNLAR:
+        if col in tablo.column_names and pa.types.is_dictionary(tablo.schema.field(col).type):
+            tablo = tablo.set_column(tablo.column_names.index(col), col, tablo.column(col).cast(pa.string()))
+    return tablo
+
+
+def depo_surumu(kullanici, aylar=None, kaynak=None):
+    """Okunacak parçaların adlarından oluşan sürüm imzası; bir parça eklenip silinince değişir."""
+    return tuple(f for ay, dizin in _ay_dizinleri(kullanici).items() if _ay_secili(ay, aylar) for f in _parca_dosyalari(dizin, kaynak))
+
+
+def _ay_secili(ay, aylar):
+    if aylar is None:
+        return True
+    baslangic, bitis = aylar
+    return (baslangic is None or ay >= baslangic) and (bitis is None or ay <= bitis)
+
+
+def depodan_oku(kullanici, aylar=None, kaynak=None):
+    """Kullanıcının deposunu bellek eşlemeli okumayla DataFrame olarak döndürür; boşsa None.
+
+    Varsayılan olarak tüm kaynakların birleşimi okunur; `kaynak` verilirse yalnızca o kaynağın,
+    `aylar` ('YYYY-MM', 'YYYY-MM') aralığı verilirse yalnızca o bölümlerin parçaları okunur.
+    Sonuç parça listesi değişmedikçe önbellekten gelir; aynı içerik başka bir oturumda
+    zaten yüklüyse o tablo paylaşılır (bkz. cerceve_paylas).
+    """
+    if not DEPO_AKTIF:
+        return None
+    # depoya_yaz eski parçaları sildiğinden liste ve okuma aynı kilit altında yapılır
+    with _kilit(kullanici):
+        dosyalar = depo_surumu(kullanici, aylar, kaynak)
+        if not dosyalar:
+            return None
+        return DEPO_OKUMA_ONBELLEGI.get_or_compute((kullanici, dosyalar), lambda: cerceve_paylas(kompakt_yap(_dosyalari_oku(dosyalar))))
+
+
+def _dosyalari_oku(dosyalar):
+    tablolar = [pq.read_table(f, memory_map=True, read_dictionary=[c for c in KATEGORIK_SUTUNLAR if c in pq.read_schema(f).names])
+                for f in dosyalar]
+    birlesik = pa.concat_tables(tablolar, promote_options='default').drop_columns([OZET_SUTUNU])
+    df = birlesik.to_pandas(split_blocks=True, self_destruct=True)
+    for col in KATEGORIK_SUTUNLAR:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    return df.sort_values('Tarih', kind='stable', ignore_index=True)
+
+
+def depo_aylari(kullanici):
+    """Depoda verisi bulunan ayları ('YYYY-MM') sıralı liste olarak döndürür."""
+    return list(_ay_dizinleri(kullanici)) if DEPO_AKTIF else []
+
+
+def depo_ozeti(kullanici):
+    """Kenar çubuğunda göstermek için (satır sayısı, ay sayısı) döndürür.
+
+    Sonuç kullanıcı başına önbelleğe alınır; depoya_yaz ve depoyu_temizle önbelleği geçersiz kılar.
+    """
+    if not DEPO_AKTIF:
+        return 0, 0
+
+    def hesapla():
+        ay_dizinleri = _ay_dizinleri(kullanici)
+        satir = sum(pq.ParquetFile(f).metadata.num_rows for dizin in ay_dizinleri.values() for f in _parca_dosyalari(dizin))
+        return satir, len(ay_dizinleri)
+    with _kilit(kullanici):
+        return DEPO_OZETLERI.get_or_compute(kullanici, hesapla)
+
+
+def depoyu_temizle(kullanici):
+    """Kullanıcının tüm kayıtlı verisini siler."""
+    with _kilit(kullanici):
+        shutil.rmtree(_kullanici_dizini(kullanici), ignore_errors=True)
+        DEPO_OZETLERI.pop(kullanici)
+    _YAZILAN_KAYNAKLAR.kosullu_sil(lambda anahtar: anahtar[0] == kullanici)
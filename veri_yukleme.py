@@ -0,0 +1,217 @@
+# KazKaz AI Finansal Danışman - Tipli ve Parçalı Veri Yükleme
+import os
+
+import numpy as np
+import pandas as pd
+
+ZORUNLU_SUTUNLAR = ['Tarih', 'Gelir', 'Gider']
+KATEGORIK_SUTUNLAR = ['Kategori', 'Satilan_Urun_Adi']
+TUTAR_SUTUNLARI = ['Gelir', 'Gider']
+
+# Denenecek sabit tarih formatları (sırası önemlidir: ilk tam eşleşen seçilir)
+TARIH_FORMATLARI = ['%Y-%m-%d', '%d.%m.%Y', '%d/%m/%Y', '%Y/%m/%d', '%m/%d/%Y', '%Y-%m-%d %H:%M:%S', '%d.%m.%Y %H:%M:%S']
+TARIH_ORNEK_SAYISI = 200
+
+# Bu boyutun üzerindeki CSV'ler tek seferde belleğe alınmaz, parça parça işlenir
+PARCALI_ESIK_BAYT = int(float(os.environ.get("KAZKAZ_PARCALI_ESIK_MB", "100")) * 1024 * 1024)
+PARCA_SATIR = int(os.environ.get("KAZKAZ_PARCA_SATIR", "500000"))
+
+TARIH_HATA_MESAJI = "Hata: 'Tarih' sütunundaki bazı değerler anlaşılamadı. Lütfen 'YYYY-MM-DD' formatını kullanın."
+
+try:
+    import pyarrow  # noqa: F401
+    CSV_MOTORU = 'pyarrow'
+except ImportError:
+    CSV_MOTORU = 'c'
+
+
+def eksik_sutun_hatasi(sutunlar):
+    """Zorunlu sütunlardan eksik olan varsa hata mesajını, yoksa None döndürür."""
+    missing_cols = [col for col in ZORUNLU_SUTUNLAR if col not in sutunlar]
+    if missing_cols:
+        return f"Hata: Yüklenen veride şu sütunlar eksik: {', '.join(missing_cols)}"
+    return None
+
+
+def tarih_formati_bul(seri):
+    """Serinin ilk dolu değerlerinden hepsini ayrıştırabilen sabit formatı bulur; bulamazsa None."""
+    ornek = seri.dropna().astype(str).head(TARIH_ORNEK_SAYISI)
+    if ornek.empty:
+        return None
+    for fmt in TARIH_FORMATLARI:
+        if pd.to_datetime(ornek, format=fmt, errors='coerce').notna().all():
+            return fmt
+    return None
+
+
+def tarihleri_ayristir(seri, fmt=None):
+    """Tarihleri (varsa) sabit formatla hızlıca ayrıştırır; formata uymayan değerler genel ayrıştırıcıya düşer.
+
+    Defterlerde aynı gün binlerce kez tekrarlandığından yalnızca benzersiz değerler
+    ayrıştırılıp kodlar üzerinden geri yayılır.
+    """
+    if pd.api.types.is_datetime64_any_dtype(seri):
+        return seri
+    kodlar, benzersiz = pd.factorize(seri)
+    benzersiz = pd.Series(benzersiz)
+    fmt = fmt or tarih_formati_bul(benzersiz)
+    if fmt is None:
+        tarihler = pd.to_datetime(benzersiz, errors='coerce')
+    else:
+        tarihler = pd.to_datetime(benzersiz, format=fmt, errors='coerce')
+        uymayan = tarihler.isna()
+        if uymayan.any():
+            tarihler[uymayan] = pd.to_datetime(benzersiz[uymayan], errors='coerce')
+    # factorize eksik değerlere -1 kodu verir; sona eklenen NaT bu koda denk gelir
+    tarihler = pd.concat([tarihler, pd.Series([pd.NaT], dtype=tarihler.dtype)], ignore_index=True)
+    return pd.Series(tarihler.to_numpy()[kodlar], index=seri.index, name=seri.name)
+
+
+def tipleri_duzenle(df, tutar_tipi='float64', fmt=None):
+    """Sütunları hedef tiplere çevirir: kategorik metinler, sayısal tutarlar, datetime tarih.
+
+    Boş ya da sayı olmayan tutarlar 0 sayılır; tek seferde ve parça parça yüklenen
+    dosyalar aynı toplamları verir.
+    """
+    for col in TUTAR_SUTUNLARI:
+        if col not in df.columns:
+            continue
+        if df[col].dtype != tutar_tipi:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(tutar_tipi)
+        if df[col].isna().any():
+            df[col] = df[col].fillna(0)
+    for col in KATEGORIK_SUTUNLAR:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    df['Tarih'] = tarihleri_ayristir(df['Tarih'], fmt)
+    return df
+
+
+def kompakt_yap(df):
+    """Paylaşılan önbellekte tutulacak tabloyu kayıpsız küçültür ve tabloyu döndürür.
+
+    Ek metin sütunlarından tekrarlı olanlar kategorik, ek tamsayı sütunlar en küçük tamsayı
+    tipine, ek ondalık sütunlar değerleri birebir korunuyorsa float32'ye çevrilir. Tutarlar
+    float64 kalır (float32 kuruşları tam tutamaz); Tarih zaten int64 tabanlı datetime64'tür.
+    """
+    for col in df.columns:
+        if col in TUTAR_SUTUNLARI or col == 'Tarih':
+            continue
+        seri = df[col]
+        if seri.dtype == object:
+            if seri.nunique(dropna=True) <= len(seri) // 2:
+                df[col] = seri.astype('category')
+        elif pd.api.types.is_integer_dtype(seri) and not isinstance(seri.dtype, pd.CategoricalDtype):
+            df[col] = pd.to_numeric(seri, downcast='integer')
+        elif pd.api.types.is_float_dtype(seri) and seri.dtype != 'float32':
+            kucuk = seri.astype('float32')
+            if np.array_equal(kucuk.to_numpy(dtype='float64'), seri.to_numpy(dtype='float64'), equal_nan=True):
+                df[col] = kucuk
+    if not isinstance(df.index, pd.RangeIndex):
+        df = df.reset_index(drop=True)
+    return df
+
+
+def _csv_tipleri(tutar_tipi):
+    return {**{col: 'category' for col in KATEGORIK_SUTUNLAR}, **{col: tutar_tipi for col in TUTAR_SUTUNLARI}}
+
+
+def _csv_oku(kaynak, tutar_tipi):
+    try:
+        return pd.read_csv(kaynak, engine=CSV_MOTORU, dtype=_csv_tipleri(tutar_tipi))
+    except ValueError:
+        # Tutar sütununda sayı olmayan değerler var: tiplemeden oku, sonra zorla çevir
+        if hasattr(kaynak, 'seek'): kaynak.seek(0)
+        return pd.read_csv(kaynak, engine=CSV_MOTORU, dtype={col: 'category' for col in KATEGORIK_SUTUNLAR})
+
+
+def _gunluk_ozet(df):
+    """Satırları (gün, kategori, ürün, gelir>0, gider>0) hücrelerine toplar.
+
+    Pozitiflik bayrakları anahtarın parçası olduğu için, calistir_analiz'in
+    'yalnızca pozitif tutarlar' kuralı özet üzerinde de birebir aynı sonucu verir.
+    """
+    anahtarlar = [df['Tarih'].dt.normalize().rename('Tarih')]
+    anahtarlar += [df[col] for col in KATEGORIK_SUTUNLAR if col in df.columns]
+    anahtarlar += [(df['Gelir'] > 0).rename('_gelir_pozitif'), (df['Gider'] > 0).rename('_gider_pozitif')]
+    return df[TUTAR_SUTUNLARI].groupby(anahtarlar, observed=True, dropna=False, sort=False).sum().reset_index()
+
+
+def _ozetleri_birlestir(ozetler):
+    birlesik = pd.concat(ozetler, ignore_index=True)
+    for col in KATEGORIK_SUTUNLAR:
+        if col in birlesik.columns and not isinstance(birlesik[col].dtype, pd.CategoricalDtype):
+            birlesik[col] = birlesik[col].astype('category')
+    anahtarlar = [c for c in birlesik.columns if c not in TUTAR_SUTUNLARI]
+    return birlesik.groupby(anahtarlar, observed=True, dropna=False, sort=False)[TUTAR_SUTUNLARI].sum().reset_index()
+
+
+def parcali_yukle(kaynak, parca_satir=PARCA_SATIR, tutar_tipi='float64'):
+    """Büyük CSV'yi parça parça okur, her parçayı doğrular ve günlük özete katlar.
+
+    Tam veri hiçbir zaman bellekte tutulmaz; dönen tablo aynı şemaya (Tarih, Gelir,
+    Gider, Kategori, Satilan_Urun_Adi) sahip günlük özettir ve calistir_analiz /
+    kirilim_serileri ile ham veriyle aynı sonuçları verir. (df, hata_mesajı) döndürür.
+    """
+    ozetler, ozet_satir, fmt = [], 0, None
+    okuyucu = pd.read_csv(kaynak, chunksize=parca_satir, dtype={col: 'category' for col in KATEGORIK_SUTUNLAR})
+    for parca in okuyucu:
+        hata = eksik_sutun_hatasi(parca.columns)
+        if hata:
+            return None, hata
+        if fmt is None:
+            fmt = tarih_formati_bul(parca['Tarih'])
+        parca = tipleri_duzenle(parca, tutar_tipi, fmt)
+        if parca['Tarih'].isnull().any():
+            return None, TARIH_HATA_MESAJI
+        ozet = _gunluk_ozet(parca)
+        ozetler.append(ozet)
+        ozet_satir += len(ozet)
+        # Biriken özetler bir parça boyunu aşınca sıkıştır; bellek kullanımı özet boyutuyla sınırlı kalır
+        if ozet_satir > parca_satir and len(ozetler) > 1:
+            ozetler = [_ozetleri_birlestir(ozetler)]
+            ozet_satir = len(ozetler[0])
+    if not ozetler:
+        return pd.DataFrame(columns=ZORUNLU_SUTUNLAR), None
+    sonuc = _ozetleri_birlestir(ozetler).drop(columns=['_gelir_pozitif', '_gider_pozitif'])
+    return kompakt_yap(sonuc.sort_values('Tarih', kind='stable', ignore_index=True)), None
+
+
+def _boyut(kaynak):
+    if isinstance(kaynak, (str, os.PathLike)):
+        return os.path.getsize(kaynak)
+    boyut = getattr(kaynak, 'size', None)
+    return boyut if boyut is not None else len(kaynak.getbuffer()) if hasattr(kaynak, 'getbuffer') else 0
+
+
+def dosya_yukle(kaynak, ad=None, tutar_tipi='float64'):
+    """CSV/Excel dosyasını tipli olarak yükler ve doğrular; (df, hata_mesajı) döndürür.
+
+    `kaynak` dosya yolu veya dosya benzeri nesne (ör. Streamlit UploadedFile) olabilir.
+    PARCALI_ESIK_BAYT üzerindeki CSV'ler parcali_yukle ile günlük özete indirgenir.
+    """
+    ad = ad or getattr(kaynak, 'name', str(kaynak))
+    if ad.endswith('.csv'):
+        if _boyut(kaynak) > PARCALI_ESIK_BAYT:
+            return parcali_yukle(kaynak, tutar_tipi=tutar_tipi)
+        df = _csv_oku(kaynak, tutar_tipi)
+    elif ad.endswith(('.xls', '.xlsx')):
+        df = pd.read_excel(kaynak, dtype={col: 'category' for col in KATEGORIK_SUTUNLAR})
+    else:
+        return None, "Hata: Desteklenmeyen dosya türü. Lütfen CSV veya Excel yükleyin."
+    return tablo_dogrula(df, tutar_tipi)
+
+
+def tablo_dogrula(df, tutar_tipi='float64'):
+    """Bellekteki tabloyu (dosya veya Google Sheets) doğrular ve tiplerini düzenler.
+
+    Girdi tablo değiştirilmez; önbellekte oturumlar arasında paylaşılıyor olabilir (ör. SAYFA_ONBELLEGI).
+    """
+    hata = eksik_sutun_hatasi(df.columns)
+    if hata:
+        return None, hata
+    # Sütunlar yalnızca sığ kopyada değiştirilir; veri dizileri kopyalanmaz
+    df = tipleri_duzenle(df.copy(deep=False), tutar_tipi)
+    if df['Tarih'].isnull().any():
+        return None, TARIH_HATA_MESAJI
+    return kompakt_yap(df), None
@@ -0,0 +1,183 @@
+# KazKaz AI Finansal Danışman - Eşzamanlı ve Önbellekli AI Yorum Servisi
+import asyncio
+import hashlib
+import os
+import threading
+
+from bagimliliklar import genai
+from izleme import asama
+from onbellek import SinirliOnbellek
+
+MODEL_ADI = 'gemini-1.5-flash'
+YORUM_HATA_MESAJI = "AI yorumu şu anda kullanılamıyor."
+TAHMIN_YORUM_HATA_MESAJI = "Stratejik tahmin yorumu şu anda üretilemiyor. Lütfen API anahtarınızı kontrol edin."
+
+# Aynı istem + model için yanıt tüm kullanıcılar ve yeniden çalıştırmalar arasında paylaşılır
+YORUM_ONBELLEGI = SinirliOnbellek(max_oge=1024, ttl=int(os.environ.get("KAZKAZ_YORUM_TTL", str(6 * 3600))))
+
+
+def yorum_istemi(prompt_data):
+    return f"Sen deneyimli bir finansal danışmansın. Şu verilere dayanarak, 1-2 cümlelik kısa ve öz bir yorum yap: {prompt_data}"
+
+
+def tahmin_yorum_istemi(forecast_df):
+    """Tahmin tablosunun son 3 ayından aktüeryal stratejik yorum istemini oluşturur."""
+    son_tahmin = forecast_df.iloc[-1]
+    onceki_tahmin = forecast_df.iloc[-4]
+    trend = "Yükselişte" if son_tahmin['yhat'] > onceki_tahmin['yhat'] else "Düşüşte veya Durgun"
+    belirsizlik_araligi = son_tahmin['yhat_upper'] - son_tahmin['yhat_lower']
+    return f"""
+        Sen, aktüerya ve risk yönetimi konusunda uzman, profesyonel bir finansal stratejistsin.
+        Aşağıdaki gelecek tahmini verilerini analiz et ve stratejik bir yorum yaz. Yorumun şunları içermeli:
+        1. Tahminin ana yönü (trend) hakkında bir değerlendirme.
+        2. Tahmindeki belirsizlik aralığına (volatilite) dayalı bir risk analizi.
+        3. Bu öngörülere dayanarak şirketin atması gereken 1-2 adet stratejik adım.
+        Tonun profesyonel, analitik ve yol gösterici olmalı.
+
+        Veriler:
+        - Gelecek 3 Aylık Gelir Tahmini Trendi: {trend}
+        - Son Tahmin Edilen Gelir (yhat): {son_tahmin['yhat']:.2f} TL
+        - Tahmin Güven Aralığı (En Kötü Senaryo - yhat_lower): {son_tahmin['yhat_lower']:.2f} TL
+        - Tahmin Güven Aralığı (En İyi Senaryo - yhat_upper): {son_tahmin['yhat_upper']:.2f} TL
+        - Belirsizlik Aralığı Genişliği: {belirsizlik_araligi:.2f} TL (Bu değerin yüksekliği, tahminin daha az kesin olduğunu ve riskin arttığını gösterir.)
+        """
+
+
+class GeminiArkaUcu:
+    """google.generativeai üzerinden akışlı yanıt üretir.
+
+    SDK'nın asenkron istemcisi ilk oluşturulduğu olay döngüsüne bağlı kalır; her
+    çalıştırmada yeni döngü açıldığı için senkron akış bir iş parçacığında
+    tüketilip parçalar kuyruk üzerinden döngüye aktarılır.
+    """
+
+    _yapilandirma_kilidi = threading.Lock()
+
+    def __init__(self, api_key, model_adi=MODEL_ADI):
+        self.api_key = api_key
+        self.model_adi = model_adi
+
+    def _akisi_baslat(self, istem):
+        # genai.configure süreç geneli bir ayardır ve model istemcisini ilk generate_content
+        # çağrısında varsayılan yapılandırmadan alır; yapılandırma ve isteğin başlatılması
+        # aynı kilit altında yapılır ki eşzamanlı çağrılar birbirinin anahtarıyla gitmesin.
+        # Akışın tüketilmesi kilidin dışında kalır, yanıtlar yine paralel gelir.
+        with self._yapilandirma_kilidi:
+            genai().configure(api_key=self.api_key)
+            return genai().GenerativeModel(self.model_adi).generate_content(istem, stream=True)
+
+    async def akis(self, istem):
+        dongu = asyncio.get_running_loop()
+        kuyruk = asyncio.Queue()
+
+        def uret():
+            try:
+                for parca in self._akisi_baslat(istem):
+                    dongu.call_soon_threadsafe(kuyruk.put_nowait, parca.text)
+                dongu.call_soon_threadsafe(kuyruk.put_nowait, _AKIS_SONU)
+            except Exception as e:
+                dongu.call_soon_threadsafe(kuyruk.put_nowait, e)
+
+        dongu.run_in_executor(None, uret)
+        while True:
+            parca = await kuyruk.get()
+            if parca is _AKIS_SONU:
+                return
+            if isinstance(parca, Exception):
+                raise parca
+            yield parca
+
+
+_AKIS_SONU = object()
+
+
+class YerelArkaUc:
+    """Ağ erişimi olmadan test ve kıyaslama için sahte LLM arka ucu.
+
+    Yanıt istemden deterministik olarak türetilir; `gecikme` ilk parçaya kadar,
+    `parca_gecikmesi` her kelime arasında beklenen süredir (saniye).
+    """
+
+    def __init__(self, gecikme=0.0, parca_gecikmesi=0.0, model_adi="yerel-stub"):
+        self.gecikme = gecikme
+        self.parca_gecikmesi = parca_gecikmesi
+        self.model_adi = model_adi
+        self.cagri_sayisi = 0
+
+    async def akis(self, istem):
+        self.cagri_sayisi += 1
+        await asyncio.sleep(self.gecikme)
+        ozet = hashlib.sha256(istem.encode()).hexdigest()[:8]
+        for kelime in f"Yerel yorum ({ozet}): veriler incelendi, nakit akışı ve marjlar izlenmeli.".split():
+            await asyncio.sleep(self.parca_gecikmesi)
+            yield kelime + " "
+
+
+def arka_uc_sec(api_key):
+    """Ortam ayarına göre arka ucu seçer; KAZKAZ_LLM_ARKA_UCU=yerel ise API çağrılmaz."""
+    if os.environ.get("KAZKAZ_LLM_ARKA_UCU") == "yerel":
+        return YerelArkaUc()
+    return GeminiArkaUcu(api_key) if api_key else None
+
+
+def _onbellek_anahtari(arka_uc, istem):
+    return hashlib.sha256(f"{arka_uc.model_adi}\x00{istem}".encode()).hexdigest()
+
+
+def onbellekten(arka_uc, istem):
+    """Yanıt daha önce üretildiyse önbellekten döndürür, yoksa None."""
+    return YORUM_ONBELLEGI.get(_onbellek_anahtari(arka_uc, istem))
+
+
+async def _tek_yorum(arka_uc, istem, yazici, hata_mesaji):
+    anahtar = _onbellek_anahtari(arka_uc, istem)
+    metin = YORUM_ONBELLEGI.get(anahtar)
+    if metin is not None:
+        if yazici: yazici(metin)
+        return metin
+    parcalar = []
+    try:
+        with asama('llm', detay=arka_uc.model_adi):
+            async for parca in arka_uc.akis(istem):
+                parcalar.append(parca)
+                if yazici: yazici("".join(parcalar))
+    except Exception:
+        if yazici: yazici(hata_mesaji)
+        return hata_mesaji  # Hatalar önbelleğe yazılmaz; sonraki çalıştırmada yeniden denenir
+    metin = "".join(parcalar)
+    YORUM_ONBELLEGI.set(anahtar, metin)
+    return metin
+
+
+async def yorumlari_akit(arka_uc, istekler):
+    """Tüm istemleri aynı anda gönderir ve parçalar geldikçe yazıcılara iletir.
+
+    `istekler` {ad: (istem, yazici, hata_mesaji)} sözlüğüdür; yazici None olabilir.
+    Sayfa gecikmesi çağrıların toplamı değil, en yavaş çağrının süresi olur.
+    {ad: metin} döndürür.
+    """
+    adlar = list(istekler)
+    metinler = await asyncio.gather(*(_tek_yorum(arka_uc, *istekler[ad]) for ad in adlar))
+    return dict(zip(adlar, metinler))
+
+
+def yorumlari_uret(arka_uc, istekler):
+    """yorumlari_akit'in senkron karşılığı (Streamlit betiği veya arka plan iş parçacığı için)."""
+    return asyncio.run(yorumlari_akit(arka_uc, istekler))
+
+
+def yorum_uret(api_key, prompt_data):
+    """AI Danışman için kısa yorumlar üretir."""
+    arka_uc = arka_uc_sec(api_key)
+    if arka_uc is None: return YORUM_HATA_MESAJI
+    return yorumlari_uret(arka_uc, {'yorum': (yorum_istemi(prompt_data), None, YORUM_HATA_MESAJI)})['yorum']
+
+
+def tahmin_yorumu_uret(api_key, forecast_df):
+    """Tahmin sonuçlarını alıp, aktüeryal bir bakış açısıyla profesyonel bir stratejik yorum üretir."""
+    arka_uc = arka_uc_sec(api_key)
+    if arka_uc is None: return TAHMIN_YORUM_HATA_MESAJI
+    try:
+        istem = tahmin_yorum_istemi(forecast_df)
+    except Exception: return TAHMIN_YORUM_HATA_MESAJI
+    return yorumlari_uret(arka_uc, {'yorum': (istem, None, TAHMIN_YORUM_HATA_MESAJI)})['yorum']